@@ -0,0 +1,58 @@
+"""Benchmark parsing of big path data strings.
+
+Run from the project root: python3 scripts/bench_parse_path.py
+"""
+import random
+import time
+
+import svg
+
+
+def make_path_data(size: int, compact: bool) -> str:
+    """Generate path data of about `size` bytes using all kinds of commands.
+
+    If `compact`, numbers are written without separators where possible,
+    like minifiers do.
+    """
+    rnd = random.Random(42)
+    parts = ["M0 0"]
+    length = 0
+    while length < size:
+        x = round(rnd.uniform(-100, 100), 3)
+        y = round(rnd.uniform(-100, 100), 3)
+        part = rnd.choice([
+            f"L{x} {y}",
+            f"l{x} {y}",
+            f"h{x}v{y}",
+            f"C{x},{y} {y},{x} {x} {y}",
+            f"q{x} {y} {y} {x}",
+            f"a5 5 0 01{x} {y}",
+            f"L{x} {y} {y} {x}",
+            "z",
+        ])
+        if compact:
+            part = part.replace(" -", "-").replace(",-", "-").replace(" 0.", " .")
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def bench(name: str, func, d: str) -> None:
+    start = time.perf_counter()
+    result = func(d)
+    elapsed = time.perf_counter() - start
+    mb = len(d) / 1024 / 1024
+    print(f"{name:20} {len(result):>9} commands  {elapsed:6.3f}s  {mb / elapsed:5.1f} MB/s")
+
+
+def run() -> None:
+    for compact in (False, True):
+        for size in (1, 4, 16):
+            d = make_path_data(size * 1024 * 1024, compact=compact)
+            print(f"{size} MB{', compact' if compact else ''}:")
+            bench("parse_path", svg.parse_path, d)
+            bench("parse_path_buffer", svg.parse_path_buffer, d)
+
+
+if __name__ == '__main__':
+    run()
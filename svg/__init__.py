@@ -1,5 +1,6 @@
 """SVG drawing library
 """
+from ._bake import bake_transforms
 from ._filters import (
     FeBlend, FeColorMatrix, FeComponentTransfer, FeComposite, FeConvolveMatrix,
     FeDiffuseLighting, FeDisplacementMap, FeDistantLight, FeDropShadow,
@@ -7,17 +8,24 @@ from ._filters import (
     FeMerge, FeMergeNode, FeMorphology, FeOffset, FePointLight,
     FeSpecularLighting, FeSpotLight, FeTile, FeTurbulence, Filter,
 )
+from ._formatters import NumberFormat, register_formatter
+from ._geometry import BoundingBox, bounding_box, path_length, point_at_length
 from ._helpers import escape, mm, px
 from ._path import (
     Arc, ArcRel, C, ClosePath, CubicBezier, CubicBezierRel, H,
     HorizontalLineTo, HorizontalLineToRel, L, LineTo, LineToRel, M, MoveTo,
-    MoveToRel, PathData, Q, QuadraticBezier, QuadraticBezierRel, S,
+    MoveToRel, PathBuffer, PathData, Q, QuadraticBezier, QuadraticBezierRel, S,
     SmoothCubicBezier, SmoothCubicBezierRel, SmoothQuadraticBezier,
     SmoothQuadraticBezierRel, T, V, VerticalLineTo, VerticalLineToRel, Z, a, c,
     h, l, m, q, s, t, v,
 )
+from ._minify import minify_path
+from ._optimize import PassStats, optimize, register_pass
+from ._parser import parse_path, parse_path_buffer
+from ._simplify import downsample, simplify
 from ._transforms import (
     Matrix, Rotate, Scale, SkewX, SkewY, Transform, Translate,
+    compose_transforms,
 )
 from ._types import (
     Length, PreserveAspectRatio, ViewBoxSpec,
@@ -44,6 +52,21 @@ __all__ = [
     'escape',
     'mm',
     'px',
+    'register_formatter',
+    'NumberFormat',
+    'parse_path',
+    'parse_path_buffer',
+    'minify_path',
+    'bounding_box',
+    'BoundingBox',
+    'path_length',
+    'point_at_length',
+    'simplify',
+    'downsample',
+    'bake_transforms',
+    'optimize',
+    'register_pass',
+    'PassStats',
 
     # elements
     'Element',
@@ -124,9 +147,11 @@ __all__ = [
     'Rotate',
     'SkewX',
     'SkewY',
+    'compose_transforms',
 
     # path data
     'PathData',
+    'PathBuffer',
     'M', 'MoveTo',
     'm', 'MoveToRel',
     'L', 'LineTo',
@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from typing import Any, Optional
+
+from ._parser import parse_path
+from ._path import (
+    Arc, ClosePath, CubicBezier, LineTo, MoveTo, PathBuffer, PathData,
+    QuadraticBezier, _without_decimals, to_absolute,
+)
+from ._transforms import Matrix, Transform, _real, compose_transforms
+from ._types import Length
+from .elements import (
+    Animate, AnimateMotion, AnimateTransform, Circle, Defs, Desc, Element,
+    Ellipse, G, Line, Metadata, Path, Polygon, Polyline, Rect, Set, Style,
+    Title,
+)
+
+
+_SHAPES = (Path, Rect, Circle, Ellipse, Line, Polyline, Polygon)
+# Children that don't care about the transform of the group they are in.
+_NON_RENDERING = (Title, Desc, Metadata, Defs)
+# Attributes that refer to the user space of the element, including its transform.
+_USER_SPACE_REFS = ("clip_path", "mask", "filter", "transform_origin")
+_MARKERS = ("marker_start", "marker_mid", "marker_end")
+# Animations can change the geometry or the transform of their target element.
+_ANIMATIONS = (Animate, AnimateMotion, AnimateTransform, Set)
+
+
+class _CannotBake(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class _Inherited:
+    """Values of inherited properties that affect baking, as set in the tree.
+
+    The defaults are the initial values of the properties.
+    """
+
+    stroke: Any = None
+    stroke_width: Any = None
+    stroke_dasharray: Any = None
+    stroke_dashoffset: Any = None
+    fill: Any = None
+    markers: bool = False
+    # If the element or any of its ancestors has `style` or `class`,
+    # CSS may override any of the values.
+    styled: bool = False
+
+    def child(self, element: Element) -> _Inherited:
+        attrs = element.__dict__
+        changes = {
+            name: attrs[name]
+            for name in ("stroke", "stroke_width", "stroke_dasharray", "stroke_dashoffset", "fill")
+            if attrs.get(name) is not None
+        }
+        if any(attrs.get(name) is not None for name in _MARKERS):
+            changes["markers"] = True
+        if attrs.get("style") is not None or attrs.get("class_") is not None:
+            changes["styled"] = True
+        return replace(self, **changes) if changes else self
+
+
+def bake_transforms(root: Element) -> None:
+    """Apply transforms to the coordinates of shapes and remove redundant groups.
+
+    Modifies the tree in place. The `transform` of `Path`, `Polyline`, `Polygon`,
+    `Line`, `Rect`, `Circle`, and `Ellipse` is applied to their coordinates,
+    and the `transform` of `G` is moved into its children. After that, groups
+    without any attributes are replaced by their children.
+
+    Only the changes that don't affect rendering are made. For example, a circle
+    cannot be stretched, a rect cannot be rotated, and shapes with gradients,
+    clip paths, masks, or filters keep their transforms. When scaling a stroked shape,
+    `stroke_width` is scaled as well. Nothing is done if the tree has `Style`
+    elements, and elements with `style` or `class_` are skipped, because CSS
+    may set properties that are not known here. Animated elements are skipped
+    as well, because animations work in the original coordinates.
+    """
+    if _has_stylesheet(root):
+        return
+    animated = _animated_ids(root)
+    stack = [(root, _Inherited().child(root))]
+    while stack:
+        parent, inherited = stack.pop()
+        queue = list(reversed(parent.elements or ()))
+        if not queue:
+            continue
+        result = []
+        changed = False
+        while queue:
+            child = queue.pop()
+            child_inherited = inherited.child(child)
+            if isinstance(child, _SHAPES) and child.transform:
+                if not _is_animated(child, animated):
+                    attrs = _baked_attrs(child, child.transform, child_inherited)
+                    if attrs is not None:
+                        _update(child, attrs)
+            elif isinstance(child, G) and not _is_animated(child, animated):
+                _push_transform(child, child_inherited, animated)
+                if not _has_attributes(child):
+                    # Process the children of the group as if they were ours.
+                    queue.extend(reversed(child.elements or ()))
+                    changed = True
+                    continue
+            result.append(child)
+            if child.elements:
+                stack.append((child, child_inherited))
+        if changed:
+            parent.elements = result
+
+
+def _has_stylesheet(root: Element) -> bool:
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        if isinstance(element, Style):
+            return True
+        stack.extend(element.elements or ())
+    return False
+
+
+def _animated_ids(root: Element) -> set[str]:
+    """Ids of elements that are animated by animations placed somewhere else.
+    """
+    result = set()
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        if isinstance(element, _ANIMATIONS):
+            href = element.href
+            if href and href.startswith("#"):
+                result.add(href[1:])
+        stack.extend(child for child in element.elements or () if isinstance(child, Element))
+    return result
+
+
+def _is_animated(element: Element, animated_ids: set[str]) -> bool:
+    if element.__dict__.get("id") in animated_ids:
+        return True
+    return any(isinstance(child, _ANIMATIONS) for child in element.elements or ())
+
+
+def _has_attributes(element: Element) -> bool:
+    return any(
+        value is not None
+        for name, value in element.__dict__.items()
+        if name != "elements" and not name.startswith("_")
+    )
+
+
+def _update(element: Element, attrs: dict[str, Any]) -> None:
+    for name, value in attrs.items():
+        setattr(element, name, value)
+
+
+def _push_transform(group: G, inherited: _Inherited, animated_ids: set[str]) -> None:
+    """Move the transform of the group into its children, if all of them can take it.
+
+    Shapes must be able to bake it into coordinates, so that the transform
+    is not copied into many elements.
+    """
+    if not group.transform or inherited.styled:
+        return
+    if any(getattr(group, name, None) is not None for name in _USER_SPACE_REFS):
+        return
+    updates: list[tuple[Element, dict[str, Any]]] = []
+    for child in group.elements or ():
+        if isinstance(child, Element) and _is_animated(child, animated_ids):
+            return
+        transform = [*group.transform, *(getattr(child, "transform", None) or ())]
+        if isinstance(child, _SHAPES):
+            attrs = _baked_attrs(child, transform, inherited.child(child))
+            if attrs is None:
+                return
+            updates.append((child, attrs))
+        elif isinstance(child, G):
+            updates.append((child, {"transform": transform}))
+        elif not isinstance(child, _NON_RENDERING):
+            return
+    for child, attrs in updates:
+        _update(child, attrs)
+    group.transform = None
+
+
+def _baked_attrs(element: Element, transform: list[Transform], inherited: _Inherited) -> Optional[dict[str, Any]]:
+    """New values of attributes of the shape with the transform applied.
+
+    Returns None if the result would look different.
+    """
+    if inherited.styled or _is_url(inherited.fill) or _is_url(inherited.stroke):
+        return None
+    if any(getattr(element, name, None) is not None for name in _USER_SPACE_REFS):
+        return None
+    # Decimals are converted, so that they can be mixed with floats.
+    m = Matrix(*compose_transforms(transform)._coefficients())
+    linear_identity = (m.a, m.b, m.c, m.d) == (1, 0, 0, 1)
+    if inherited.markers and not linear_identity:
+        return None
+    scale = _similarity_scale(m)
+    try:
+        attrs = {}
+        rigid = scale is not None and math.isclose(scale, 1)
+        stroked = inherited.stroke not in (None, "none")
+        if not rigid and stroked and getattr(element, "vector_effect", None) != "non-scaling-stroke":
+            if scale is None or element.pathLength is not None:  # type: ignore[attr-defined]
+                return None
+            attrs.update(_scaled_stroke(inherited, scale))
+        attrs.update(_baked_geometry(element, m, scale))
+    except _CannotBake:
+        return None
+    attrs["transform"] = None
+    return attrs
+
+
+def _scaled_stroke(inherited: _Inherited, scale: float) -> dict[str, Any]:
+    width = 1 if inherited.stroke_width is None else _px(inherited.stroke_width)
+    attrs: dict[str, Any] = {"stroke_width": width * scale}
+    dasharray = inherited.stroke_dasharray
+    if dasharray is not None and dasharray != "none":
+        if not isinstance(dasharray, list):
+            raise _CannotBake
+        attrs["stroke_dasharray"] = [_px(value) * scale for value in dasharray]
+    dashoffset = inherited.stroke_dashoffset
+    if dashoffset is not None and dashoffset != "none":
+        attrs["stroke_dashoffset"] = _px(dashoffset) * scale
+    return attrs
+
+
+def _baked_geometry(element: Element, m: Matrix, scale: Optional[float]) -> dict[str, Any]:
+    axis_aligned = m.b == 0 and m.c == 0
+    if isinstance(element, Path):
+        if element.d is None:
+            return {}
+        d = element.d
+        path = parse_path(d) if isinstance(d, str) else d
+        if isinstance(path, PathBuffer):
+            path = path.to_path_data()
+        baked = _baked_path(path, m, scale)
+        return {"d": PathBuffer.from_path_data(baked) if isinstance(d, PathBuffer) else baked}
+    if isinstance(element, (Polyline, Polygon)):
+        if element.points is None:
+            return {}
+        return {"points": m.apply(element.points)}
+    if isinstance(element, Line):
+        x1, y1 = _apply(m, _px(element.x1), _px(element.y1))
+        x2, y2 = _apply(m, _px(element.x2), _px(element.y2))
+        return {"x1": x1, "y1": y1, "x2": x2, "y2": y2}
+    if isinstance(element, Circle):
+        if scale is None:
+            raise _CannotBake
+        cx, cy = _apply(m, _px(element.cx), _px(element.cy))
+        return {"cx": cx, "cy": cy, "r": _px(element.r) * scale}
+    if not axis_aligned:
+        raise _CannotBake
+    if isinstance(element, Ellipse):
+        if element.rx is None or element.ry is None:
+            raise _CannotBake
+        cx, cy = _apply(m, _px(element.cx), _px(element.cy))
+        return {"cx": cx, "cy": cy, "rx": _px(element.rx) * abs(m.a), "ry": _px(element.ry) * abs(m.d)}
+    assert isinstance(element, Rect)
+    x = _px(element.x)
+    y = _px(element.y)
+    width = _px(element.width)
+    height = _px(element.height)
+    attrs = {
+        "x": m.a * (x if m.a >= 0 else x + width) + m.e,
+        "y": m.d * (y if m.d >= 0 else y + height) + m.f,
+        "width": width * abs(m.a),
+        "height": height * abs(m.d),
+    }
+    if element.rx is not None or element.ry is not None:
+        # If only one radius is specified, the other one is the same.
+        rx = _px(element.rx if element.rx is not None else element.ry)
+        ry = _px(element.ry if element.ry is not None else element.rx)
+        attrs["rx"] = rx * abs(m.a)
+        attrs["ry"] = ry * abs(m.d)
+    return attrs
+
+
+def _baked_path(path: list[PathData], m: Matrix, scale: Optional[float]) -> list[PathData]:
+    result: list[PathData] = []
+    a, b, c, d, _, _ = m._coefficients()
+    det = a * d - b * c
+    if b:
+        rotation = math.degrees(math.atan2(b, a))
+    else:
+        rotation = 0 if a > 0 else 180
+    for command in to_absolute([_without_decimals(command) for command in path]):
+        if isinstance(command, ClosePath):
+            result.append(command)
+        elif isinstance(command, Arc):
+            if scale is None:
+                raise _CannotBake
+            # A reflection flips the direction of the arc and of its rotation.
+            angle = rotation + _real(command.angle) if det > 0 else rotation - _real(command.angle)
+            result.append(Arc(
+                _real(command.rx) * scale, _real(command.ry) * scale, angle % 360,
+                command.large_arc, command.sweep if det > 0 else not command.sweep,
+                *_apply(m, command.x, command.y),
+            ))
+        elif isinstance(command, CubicBezier):
+            result.append(CubicBezier(
+                *_apply(m, command.x1, command.y1),
+                *_apply(m, command.x2, command.y2),
+                *_apply(m, command.x, command.y),
+            ))
+        elif isinstance(command, QuadraticBezier):
+            result.append(QuadraticBezier(
+                *_apply(m, command.x1, command.y1),
+                *_apply(m, command.x, command.y),
+            ))
+        else:
+            assert isinstance(command, (MoveTo, LineTo))
+            result.append(type(command)(*_apply(m, command.x, command.y)))
+    return result
+
+
+def _apply(m: Matrix, x: Any, y: Any) -> tuple[Any, Any]:
+    if m.b == 0 and m.c == 0:
+        # Keep integers as integers for translations.
+        return (x if m.a == 1 else m.a * x) + m.e, (y if m.d == 1 else m.d * y) + m.f
+    return m.a * x + m.c * y + m.e, m.b * x + m.d * y + m.f
+
+
+def _similarity_scale(m: Matrix) -> Optional[float]:
+    """The scale of the transform if it keeps the shapes (but not the size), else None.
+    """
+    a, b, c, d, _, _ = m._coefficients()
+    if b == 0 and c == 0 and abs(a) == abs(d):
+        # Keep integers exact.
+        return abs(a)
+    det = a * d - b * c
+    if det > 0 and math.isclose(a, d, abs_tol=1e-12) and math.isclose(b, -c, abs_tol=1e-12):
+        return math.sqrt(det)
+    if det < 0 and math.isclose(a, -d, abs_tol=1e-12) and math.isclose(b, c, abs_tol=1e-12):
+        return math.sqrt(-det)
+    return None
+
+
+def _px(value: Any) -> Any:
+    if value is None:
+        return 0
+    if isinstance(value, Length):
+        if value.unit != "px":
+            raise _CannotBake
+        value = value.value
+    # Decimals cannot be mixed with floats of the matrix.
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _is_url(paint: Any) -> bool:
+    return isinstance(paint, str) and paint.strip().startswith("url(")
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from collections import Counter
+from itertools import count
+from typing import Any, Dict, Hashable, Iterator, Optional
+
+from ._bake import _has_stylesheet
+from ._formatters import format_value
+from ._transforms import Translate
+from .elements import (
+    SVG, A, Circle, Defs, Element, Ellipse, G, Image, Line, Path, Polygon,
+    Polyline, Rect, Text, Use,
+)
+
+
+# Elements that can be replaced with `Use`.
+_CANDIDATES = (G, Path, Rect, Circle, Ellipse, Line, Polyline, Polygon, Text, Image)
+# Containers that are searched for the candidates. Content of other elements
+# (like `Defs`, `ClipPath`, or `Marker`) is not rendered directly.
+_CONTAINERS = (SVG, G, A)
+
+
+def dedupe_subtrees(root: Element, min_size: int = 64) -> None:
+    """Replace repeated subtrees with `Use` elements referring to a single copy.
+
+    Subtrees that are the same except for the `transform` of the top element
+    and have at least `min_size` characters in the output are moved into `Defs`
+    (added at the beginning of `root`) with a generated id. Every occurrence
+    is replaced with `Use`, positioned with `x` and `y` if the transform
+    is a single translation or with the same `transform` otherwise.
+
+    Subtrees containing elements with an id are never moved, and nothing is done
+    if the tree has `Style` elements because CSS selectors can match
+    the original elements but not the ones referred to by `Use`.
+    """
+    if _has_stylesheet(root):
+        return
+    keys = _subtree_keys(root)
+    counts = Counter(key for key in keys.values() if key is not None)
+    selected = {key for key, total in counts.items() if total > 1}
+    # The size of the output for the subtrees that are repeated.
+    sizes: Dict[int, int] = {}
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        for child in element.elements or ():
+            key = keys.get(id(child))
+            if key in selected and key not in sizes and isinstance(child, _CANDIDATES):
+                sizes[key] = len(child.as_str())  # type: ignore[index]
+            if isinstance(child, _CONTAINERS):
+                stack.append(child)
+    selected = {key for key in selected if sizes.get(key, 0) >= min_size}
+    # Repeated subtrees can be nested inside each other. Only the outermost ones
+    # are replaced, and then the inner ones may not be repeated anymore.
+    while True:
+        occurrences = _find_occurrences(root, keys, selected)
+        hits = Counter(keys[id(child)] for _, child in occurrences)
+        rare = {key for key in selected if hits[key] < 2}
+        if not rare:
+            break
+        selected -= rare
+    if not occurrences:
+        return
+
+    new_ids = _new_ids(_collect_ids(root))
+    generated: Dict[int, str] = {}
+    definitions = []
+    replacements: Dict[int, Dict[int, Use]] = {}
+    for parent, child in occurrences:
+        key = keys[id(child)]
+        assert key is not None
+        transform = getattr(child, "transform", None)
+        href = generated.get(key)
+        if href is None:
+            href = generated[key] = next(new_ids)
+            definitions.append(child)
+        use = Use(href=f"#{href}")
+        if transform and len(transform) == 1 and isinstance(transform[0], Translate):
+            x, y = transform[0].x, transform[0].y
+            if x:
+                use.x = x
+            if y:
+                use.y = y
+        elif transform:
+            use.transform = transform
+        replacements.setdefault(id(parent), {})[id(child)] = use
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        mapping = replacements.get(id(element))
+        if mapping is not None:
+            element.elements = [mapping.get(id(child), child) for child in element.elements or ()]
+        stack.extend(child for child in element.elements or () if isinstance(child, _CONTAINERS))
+    for definition in definitions:
+        if getattr(definition, "transform", None) is not None:
+            definition.transform = None
+        definition.id = generated[keys[id(definition)]]  # type: ignore[index]
+    root.elements = [Defs(elements=definitions), *(root.elements or ())]
+
+
+def _subtree_keys(root: Element) -> Dict[int, Optional[int]]:
+    """Hash-cons the tree: the same number for the same subtrees, ignoring the top transform.
+
+    Returns None for the subtrees that have an element with an id.
+    The keys are indexed by `id()` of the elements.
+    """
+    order = []
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        order.append(element)
+        stack.extend(child for child in element.elements or () if isinstance(child, Element))
+    # The structure of each subtree, with the subtrees of children replaced
+    # by their numbers in the table.
+    table: Dict[Hashable, int] = {}
+    keys: Dict[int, Optional[int]] = {}
+    for element in reversed(order):
+        if element.id is not None:
+            keys[id(element)] = None
+            continue
+        children: list[Any] = []
+        for child in element.elements or ():
+            if isinstance(child, Element):
+                child_key = keys[id(child)]
+                if child_key is None:
+                    break
+                # The transform of children is a part of the parent structure.
+                children.append((child_key, format_value(getattr(child, "transform", None))))
+            else:
+                children.append(format_value(child))
+        else:
+            attrs = element.as_dict()
+            attrs.pop("transform", None)
+            structure = (
+                type(element),
+                tuple(attrs.items()),
+                element.text,
+                tuple(sorted(element.data.items())) if element.data else None,
+                tuple(sorted(element.extra.items())) if element.extra else None,
+                tuple(children),
+            )
+            keys[id(element)] = table.setdefault(structure, len(table))
+            continue
+        keys[id(element)] = None
+    return keys
+
+
+def _find_occurrences(
+    root: Element,
+    keys: Dict[int, Optional[int]],
+    selected: set[int],
+) -> list[tuple[Element, Element]]:
+    """The outermost elements with the selected keys, and their parents.
+    """
+    result: list[tuple[Element, Element]] = []
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        for child in element.elements or ():
+            if not isinstance(child, Element):
+                continue
+            if isinstance(child, _CANDIDATES) and keys.get(id(child)) in selected:
+                result.append((element, child))
+            elif isinstance(child, _CONTAINERS):
+                stack.append(child)
+    return result
+
+
+def _collect_ids(root: Element) -> set[str]:
+    result = set()
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        if element.id is not None:
+            result.add(element.id)
+        stack.extend(child for child in element.elements or () if isinstance(child, Element))
+    return result
+
+
+def _new_ids(used: set[str]) -> Iterator[str]:
+    """Generate short ids that are not in use yet.
+    """
+    for index in count():
+        candidate = f"d{index:x}"
+        if candidate not in used:
+            yield candidate
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import re
+from contextvars import ContextVar
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Sequence, Tuple, Union
+
+
+Formatter = Callable[[Any], str]
+_Number = Union[Decimal, float, int]
+
+# Formatters registered for a type and all its subclasses.
+_formatters: Dict[type, Formatter] = {}
+# Formatters for builtin types that apply only to the exact type.
+# For instance, IntEnum is a subclass of int but must be formatted as Enum.
+_exact_formatters: Dict[type, Formatter] = {
+    str: str,
+    int: str,
+    bool: lambda val: "true" if val else "false",
+    type(None): lambda val: "",
+}
+# The formatter resolved for each type that has been formatted so far.
+_resolved: Dict[type, Formatter] = {}
+
+
+@dataclass
+class NumberFormat:
+    """Options for formatting numbers in the output.
+
+    Use it as a context manager around the rendering:
+
+        with svg.NumberFormat(precision=2):
+            output = canvas.as_str()
+
+    Outside of the context, numbers are formatted with `str`.
+    Inside of it, trailing zeros are stripped (`5.0` becomes `5`).
+    """
+
+    precision: int | None = None
+    """The maximum number of decimal places.
+
+    If not specified, the shortest representation that round-trips is used.
+    """
+
+    leading_zero: bool = True
+    """If False, strip the leading zero (`0.5` becomes `.5`).
+    """
+
+    def format(self, val: _Number) -> str:
+        if isinstance(val, int):
+            return str(val)
+        if self.precision is not None:
+            text = f"{val:.{self.precision}f}"
+        elif isinstance(val, float):
+            text = float.__repr__(val)
+        else:
+            text = f"{val:f}"
+        if "." in text and "e" not in text:
+            text = text.rstrip("0").rstrip(".")
+        if text == "-0":
+            return "0"
+        if not self.leading_zero:
+            if text.startswith("0."):
+                text = text[1:]
+            elif text.startswith("-0."):
+                text = "-" + text[2:]
+        return text
+
+    def __enter__(self) -> NumberFormat:
+        # The stack is kept in the context, not in the instance, so that the same
+        # format can be used at once by threads and asyncio tasks.
+        _number_formats.set((*_number_formats.get(), self))
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        _number_formats.set(_number_formats.get()[:-1])
+
+
+# The active formats, the innermost last.
+_number_formats: ContextVar[Tuple[NumberFormat, ...]] = ContextVar("number_formats", default=())
+# Used for values that are stored as floats anyway.
+_DEFAULT_NUMBER_FORMAT = NumberFormat()
+
+
+def get_number_format() -> NumberFormat | None:
+    """Get the number format that is currently active, if any.
+    """
+    formats = _number_formats.get()
+    return formats[-1] if formats else None
+
+
+def format_number(val: _Number) -> str:
+    """Format the number according to the active `NumberFormat`.
+    """
+    formats = _number_formats.get()
+    if not formats:
+        return str(val)
+    return formats[-1].format(val)
+
+
+def register_formatter(type_: type, formatter: Formatter) -> None:
+    """Use the given function to convert values of the type into attribute values.
+
+    The formatter is also used for all subclasses of the type
+    unless they have a formatter of their own.
+    """
+    _formatters[type_] = formatter
+    _resolved.clear()
+
+
+def get_formatter(type_: type) -> Formatter:
+    """Find the formatter for values of the given type.
+    """
+    formatter = _resolved.get(type_)
+    if formatter is not None:
+        return formatter
+    formatter = _formatters.get(type_)
+    if formatter is None:
+        formatter = _exact_formatters.get(type_)
+    if formatter is None:
+        for base in type_.__mro__:
+            formatter = _formatters.get(base)
+            if formatter is not None:
+                break
+        else:
+            if issubclass(type_, float):
+                # Subclasses of float (like numpy.float64) are numbers,
+                # unless they are enums, which are found in the MRO above.
+                formatter = format_number
+            elif hasattr(type_, "__array_interface__"):
+                # Numpy arrays are formatted the same as other buffers.
+                formatter = _formatters.get(memoryview, str)
+            else:
+                formatter = str
+    _resolved[type_] = formatter
+    return formatter
+
+
+def format_value(val: Any) -> str:
+    """Convert the value into a string to be used as an attribute value.
+    """
+    formatter = _resolved.get(type(val))
+    if formatter is None:
+        formatter = get_formatter(type(val))
+    return formatter(val)
+
+
+def format_list(val: list | tuple, sep: str = " ") -> str:
+    return sep.join(format_value(v) for v in val)
+
+
+def format_floats(values: Sequence[float]) -> str:
+    """Format many floats at once, separated by spaces.
+
+    Faster than formatting each number separately for big sequences.
+    The active `NumberFormat` is applied. Without one, integral floats
+    are written without the trailing ".0".
+    """
+    if not values:
+        return ""
+    number_format = get_number_format() or _DEFAULT_NUMBER_FORMAT
+    if number_format.precision is None:
+        spec = "%r"
+    else:
+        spec = f"%.{number_format.precision}f"
+    text = " " + " ".join([spec] * len(values)) % tuple(values)
+    return compact_numbers(text, number_format.precision, number_format.leading_zero)[1:]
+
+
+_TRAILING_ZEROS = re.compile(r"0+(?= |$)")
+_TRAILING_DOT = re.compile(r"\.(?= |$)")
+_NEGATIVE_ZERO = re.compile(r" -0(?= |$)")
+
+
+def compact_numbers(text: str, precision: int | None, leading_zero: bool) -> str:
+    """Apply NumberFormat rules to all numbers in the text at once.
+
+    Each number in the text must be preceded by a space. Numbers are formatted
+    either with `repr` (if `precision` is None) or as fixed-point numbers
+    with the given precision.
+    """
+    if precision is None:
+        # repr can have a trailing zero only in integral floats, like "5.0".
+        text = (text + " ").replace(".0 ", " ")[:-1]
+    elif precision > 0:
+        # All fixed-point numbers have a dot, so zeros at the end are after it.
+        text = _TRAILING_ZEROS.sub("", text)
+        text = _TRAILING_DOT.sub("", text)
+    if " -0" in text:
+        text = _NEGATIVE_ZERO.sub(" 0", text)
+    if not leading_zero:
+        text = text.replace(" 0.", " .").replace(" -0.", " -.")
+    return text
+
+
+_exact_formatters[float] = format_number
+register_formatter(Decimal, format_number)
+register_formatter(Enum, lambda val: format_value(val.value))
+register_formatter(list, format_list)
+register_formatter(tuple, format_list)
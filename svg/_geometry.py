@@ -0,0 +1,607 @@
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+from ._parser import parse_path
+from ._path import (
+    Arc, ClosePath, CubicBezier, LineTo, MoveTo, PathBuffer, PathData,
+    QuadraticBezier, _without_decimals, to_absolute,
+)
+from ._transforms import Matrix, compose_transforms
+from ._types import Length, Number, Point, ViewBoxSpec, point_columns
+from .elements import (
+    A, Circle, Element, Ellipse, G, Line, Path, Polygon, Polyline, Rect, Switch,
+)
+
+
+_IDENTITY = Matrix(1, 0, 0, 1, 0, 0)
+# Elements whose content is rendered in their own coordinate system.
+_CONTAINERS = (G, A, Switch)
+_SHAPES = (Path, Rect, Circle, Ellipse, Line, Polyline, Polygon)
+# Path commands that can be handled as a flat list of points.
+_POLYLINE_COMMANDS = b"ML"
+
+# The default maximum distance between a curve and its flattened version.
+_TOLERANCE = 0.01
+# The maximum number of times a curve segment is split in half when flattening.
+_MAX_DEPTH = 16
+
+_PathLike = Union[List[PathData], PathBuffer, str]
+
+
+@dataclass
+class BoundingBox:
+    """The smallest axis-aligned rectangle containing the geometry.
+
+    The same as `getBBox()` in browsers, doesn't include the stroke, markers,
+    and filter effects.
+    """
+
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+
+    @property
+    def width(self) -> float:
+        return self.max_x - self.min_x
+
+    @property
+    def height(self) -> float:
+        return self.max_y - self.min_y
+
+    def union(self, other: BoundingBox) -> BoundingBox:
+        """The bounding box containing both boxes.
+        """
+        return BoundingBox(
+            min(self.min_x, other.min_x),
+            min(self.min_y, other.min_y),
+            max(self.max_x, other.max_x),
+            max(self.max_y, other.max_y),
+        )
+
+    def to_view_box(self, margin: Number = 0) -> ViewBoxSpec:
+        """The value for `SVG.viewBox` that shows everything inside the box.
+        """
+        margin = float(margin)
+        return ViewBoxSpec(
+            self.min_x - margin,
+            self.min_y - margin,
+            self.width + 2 * margin,
+            self.height + 2 * margin,
+        )
+
+
+def bounding_box(target: Union[Element, _PathLike]) -> Optional[BoundingBox]:
+    """Calculate the bounding box of an element or of path data.
+
+    For `Path`, `Rect`, `Circle`, `Ellipse`, `Line`, `Polyline`, and `Polygon`,
+    the box includes the `transform` of the element. Curves and arcs have exact
+    extrema, not just the control points. For `G`, `A`, and `Switch`, it is the box
+    of all shapes inside, including all transforms on the way. For any other element
+    (like `SVG`), it is the box of its content in its own coordinate system:
+    pass the result into `BoundingBox.to_view_box` to get a fitting `SVG.viewBox`.
+
+    The result for each shape is cached. The cache is dropped when an attribute
+    of the shape is reassigned. If you modify a list in place (`path.d.append(...)`),
+    call `invalidate_cache()` on the element. Returns None if there is no geometry.
+    """
+    extents = _Extents()
+    if not isinstance(target, Element):
+        _add_path(extents, _to_commands(target), _IDENTITY)
+        return extents.result()
+    stack: list[tuple[Element, Matrix]] = [(target, _IDENTITY)]
+    while stack:
+        element, matrix = stack.pop()
+        transform = getattr(element, "transform", None)
+        if transform:
+            matrix = matrix @ compose_transforms(transform)
+        if isinstance(element, _SHAPES):
+            extents.add_box(_shape_box(element, matrix))
+        elif element is target or isinstance(element, _CONTAINERS):
+            for child in element.elements or ():
+                stack.append((child, matrix))
+    return extents.result()
+
+
+def _number(value: Length | Number | None) -> float:
+    """Convert the length into a number that can be mixed with floats.
+
+    Integers are kept as they are, so that the geometry can be written out exactly.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, Length):
+        if value.unit != "px":
+            raise ValueError(f"cannot calculate geometry for a length in {value.unit!r}")
+        value = value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _shape_box(element: Element, matrix: Matrix) -> Optional[BoundingBox]:
+    key = (matrix.a, matrix.b, matrix.c, matrix.d, matrix.e, matrix.f)
+    cache = element.__dict__.setdefault("_cached_geometry", {})
+    cached = cache.get("bbox")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    extents = _Extents()
+    if isinstance(element, (Polyline, Polygon)):
+        if element.points is not None:
+            _add_points(extents, *point_columns(element.points), matrix)
+    elif isinstance(element, Path) and isinstance(element.d, PathBuffer) \
+            and not element.d.commands.tobytes().translate(None, _POLYLINE_COMMANDS):
+        coords = element.d.coords
+        _add_points(extents, coords[0::2], coords[1::2], matrix)
+    else:
+        _add_path(extents, _shape_commands(element), matrix)
+    result = extents.result()
+    cache["bbox"] = (key, result)
+    return result
+
+
+def _to_commands(d: _PathLike | None) -> list[PathData]:
+    if d is None:
+        return []
+    if isinstance(d, str):
+        d = parse_path(d)
+    elif isinstance(d, PathBuffer):
+        return to_absolute(d.to_path_data())
+    return to_absolute([_without_decimals(command) for command in d])
+
+
+def _shape_commands(element: Element) -> list[PathData]:
+    """Convert the shape into absolute path commands.
+
+    https://www.w3.org/TR/SVG2/shapes.html
+    """
+    if isinstance(element, Path):
+        return _to_commands(element.d)
+    if isinstance(element, Line):
+        return [
+            MoveTo(_number(element.x1), _number(element.y1)),
+            LineTo(_number(element.x2), _number(element.y2)),
+        ]
+    if isinstance(element, Circle):
+        return _ellipse_commands(element.cx, element.cy, element.r, element.r)
+    if isinstance(element, Ellipse):
+        return _ellipse_commands(element.cx, element.cy, element.rx, element.ry)
+    assert isinstance(element, Rect)
+    x = _number(element.x)
+    y = _number(element.y)
+    width = _number(element.width)
+    height = _number(element.height)
+    rx = _number(element.rx if element.rx is not None else element.ry)
+    ry = _number(element.ry if element.ry is not None else element.rx)
+    rx = min(rx, width / 2)
+    ry = min(ry, height / 2)
+    if not rx or not ry:
+        return [
+            MoveTo(x, y),
+            LineTo(x + width, y),
+            LineTo(x + width, y + height),
+            LineTo(x, y + height),
+            ClosePath(),
+        ]
+    return [
+        MoveTo(x + rx, y),
+        LineTo(x + width - rx, y),
+        Arc(rx, ry, 0, False, True, x + width, y + ry),
+        LineTo(x + width, y + height - ry),
+        Arc(rx, ry, 0, False, True, x + width - rx, y + height),
+        LineTo(x + rx, y + height),
+        Arc(rx, ry, 0, False, True, x, y + height - ry),
+        LineTo(x, y + ry),
+        Arc(rx, ry, 0, False, True, x + rx, y),
+        ClosePath(),
+    ]
+
+
+def _ellipse_commands(cx: Any, cy: Any, rx: Any, ry: Any) -> list[PathData]:
+    cx = _number(cx)
+    cy = _number(cy)
+    rx = _number(rx)
+    ry = _number(ry)
+    return [
+        MoveTo(cx + rx, cy),
+        Arc(rx, ry, 0, False, True, cx - rx, cy),
+        Arc(rx, ry, 0, False, True, cx + rx, cy),
+        ClosePath(),
+    ]
+
+
+class _Extents:
+    """Accumulates the minimum and maximum coordinates of added points.
+    """
+
+    __slots__ = ("min_x", "min_y", "max_x", "max_y")
+
+    def __init__(self) -> None:
+        self.min_x = self.min_y = math.inf
+        self.max_x = self.max_y = -math.inf
+
+    def add(self, x: float, y: float) -> None:
+        if x < self.min_x:
+            self.min_x = x
+        if x > self.max_x:
+            self.max_x = x
+        if y < self.min_y:
+            self.min_y = y
+        if y > self.max_y:
+            self.max_y = y
+
+    def add_box(self, box: Optional[BoundingBox]) -> None:
+        if box is not None:
+            self.add(box.min_x, box.min_y)
+            self.add(box.max_x, box.max_y)
+
+    def result(self) -> Optional[BoundingBox]:
+        if self.min_x > self.max_x:
+            return None
+        return BoundingBox(self.min_x, self.min_y, self.max_x, self.max_y)
+
+
+def _add_points(extents: _Extents, xs: Sequence[Any], ys: Sequence[Any], m: Matrix) -> None:
+    if not xs:
+        return
+    if m.b == 0 and m.c == 0:
+        # Scaling and translation keep the extreme points extreme.
+        extents.add(m.a * min(xs) + m.e, m.d * min(ys) + m.f)
+        extents.add(m.a * max(xs) + m.e, m.d * max(ys) + m.f)
+        return
+    for x, y in zip(xs, ys):
+        extents.add(m.a * x + m.c * y + m.e, m.b * x + m.d * y + m.f)
+
+
+def _add_path(extents: _Extents, commands: list[PathData], m: Matrix) -> None:
+    """Add to the extents all points of the absolute path commands.
+    """
+    x: Any = 0
+    y: Any = 0
+    start_x: Any = 0
+    start_y: Any = 0
+    a, b, c, d, e, f = _coefficients(m)
+    for command in commands:
+        if isinstance(command, ClosePath):
+            x, y = start_x, start_y
+            continue
+        end_x = float(command.x)  # type: ignore[attr-defined]
+        end_y = float(command.y)  # type: ignore[attr-defined]
+        extents.add(a * end_x + c * end_y + e, b * end_x + d * end_y + f)
+        if isinstance(command, MoveTo):
+            start_x, start_y = end_x, end_y
+        elif isinstance(command, CubicBezier):
+            points = [
+                (a * px + c * py + e, b * px + d * py + f) for px, py in (
+                    (x, y),
+                    (float(command.x1), float(command.y1)),
+                    (float(command.x2), float(command.y2)),
+                    (end_x, end_y),
+                )
+            ]
+            _add_bezier_extrema(extents, points)
+        elif isinstance(command, QuadraticBezier):
+            points = [
+                (a * px + c * py + e, b * px + d * py + f) for px, py in (
+                    (x, y), (float(command.x1), float(command.y1)), (end_x, end_y),
+                )
+            ]
+            _add_bezier_extrema(extents, points)
+        elif isinstance(command, Arc):
+            _add_arc_extrema(extents, x, y, command, m)
+        x, y = end_x, end_y
+
+
+def _coefficients(m: Matrix) -> Tuple[float, float, float, float, float, float]:
+    return float(m.a), float(m.b), float(m.c), float(m.d), float(m.e), float(m.f)
+
+
+def _add_bezier_extrema(extents: _Extents, points: list[tuple[float, float]]) -> None:
+    """Add the points where the quadratic or cubic curve turns along either axis.
+    """
+    for axis in (0, 1):
+        p = [point[axis] for point in points]
+        # The coefficients of the derivative (divided by the curve order).
+        if len(p) == 4:
+            roots = _quadratic_roots(
+                -p[0] + 3 * p[1] - 3 * p[2] + p[3],
+                2 * (p[0] - 2 * p[1] + p[2]),
+                p[1] - p[0],
+            )
+        else:
+            roots = _quadratic_roots(0, p[0] - 2 * p[1] + p[2], p[1] - p[0])
+        for t in roots:
+            if 0 < t < 1:
+                extents.add(*_bezier_point(points, t))
+
+
+def _bezier_point(points: list[tuple[float, float]], t: float) -> tuple[float, float]:
+    """De Casteljau's algorithm.
+    """
+    while len(points) > 1:
+        points = [
+            (p0[0] + (p1[0] - p0[0]) * t, p0[1] + (p1[1] - p0[1]) * t)
+            for p0, p1 in zip(points, points[1:])
+        ]
+    return points[0]
+
+
+def _quadratic_roots(a: float, b: float, c: float) -> list[float]:
+    """Real roots of `a*t^2 + b*t + c = 0`.
+    """
+    if a == 0:
+        return [-c / b] if b else []
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return []
+    # Avoid the loss of precision when b is much bigger than a.
+    q = -0.5 * (b + math.copysign(math.sqrt(disc), b))
+    if q == 0:
+        return [0.0]
+    return [q / a, c / q]
+
+
+_ArcCenter = Tuple[float, float, float, float, float, float, float]
+
+
+def _arc_center(x1: float, y1: float, arc: Arc) -> Optional[_ArcCenter]:
+    """Convert the endpoint parametrization of an arc into the center one.
+
+    Returns the center, the radii (corrected to be big enough), the rotation angle,
+    the start angle, and the sweep angle, all angles in radians.
+    None is returned if the arc is drawn as a straight line or not drawn at all.
+
+    https://www.w3.org/TR/SVG2/implnote.html#ArcConversionEndpointToCenter
+    """
+    x2, y2 = float(arc.x), float(arc.y)
+    rx = abs(float(arc.rx))
+    ry = abs(float(arc.ry))
+    if (x1 == x2 and y1 == y2) or not rx or not ry:
+        return None
+    phi = math.radians(arc.angle)
+    cos = math.cos(phi)
+    sin = math.sin(phi)
+    dx = (x1 - x2) / 2
+    dy = (y1 - y2) / 2
+    x1p = cos * dx + sin * dy
+    y1p = -sin * dx + cos * dy
+    scale = x1p * x1p / (rx * rx) + y1p * y1p / (ry * ry)
+    if scale > 1:
+        rx *= math.sqrt(scale)
+        ry *= math.sqrt(scale)
+    num = rx * rx * ry * ry - rx * rx * y1p * y1p - ry * ry * x1p * x1p
+    den = rx * rx * y1p * y1p + ry * ry * x1p * x1p
+    coef = math.sqrt(max(0.0, num / den))
+    if bool(arc.large_arc) == bool(arc.sweep):
+        coef = -coef
+    cxp = coef * rx * y1p / ry
+    cyp = -coef * ry * x1p / rx
+    cx = cos * cxp - sin * cyp + (x1 + x2) / 2
+    cy = sin * cxp + cos * cyp + (y1 + y2) / 2
+    theta = math.atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    end = math.atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx)
+    delta = end - theta
+    if arc.sweep and delta < 0:
+        delta += 2 * math.pi
+    elif not arc.sweep and delta > 0:
+        delta -= 2 * math.pi
+    return cx, cy, rx, ry, phi, theta, delta
+
+
+def _add_arc_extrema(extents: _Extents, x: float, y: float, arc: Arc, m: Matrix) -> None:
+    center = _arc_center(x, y, arc)
+    if center is None:
+        return
+    cx, cy, rx, ry, phi, theta, delta = center
+    # The point at angle t is `center + u * cos(t) + v * sin(t)`,
+    # and it stays so after an affine transformation.
+    a, b, c, d, e, f = _coefficients(m)
+    ux, uy = rx * math.cos(phi), rx * math.sin(phi)
+    vx, vy = -ry * math.sin(phi), ry * math.cos(phi)
+    ux, uy = a * ux + c * uy, b * ux + d * uy
+    vx, vy = a * vx + c * vy, b * vx + d * vy
+    cx, cy = a * cx + c * cy + e, b * cx + d * cy + f
+    for u, v in ((ux, vx), (uy, vy)):
+        extremum = math.atan2(v, u)
+        for t in (extremum, extremum + math.pi):
+            if _in_arc(t, theta, delta):
+                extents.add(cx + ux * math.cos(t) + vx * math.sin(t), cy + uy * math.cos(t) + vy * math.sin(t))
+
+
+def _in_arc(t: float, theta: float, delta: float) -> bool:
+    if delta >= 0:
+        return (t - theta) % (2 * math.pi) <= delta
+    return (theta - t) % (2 * math.pi) <= -delta
+
+
+class _LengthTable:
+    """The path flattened into a polyline, with the path length at each vertex.
+
+    A MoveTo adds a vertex with the same length as the previous one.
+    """
+
+    __slots__ = ("xs", "ys", "lengths")
+
+    def __init__(self) -> None:
+        self.xs = array("d")
+        self.ys = array("d")
+        self.lengths = array("d")
+
+    def move(self, x: float, y: float) -> None:
+        self.xs.append(x)
+        self.ys.append(y)
+        self.lengths.append(self.lengths[-1] if self.lengths else 0.0)
+
+    def line(self, x: float, y: float) -> None:
+        length = math.hypot(x - self.xs[-1], y - self.ys[-1])
+        self.xs.append(x)
+        self.ys.append(y)
+        self.lengths.append(self.lengths[-1] + length)
+
+    @property
+    def total(self) -> float:
+        return self.lengths[-1] if self.lengths else 0.0
+
+    def point(self, distance: float) -> Point:
+        if not self.lengths:
+            raise ValueError("the path is empty")
+        distance = float(distance)
+        index = bisect_left(self.lengths, distance)
+        if index == 0:
+            return Point(self.xs[0], self.ys[0])
+        if index == len(self.lengths):
+            return Point(self.xs[-1], self.ys[-1])
+        start = self.lengths[index - 1]
+        ratio = (distance - start) / (self.lengths[index] - start)
+        x0, y0 = self.xs[index - 1], self.ys[index - 1]
+        return Point(x0 + (self.xs[index] - x0) * ratio, y0 + (self.ys[index] - y0) * ratio)
+
+
+def path_length(path: Union[Path, _PathLike], tolerance: float = _TOLERANCE) -> float:
+    """The total length of the path, like `getTotalLength()` in browsers.
+
+    Curves and arcs are flattened into lines that deviate from the curve
+    no more than `tolerance` (in user units). For a `Path` element,
+    the flattened path is cached, see `bounding_box` for when the cache is dropped.
+    """
+    return _length_table(path, tolerance).total
+
+
+def point_at_length(
+    path: Union[Path, _PathLike], distance: float, tolerance: float = _TOLERANCE,
+) -> Point:
+    """The point at the given distance along the path, like `getPointAtLength()`.
+
+    The distance is clamped to the path length. Each call on the same `Path` element
+    is a binary search over the cached flattened path.
+    Raises ValueError if the path is empty.
+    """
+    return _length_table(path, tolerance).point(distance)
+
+
+def _length_table(path: Union[Path, _PathLike], tolerance: float) -> _LengthTable:
+    if not isinstance(path, Path):
+        return _flatten(_to_commands(path), tolerance)
+    cache = path.__dict__.setdefault("_cached_geometry", {})
+    cached = cache.get("lengths")
+    if cached is not None and cached[0] == tolerance:
+        return cached[1]
+    table = _flatten(_to_commands(path.d), tolerance)
+    cache["lengths"] = (tolerance, table)
+    return table
+
+
+def _flatten(commands: list[PathData], tolerance: float) -> _LengthTable:
+    table = _LengthTable()
+    x: Any = 0
+    y: Any = 0
+    start_x: Any = 0
+    start_y: Any = 0
+    for command in commands:
+        if not table.lengths and not isinstance(command, MoveTo):
+            table.move(x, y)
+        if isinstance(command, ClosePath):
+            table.line(start_x, start_y)
+            x, y = start_x, start_y
+            continue
+        end_x = float(command.x)  # type: ignore[attr-defined]
+        end_y = float(command.y)  # type: ignore[attr-defined]
+        if isinstance(command, MoveTo):
+            table.move(end_x, end_y)
+            start_x, start_y = end_x, end_y
+        elif isinstance(command, CubicBezier):
+            control1 = (float(command.x1), float(command.y1))
+            control2 = (float(command.x2), float(command.y2))
+            _flatten_bezier(table, [(x, y), control1, control2, (end_x, end_y)], tolerance)
+        elif isinstance(command, QuadraticBezier):
+            _flatten_bezier(table, [(x, y), (float(command.x1), float(command.y1)), (end_x, end_y)], tolerance)
+        elif isinstance(command, Arc):
+            _flatten_arc(table, x, y, command, tolerance)
+        else:
+            table.line(end_x, end_y)
+        x, y = end_x, end_y
+    return table
+
+
+def _flatten_bezier(table: _LengthTable, points: list[tuple[float, float]], tolerance: float) -> None:
+    """Add lines approximating the curve, splitting it in half until it is flat enough.
+    """
+    stack = [(points, 0)]
+    while stack:
+        points, depth = stack.pop()
+        if depth >= _MAX_DEPTH or _is_flat(points, tolerance):
+            table.line(*points[-1])
+            continue
+        left, right = _split_bezier(points)
+        # The stack is LIFO: push the second half first.
+        stack.append((right, depth + 1))
+        stack.append((left, depth + 1))
+
+
+def _is_flat(points: list[tuple[float, float]], tolerance: float) -> bool:
+    """Check if all control points are close enough to the chord.
+
+    The curve lies within the convex hull of its control points,
+    so it's no further from the chord than they are. The distance is measured
+    to the chord segment, not to its line: a control point on the line
+    but beyond the ends makes the curve go past them and back.
+    """
+    (x0, y0), (x1, y1) = points[0], points[-1]
+    dx = x1 - x0
+    dy = y1 - y0
+    squared = dx * dx + dy * dy
+    for px, py in points[1:-1]:
+        # The closest point of the segment to the control point.
+        t = 0.0
+        if squared:
+            t = min(max(((px - x0) * dx + (py - y0) * dy) / squared, 0.0), 1.0)
+        if math.hypot(px - x0 - t * dx, py - y0 - t * dy) > tolerance:
+            return False
+    return True
+
+
+def _split_bezier(points: list[tuple[float, float]]) -> tuple[list[tuple[float, float]], list[tuple[float, float]]]:
+    """Split the curve at t=0.5 using De Casteljau's algorithm.
+    """
+    left = [points[0]]
+    right = [points[-1]]
+    while len(points) > 1:
+        points = [
+            ((p0[0] + p1[0]) / 2, (p0[1] + p1[1]) / 2)
+            for p0, p1 in zip(points, points[1:])
+        ]
+        left.append(points[0])
+        right.append(points[-1])
+    right.reverse()
+    return left, right
+
+
+def _flatten_arc(table: _LengthTable, x: float, y: float, arc: Arc, tolerance: float) -> None:
+    end_x, end_y = float(arc.x), float(arc.y)
+    center = _arc_center(x, y, arc)
+    if center is None:
+        if x != end_x or y != end_y:
+            table.line(end_x, end_y)
+        return
+    cx, cy, rx, ry, phi, theta, delta = center
+    # The sagitta of a chord spanning the angle `step` is `r * (1 - cos(step / 2))`.
+    radius = max(rx, ry)
+    step = 2 * math.acos(max(-1.0, 1 - tolerance / radius))
+    count = max(1, math.ceil(abs(delta) / step))
+    cos_phi = math.cos(phi)
+    sin_phi = math.sin(phi)
+    for i in range(1, count):
+        t = theta + delta * i / count
+        cos_t = math.cos(t)
+        sin_t = math.sin(t)
+        table.line(
+            cx + rx * cos_phi * cos_t - ry * sin_phi * sin_t,
+            cy + rx * sin_phi * cos_t + ry * cos_phi * sin_t,
+        )
+    table.line(end_x, end_y)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from collections import Counter
+from decimal import Decimal
+from itertools import count
+from typing import Dict, Iterator, Tuple
+
+from ._formatters import format_value
+from .elements import (
+    Circle, Element, Ellipse, G, Image, Line, Path, Polygon, Polyline, Rect,
+    Style, Text, TextPath, TSpan, Use,
+)
+
+
+# Elements where the attributes below are presentation attributes.
+# For example, `fill` of animation elements means something else.
+_ELEMENTS = (
+    G, Path, Rect, Circle, Ellipse, Line, Polyline, Polygon,
+    Text, TSpan, TextPath, Use, Image,
+)
+# Presentation attributes that have the same syntax as CSS properties.
+_PROPERTIES = (
+    "clip_path", "clip_rule", "color", "cursor", "display", "dominant_baseline",
+    "fill", "fill_opacity", "fill_rule", "filter", "font_family", "font_size",
+    "font_style", "font_variant", "font_weight", "image_rendering",
+    "letter_spacing", "marker_end", "marker_mid", "marker_start", "mask",
+    "opacity", "paint_order", "pointer_events", "shape_rendering", "stroke",
+    "stroke_dasharray", "stroke_dashoffset", "stroke_linecap", "stroke_linejoin",
+    "stroke_miterlimit", "stroke_opacity", "stroke_width", "text_anchor",
+    "text_decoration", "text_rendering", "vector_effect", "visibility",
+    "word_spacing",
+)
+# Lengths that must have units in CSS, unlike in attributes.
+_LENGTHS = frozenset({"font_size", "letter_spacing", "word_spacing"})
+
+# A set of CSS declarations as (property, value) pairs.
+_Declarations = Tuple[Tuple[str, str], ...]
+
+
+def hoist_classes(root: Element) -> None:
+    """Replace sets of presentation attributes repeated on many elements with classes.
+
+    For each set of presentation attributes (like `fill`, `stroke`, and `font_size`)
+    that is used by enough elements to save space, a CSS rule with a short
+    generated class name is added into a `Style` element at the beginning
+    of `root`, and the attributes are replaced with the class.
+
+    Presentation attributes lose to any CSS rule, even to a type selector
+    in an outer document. The new rules use `:where()` with zero specificity
+    and go before the existing stylesheets, so that other rules still win.
+    """
+    declarations: Dict[int, _Declarations] = {}
+    existing_classes: set[str] = set()
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        if element.__dict__.get("class_"):
+            existing_classes.update(element.class_)  # type: ignore[attr-defined]
+        if isinstance(element, _ELEMENTS):
+            items = _declarations(element)
+            if items:
+                declarations[id(element)] = items
+        # In the document order, so that equally used sets are named in that order.
+        stack.extend(reversed([child for child in element.elements or () if isinstance(child, Element)]))
+    counts = Counter(declarations.values())
+    names = _class_names(existing_classes)
+    classes: Dict[_Declarations, str] = {}
+    rules = []
+    # The most used sets get the shortest names.
+    name = None
+    for items, total in counts.most_common():
+        if total < 2:
+            break
+        if name is None:
+            name = next(names)
+        selector = f":where(.{name})"
+        body = ";".join(f"{prop}:{value}" for prop, value in items)
+        rule = f"{selector}{{{body}}}"
+        inline = sum(len(f' {prop}="{value}"') for prop, value in items)
+        # The class attribute may already exist, then only the name is added.
+        if total * inline <= len(rule) + total * len(f' class="{name}"'):
+            continue
+        classes[items] = name
+        rules.append(rule)
+        name = None
+    if not classes:
+        return
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        items = declarations.get(id(element), ())
+        class_name = classes.get(items)
+        if class_name is not None:
+            for prop, _ in items:
+                setattr(element, prop.replace("-", "_"), None)
+            element.class_ = [*(element.__dict__.get("class_") or ()), class_name]  # type: ignore[attr-defined]
+        stack.extend(child for child in element.elements or () if isinstance(child, Element))
+    root.elements = [Style(text="".join(rules)), *(root.elements or ())]
+
+
+def _declarations(element: Element) -> _Declarations:
+    attrs = element.__dict__
+    items = []
+    for name in _PROPERTIES:
+        value = attrs.get(name)
+        if value is None:
+            continue
+        text = format_value(value)
+        if name in _LENGTHS and isinstance(value, (int, float, Decimal)):
+            text += "px"
+        # Such values would break the stylesheet.
+        if any(char in text for char in ";{}<>&\\"):
+            return ()
+        items.append((name.replace("_", "-"), text))
+    return tuple(items)
+
+
+def _class_names(existing: set[str]) -> Iterator[str]:
+    """Generate short class names that are not in use yet.
+    """
+    for index in count():
+        name = f"c{index:x}"
+        if name not in existing:
+            yield name
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Union
+
+from ._bake import _has_stylesheet
+from ._geometry import BoundingBox, _number, _shape_commands, bounding_box
+from ._parser import parse_path
+from ._path import ClosePath, LineTo, MoveTo, MoveToRel, PathBuffer, PathData
+from ._types import Point, point_columns
+from .elements import (
+    Circle, Defs, Element, Ellipse, Line, Path, Polygon, Polyline, Rect, Symbol,
+    Use,
+)
+
+
+_SHAPES = (Path, Line, Polyline, Polygon, Rect, Circle, Ellipse)
+# The attributes describing the geometry of each shape, everything else must match.
+_GEOMETRY = {
+    Path: frozenset({"d"}),
+    Line: frozenset({"x1", "y1", "x2", "y2"}),
+    Polyline: frozenset({"points"}),
+    Polygon: frozenset({"points"}),
+    Rect: frozenset({"x", "y", "width", "height", "rx", "ry"}),
+    Circle: frozenset({"cx", "cy", "r"}),
+    Ellipse: frozenset({"cx", "cy", "rx", "ry"}),
+}
+# Attributes that make the element distinguishable or depend on its bounding box.
+_UNSAFE = frozenset({
+    "id", "transform", "transform_origin", "style", "data", "extra", "tabindex",
+    "marker_start", "marker_mid", "marker_end", "pathLength",
+    "clip_path", "mask", "filter",
+})
+_PATH_FIELDS = frozenset(Path.__dataclass_fields__)
+# The inherited properties that decide if the shapes can be merged.
+_PAINT = ("fill", "stroke", "stroke_opacity")
+
+# How the merged shapes are painted.
+_STROKE = "stroke"
+_FILL = "fill"
+
+
+def merge_paths(root: Element) -> None:
+    """Replace consecutive sibling shapes that look the same with a single `Path`.
+
+    `Path`, `Line`, `Polyline`, `Polygon`, `Rect`, `Circle`, and `Ellipse`
+    elements with the same attributes (except for the geometry) are merged
+    if they have no id, transform, markers, event handlers, clip paths, masks,
+    or filters. The shapes that are only stroked are merged only if the stroke
+    is opaque, so that overlaps look the same. The shapes that are only filled
+    are merged only if they don't overlap, and shapes that are both filled
+    and stroked are never merged, because the fill of a shape can cover
+    the stroke of the previous one.
+    """
+    if _has_stylesheet(root):
+        return
+    referenced = _referenced_ids(root)
+    # For each container: the values of inherited paint properties and
+    # if the properties may come from somewhere else.
+    stack: list[tuple[Element, Dict[str, Any], bool]] = [(root, {}, False)]
+    while stack:
+        parent, inherited, unknown = stack.pop()
+        attrs = parent.__dict__
+        if isinstance(parent, (Defs, Symbol)) or attrs.get("id") in referenced:
+            unknown = True
+        elif attrs.get("style"):
+            unknown = True
+        own = {name: attrs[name] for name in _PAINT if attrs.get(name) is not None}
+        if own:
+            inherited = {**inherited, **own}
+        if not parent.elements or parent.text:
+            continue
+        if not unknown:
+            _merge_children(parent, inherited)
+        for child in parent.elements:
+            if isinstance(child, Element) and child.elements:
+                stack.append((child, inherited, unknown))
+
+
+def _referenced_ids(root: Element) -> set[str]:
+    result = set()
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        if isinstance(element, Use) and element.href and element.href.startswith("#"):
+            result.add(element.href[1:])
+        stack.extend(child for child in element.elements or () if isinstance(child, Element))
+    return result
+
+
+class _Run:
+    """Consecutive shapes that can be merged together.
+    """
+
+    def __init__(self, element: Element, attrs: dict[str, Any], mode: str, box: Optional[BoundingBox]) -> None:
+        self.elements = [element]
+        self.attrs = attrs
+        self.mode = mode
+        self.box = box
+
+    def add(self, element: Element, attrs: dict[str, Any], mode: str, box: Optional[BoundingBox]) -> bool:
+        if mode != self.mode or attrs != self.attrs:
+            return False
+        if mode == _FILL:
+            assert box is not None and self.box is not None
+            if _overlap(box, self.box):
+                return False
+            self.box = self.box.union(box)
+        self.elements.append(element)
+        return True
+
+
+def _merge_children(parent: Element, inherited: Dict[str, Any]) -> None:
+    result: list[Any] = []
+    run: Optional[_Run] = None
+    changed = False
+    for child in parent.elements or ():
+        info = _mergeable(child, inherited)
+        if info is not None and run is not None and run.add(child, *info):
+            continue
+        if run is not None:
+            changed |= _flush(run, result)
+        run = None
+        if info is not None:
+            run = _Run(child, *info)
+        else:
+            result.append(child)
+    if run is not None:
+        changed |= _flush(run, result)
+    if changed:
+        parent.elements = result
+
+
+def _flush(run: _Run, result: list[Any]) -> bool:
+    if len(run.elements) == 1:
+        result.append(run.elements[0])
+        return False
+    result.append(Path(d=_concat([_path_data(e) for e in run.elements]), **run.attrs))
+    return True
+
+
+def _mergeable(element: Any, inherited: Dict[str, Any]) -> Optional[tuple[dict[str, Any], str, Optional[BoundingBox]]]:
+    """The attributes of the merged path, the paint mode, and the bounding box.
+
+    Returns None if the element cannot be merged with anything.
+    """
+    if not isinstance(element, _SHAPES) or element.elements or element.text:
+        return None
+    geometry = _GEOMETRY[type(element)]
+    attrs = {}
+    for name, value in element.__dict__.items():
+        if name.startswith("_") or value is None or name in geometry:
+            continue
+        if name in _UNSAFE or name.startswith("on") or name not in _PATH_FIELDS:
+            return None
+        attrs[name] = value
+    paint = {**inherited, **{name: attrs[name] for name in _PAINT if name in attrs}}
+    fill = paint.get("fill", "black")
+    stroke = paint.get("stroke", "none")
+    # The fill of a line is never visible.
+    filled = fill != "none" and not isinstance(element, Line)
+    stroked = stroke != "none"
+    try:
+        if not _renders(element):
+            return None
+        if filled and stroked:
+            return None
+        if filled:
+            box = bounding_box(element)
+            if box is None or not _is_plain_color(fill):
+                return None
+            return attrs, _FILL, box
+    except ValueError:
+        # Lengths in units other than px.
+        return None
+    if stroked:
+        if not _is_plain_color(stroke) or not _is_opaque(stroke):
+            return None
+        opacity = attrs.get("opacity", 1)
+        if opacity != 1 or paint.get("stroke_opacity", 1) != 1:
+            return None
+    return attrs, _STROKE, None
+
+
+def _renders(element: Element) -> bool:
+    """Check if the shape is rendered, so that it doesn't render as a path either.
+
+    For example, a rect with zero width is not rendered but its stroke
+    would be rendered for the path of the same rect.
+    """
+    if isinstance(element, Path):
+        d = element.d
+        if isinstance(d, str):
+            d = parse_path(d)
+        if isinstance(d, PathBuffer):
+            return len(d.commands) > 0 and d.commands[0] in b"Mm"
+        if not d:
+            return False
+        return isinstance(d[0], (MoveTo, MoveToRel))
+    if isinstance(element, (Polyline, Polygon)):
+        # A single point is not rendered, and neither is a moveto alone.
+        points = element.points
+        return points is not None and len(point_columns(points)[0]) >= 2
+    if isinstance(element, Rect):
+        return _positive(element.width) and _positive(element.height)
+    if isinstance(element, Circle):
+        return _positive(element.r)
+    if isinstance(element, Ellipse):
+        # If one of the radii is not specified, it's "auto".
+        return element.rx is not None and element.ry is not None and _positive(element.rx) and _positive(element.ry)
+    return True
+
+
+def _positive(value: Any) -> bool:
+    return value is not None and _number(value) > 0
+
+
+def _is_plain_color(paint: Any) -> bool:
+    # Gradients and patterns depend on the bounding box,
+    # and `currentColor` on the `color` property that is not checked here.
+    if not isinstance(paint, str):
+        return False
+    paint = paint.strip().lower()
+    return not paint.startswith("url(") and paint not in ("currentcolor", "context-fill", "context-stroke")
+
+
+def _is_opaque(color: str) -> bool:
+    color = color.strip().lower()
+    if color == "transparent" or "/" in color or color.startswith(("rgba", "hsla")):
+        return False
+    # #rgba and #rrggbbaa.
+    return not (color.startswith("#") and len(color) in (5, 9))
+
+
+def _overlap(a: BoundingBox, b: BoundingBox) -> bool:
+    # Boxes that only touch don't overlap.
+    return a.min_x < b.max_x and b.min_x < a.max_x and a.min_y < b.max_y and b.min_y < a.max_y
+
+
+def _path_data(element: Element) -> Union[list[PathData], PathBuffer]:
+    if isinstance(element, Path):
+        d = element.d
+        return parse_path(d) if isinstance(d, str) else d  # type: ignore[return-value]
+    if isinstance(element, (Polyline, Polygon)):
+        points = element.points
+        commands: list[PathData] = []
+        if points is not None:
+            if isinstance(points, list) and points and isinstance(points[0], Point):
+                pairs: Any = [(p.x, p.y) for p in points]
+            else:
+                pairs = zip(*point_columns(points))
+            for x, y in pairs:
+                commands.append(LineTo(x, y) if commands else MoveTo(x, y))
+        if isinstance(element, Polygon) and commands:
+            commands.append(ClosePath())
+        return commands
+    return _shape_commands(element)
+
+
+def _concat(paths: list[Union[list[PathData], PathBuffer]]) -> Union[list[PathData], PathBuffer]:
+    """Join the path data, keeping it in a PathBuffer if there is one.
+
+    The first moveto in path data is always absolute, even if it is "m".
+    Empty path data is skipped.
+    """
+    if not any(isinstance(path, PathBuffer) for path in paths):
+        result: list[PathData] = []
+        for path in paths:
+            assert isinstance(path, list)
+            if not path:
+                continue
+            first = path[0]
+            if isinstance(first, MoveToRel):
+                result.append(MoveTo(first.dx, first.dy))
+                result.extend(path[1:])
+            else:
+                result.extend(path)
+        return result
+    buffer = PathBuffer()
+    for path in paths:
+        if not isinstance(path, PathBuffer):
+            path = PathBuffer.from_path_data(path)
+        start = len(buffer.commands)
+        buffer.commands.extend(path.commands)
+        buffer.coords.extend(path.coords)
+        if path.commands and buffer.commands[start] == ord("m"):
+            buffer.commands[start] = ord("M")
+    return buffer
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional, Tuple, Union
+
+from ._formatters import NumberFormat, get_number_format
+from ._parser import parse_path
+from ._path import (
+    Arc, ClosePath, CubicBezier, LineTo, MoveTo, PathBuffer, PathData,
+    QuadraticBezier, _without_decimals, to_absolute,
+)
+
+
+# The tolerance for comparing coordinates that went through arithmetic.
+_EPSILON = 1e-9
+# Command letters that can be omitted after the given one.
+_IMPLICIT = {"M": "L", "m": "l"}
+
+_Candidate = Tuple[str, List[Any]]
+
+
+def _same(a: Any, b: Any) -> bool:
+    return abs(a - b) <= _EPSILON * max(1.0, abs(a), abs(b))
+
+
+def minify_path(
+    d: Union[list[PathData], PathBuffer, str],
+    number_format: Optional[NumberFormat] = None,
+) -> str:
+    """Convert the path data into the shortest `d` attribute value.
+
+    For each command, the shortest of the absolute and relative forms is used.
+    Lines are converted into horizontal and vertical lines when possible,
+    curves into smooth curves if the control point is a reflection of the previous
+    one, repeated command letters are omitted, and zero-length segments are removed
+    (except a subpath consisting of a single zero-length segment, which renders a dot
+    with round line caps). The result can be directly used as `Path.d`.
+
+    The numbers are formatted using the given `NumberFormat`, the active one,
+    or the default one, in that order. If the format has `precision`,
+    all coordinates are rounded before calculating relative coordinates,
+    so that the rounding errors don't accumulate along the path.
+    """
+    if isinstance(d, str):
+        d = parse_path(d)
+    elif isinstance(d, PathBuffer):
+        d = d.to_path_data()
+    if number_format is None:
+        number_format = get_number_format() or NumberFormat()
+    commands = to_absolute([_without_decimals(command) for command in d])
+    precision = number_format.precision
+    if precision is not None:
+        commands = [_round(command, precision) for command in commands]
+    return _Encoder(number_format).encode(commands, _drawn_subpaths(commands))
+
+
+def _round(command: PathData, precision: int) -> PathData:
+    if isinstance(command, ClosePath):
+        return command
+    args = [getattr(command, name) for name in command.field_names()]
+    if isinstance(command, Arc):
+        args[:3] = [round(arg, precision) for arg in args[:3]]
+        args[5:] = [round(arg, precision) for arg in args[5:]]
+    else:
+        args = [round(arg, precision) for arg in args]
+    return type(command)(*args)
+
+
+def _is_zero_length(command: PathData, x: Any, y: Any) -> bool:
+    """Check if the segment starting at (x, y) doesn't move the pen anywhere.
+    """
+    if isinstance(command, (MoveTo, ClosePath)):
+        return False
+    points = [(command.x, command.y)]  # type: ignore[attr-defined]
+    if isinstance(command, CubicBezier):
+        points += [(command.x1, command.y1), (command.x2, command.y2)]
+    elif isinstance(command, QuadraticBezier):
+        points.append((command.x1, command.y1))
+    return all(_same(px, x) and _same(py, y) for px, py in points)
+
+
+def _drawn_subpaths(commands: list[PathData]) -> set[int]:
+    """Indices of MoveTo commands starting subpaths that draw something.
+    """
+    result = set()
+    start = -1
+    x: Any = 0
+    y: Any = 0
+    start_x: Any = 0
+    start_y: Any = 0
+    for i, command in enumerate(commands):
+        if isinstance(command, MoveTo):
+            start = i
+            start_x, start_y = command.x, command.y
+        elif isinstance(command, ClosePath):
+            if not (_same(x, start_x) and _same(y, start_y)):
+                result.add(start)
+        elif not _is_zero_length(command, x, y):
+            result.add(start)
+        if isinstance(command, ClosePath):
+            x, y = start_x, start_y
+        else:
+            x, y = command.x, command.y  # type: ignore[attr-defined]
+    return result
+
+
+class _Encoder:
+    """Accumulates the shortest text representation of absolute path commands.
+    """
+
+    def __init__(self, number_format: NumberFormat) -> None:
+        self.number_format = number_format
+        self.parts: list[str] = []
+        self.letter = ""
+        self.last = ""
+
+    def encode(self, commands: list[PathData], drawn: set[int]) -> str:
+        x: Any = 0
+        y: Any = 0
+        start_x: Any = 0
+        start_y: Any = 0
+        # the previous curve, for reflecting its last control point
+        prev: Optional[PathData] = None
+        drawn_subpath = False
+        dot_kept = False
+        for i, command in enumerate(commands):
+            if isinstance(command, MoveTo):
+                drawn_subpath = i in drawn
+                dot_kept = False
+            elif _is_zero_length(command, x, y):
+                # Keep the segment if it is the only thing the subpath renders.
+                if drawn_subpath or dot_kept:
+                    continue
+                dot_kept = True
+            self._emit(self._candidates(command, prev, x, y))
+            prev = command
+            if isinstance(command, MoveTo):
+                start_x, start_y = command.x, command.y
+            if isinstance(command, ClosePath):
+                x, y = start_x, start_y
+            else:
+                x, y = command.x, command.y  # type: ignore[attr-defined]
+        return "".join(self.parts)
+
+    def _candidates(
+        self, command: PathData, prev: Optional[PathData], x: Any, y: Any,
+    ) -> list[_Candidate]:
+        if isinstance(command, ClosePath):
+            return [("Z", [])]
+        ex, ey = command.x, command.y  # type: ignore[attr-defined]
+        if isinstance(command, MoveTo):
+            return self._pair("M", [ex, ey], [ex - x, ey - y])
+        if isinstance(command, LineTo):
+            if _same(ey, y):
+                return self._pair("H", [ex], [ex - x])
+            if _same(ex, x):
+                return self._pair("V", [ey], [ey - y])
+            return self._pair("L", [ex, ey], [ex - x, ey - y])
+        if isinstance(command, CubicBezier):
+            x1, y1 = x, y
+            if isinstance(prev, CubicBezier):
+                x1, y1 = 2 * x - prev.x2, 2 * y - prev.y2
+            rel = [command.x2 - x, command.y2 - y, ex - x, ey - y]
+            if _same(command.x1, x1) and _same(command.y1, y1):
+                return self._pair("S", [command.x2, command.y2, ex, ey], rel)
+            return self._pair(
+                "C",
+                [command.x1, command.y1, command.x2, command.y2, ex, ey],
+                [command.x1 - x, command.y1 - y, *rel],
+            )
+        if isinstance(command, QuadraticBezier):
+            x1, y1 = x, y
+            if isinstance(prev, QuadraticBezier):
+                x1, y1 = 2 * x - prev.x1, 2 * y - prev.y1
+            if _same(command.x1, x1) and _same(command.y1, y1):
+                return self._pair("T", [ex, ey], [ex - x, ey - y])
+            return self._pair(
+                "Q",
+                [command.x1, command.y1, ex, ey],
+                [command.x1 - x, command.y1 - y, ex - x, ey - y],
+            )
+        assert isinstance(command, Arc)
+        head = [command.rx, command.ry, command.angle, command.large_arc, command.sweep]
+        return self._pair("A", head + [ex, ey], head + [ex - x, ey - y])
+
+    def _pair(self, letter: str, absolute: list[Any], relative: list[Any]) -> list[_Candidate]:
+        precision = self.number_format.precision
+        if precision is not None:
+            relative = [
+                arg if isinstance(arg, bool) else round(arg, precision)
+                for arg in relative
+            ]
+        return [(letter, absolute), (letter.lower(), relative)]
+
+    def _emit(self, candidates: list[_Candidate]) -> None:
+        best: list[str] = []
+        best_letter = ""
+        for letter, args in candidates:
+            tokens = [self._format(arg) for arg in args]
+            if self.letter == letter and letter not in "MmZz" or _IMPLICIT.get(self.letter) == letter:
+                tokens.insert(0, "")
+            else:
+                tokens.insert(0, letter)
+            encoded = self._join(self.last, tokens)
+            if not best_letter or len("".join(encoded)) < len("".join(best)):
+                best = encoded
+                best_letter = letter
+        self.parts.extend(best)
+        self.letter = best_letter
+        self.last = best[-1] or self.last
+
+    def _format(self, arg: Any) -> str:
+        if isinstance(arg, bool):
+            return "1" if arg else "0"
+        return self.number_format.format(arg)
+
+    @staticmethod
+    def _join(last: str, tokens: list[str]) -> list[str]:
+        """Join tokens inserting separators only where required.
+
+        The first token is the command letter, empty if the letter is omitted.
+        """
+        result = [tokens[0]]
+        if tokens[0]:
+            last = tokens[0]
+        for token in tokens[1:]:
+            if last and not last[-1].isalpha() and not _glues(last, token):
+                result.append(" ")
+            result.append(token)
+            last = token
+        return result
+
+
+def _glues(last: str, token: str) -> bool:
+    """Check if the number token can go right after the previous one without a separator.
+    """
+    if token[0] == "-":
+        return True
+    return token[0] == "." and "." in last and "e" not in last
@@ -0,0 +1,461 @@
+from __future__ import annotations
+
+import time
+from array import array
+from dataclasses import dataclass, fields, is_dataclass, replace
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+from ._bake import _animated_ids, _has_stylesheet, _is_animated, bake_transforms
+from ._dedupe import dedupe_subtrees
+from ._formatters import get_number_format
+from ._hoist import hoist_classes
+from ._merge import merge_paths
+from ._path import PathBuffer, PathData
+from ._types import Length, to_float_array
+from .elements import (
+    _CONTENT_FIELDS, Circle, Defs, Element, Ellipse, G, Image, Line, Path,
+    Polygon, Polyline, Rect, Symbol, Text, Use,
+)
+
+
+Pass = Callable[[Element], None]
+
+# Optimization passes by name, see `register_pass`.
+_passes: Dict[str, Pass] = {}
+# Names of the passes that change the output visibly, not run by default.
+_lossy: set[str] = set()
+
+# Used by `round_numbers` if there is no active NumberFormat with precision.
+_DEFAULT_PRECISION = 3
+
+# Initial values of inherited properties. An attribute with such a value
+# can be dropped only if no ancestor sets the property to something else.
+_INHERITED_DEFAULTS: Dict[str, Any] = {
+    "clip_rule": "nonzero",
+    "color_interpolation": "sRGB",
+    "cursor": "auto",
+    "direction": "ltr",
+    "fill_opacity": 1,
+    "fill_rule": "nonzero",
+    "font_style": "normal",
+    "font_variant": "normal",
+    "font_weight": "normal",
+    "image_rendering": "auto",
+    "letter_spacing": "normal",
+    "marker_end": "none",
+    "marker_mid": "none",
+    "marker_start": "none",
+    "paint_order": "normal",
+    "pointer_events": "visiblePainted",
+    "shape_rendering": "auto",
+    "stroke": "none",
+    "stroke_dasharray": "none",
+    "stroke_dashoffset": 0,
+    "stroke_linecap": "butt",
+    "stroke_linejoin": "miter",
+    "stroke_miterlimit": 4,
+    "stroke_opacity": 1,
+    "stroke_width": 1,
+    "text_anchor": "start",
+    "text_rendering": "auto",
+    "visibility": "visible",
+    "word_spacing": "normal",
+}
+# All inherited properties.
+_INHERITED = frozenset(_INHERITED_DEFAULTS) | {
+    "color", "dominant_baseline", "fill", "font_family", "font_size",
+    "font_size_adjust", "lang", "writing_mode",
+}
+# Initial values of properties that are not inherited.
+_DEFAULTS: Dict[str, Any] = {
+    "alignment_baseline": "auto",
+    "clip_path": "none",
+    "display": "inline",
+    "filter": "none",
+    "mask": "none",
+    "opacity": 1,
+    "stop_opacity": 1,
+    "text_decoration": "none",
+    "unicode_bidi": "normal",
+    "vector_effect": "none",
+}
+# Default values of geometry attributes of specific elements.
+_GEOMETRY_DEFAULTS: Dict[type, Dict[str, Any]] = {
+    Rect: {"x": 0, "y": 0},
+    Image: {"x": 0, "y": 0},
+    Use: {"x": 0, "y": 0},
+    Circle: {"cx": 0, "cy": 0},
+    Ellipse: {"cx": 0, "cy": 0},
+    Line: {"x1": 0, "y1": 0, "x2": 0, "y2": 0},
+}
+# Elements that a group with a single child can be merged into.
+_MERGEABLE = (G, Path, Rect, Circle, Ellipse, Line, Polyline, Polygon, Text, Use, Image)
+
+
+@dataclass
+class PassStats:
+    """How much a single optimization pass has done, see `optimize`.
+    """
+
+    name: str
+    seconds: float
+    bytes_saved: int
+
+
+def register_pass(name: str, optimizer: Pass, lossy: bool = False) -> None:
+    """Make the optimization pass available for `optimize` by the name.
+
+    The pass is a function that modifies the given element tree in place.
+    Registering a pass with the same name again replaces it.
+    Lossy passes, which may change how the document looks, are run
+    only if requested by the name.
+    """
+    _passes[name] = optimizer
+    if lossy:
+        _lossy.add(name)
+    else:
+        _lossy.discard(name)
+
+
+def optimize(
+    root: Element,
+    passes: Optional[Sequence[Union[str, Pass]]] = None,
+) -> list[PassStats]:
+    """Reduce the size of the SVG document without changing how it looks.
+
+    Modifies the tree in place, running the passes one by one. A pass is either
+    a name given to `register_pass` or the optimization function itself.
+    By default, all the built-in passes are run except for the lossy ones:
+
+    + "remove_empty_containers": remove `G` and `Defs` without children.
+    + "remove_default_attributes": remove attributes set to their default values,
+      empty strings, or empty lists.
+    + "bake_transforms": see `svg.bake_transforms`.
+    + "collapse_groups": move the attributes of groups with a single child
+      into the child and remove groups without attributes.
+    + "merge_paths": merge consecutive shapes that look the same into a single
+      `Path`, see `svg._merge.merge_paths` for when it's possible.
+    + "round_numbers": round numbers to the precision of the active `NumberFormat`,
+      or to 3 decimal places (5 for transforms). Strings are not changed.
+      It's lossy and runs only if requested.
+    + "dedupe_subtrees": move repeated subtrees into `Defs` and replace them with `Use`,
+      see `svg._dedupe.dedupe_subtrees`.
+    + "hoist_classes": replace presentation attributes repeated on many elements
+      with generated CSS classes, see `svg._hoist.hoist_classes`. It goes last
+      because other passes skip trees with stylesheets.
+
+    Returns the time taken and the size reduction of the output for each pass.
+    """
+    if passes is None:
+        passes = [name for name in _passes if name not in _lossy]
+    optimizers = []
+    for item in passes:
+        if isinstance(item, str):
+            optimizer = _passes.get(item)
+            if optimizer is None:
+                raise ValueError(f"unknown optimization pass: {item!r}")
+            optimizers.append((item, optimizer))
+        else:
+            optimizers.append((getattr(item, "__name__", repr(item)), item))
+    result = []
+    size = _size(root)
+    for name, optimizer in optimizers:
+        start = time.perf_counter()
+        optimizer(root)
+        seconds = time.perf_counter() - start
+        new_size = _size(root)
+        result.append(PassStats(name, seconds, size - new_size))
+        size = new_size
+    return result
+
+
+def _size(root: Element) -> int:
+    # Without the cache, so that the tree doesn't keep the output of every element.
+    return len(root.as_str().encode())
+
+
+def _children(element: Element) -> list[Element]:
+    if not element.elements or element.text:
+        return []
+    return [child for child in element.elements if isinstance(child, Element)]
+
+
+def remove_empty_containers(root: Element) -> None:
+    # Walk the containers bottom-up, so that groups that only have empty groups
+    # inside are removed as well.
+    containers = []
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        children = _children(element)
+        if children:
+            containers.append(element)
+            stack.extend(children)
+    for parent in reversed(containers):
+        elements = parent.elements or []
+        kept = [child for child in elements if not _is_empty(child)]
+        if len(kept) != len(elements):
+            parent.elements = kept
+
+
+def _is_empty(element: Any) -> bool:
+    if not isinstance(element, (G, Defs)) or element.elements or element.text:
+        return False
+    # A filter can draw something even for an empty group,
+    # and the group can be referenced by the id or the extra attributes.
+    if element.id is not None or getattr(element, "filter", None) is not None:
+        return False
+    return not element.extra and not element.data
+
+
+def remove_default_attributes(root: Element) -> None:
+    # CSS may set inherited properties of the ancestors, and so an attribute
+    # with the default value cannot be dropped if there is any stylesheet.
+    stylesheet = _has_stylesheet(root)
+    # For each element: the values of inherited properties set by the ancestors,
+    # and if the inherited properties may come from somewhere else.
+    stack: list[tuple[Element, Dict[str, Any], bool]] = [(root, {}, stylesheet)]
+    while stack:
+        element, inherited, unknown = stack.pop()
+        attrs = element.__dict__
+        # Content of `Defs` and elements with an id can be reused by `Use`,
+        # and then it inherits properties from the `Use` element.
+        if isinstance(element, (Defs, Symbol)) or attrs.get("id") is not None:
+            unknown = True
+        elif attrs.get("style") or attrs.get("class_"):
+            unknown = True
+        geometry = _GEOMETRY_DEFAULTS.get(type(element), {})
+        removed = []
+        for name, value in attrs.items():
+            if name.startswith("_") or name in _CONTENT_FIELDS or value is None:
+                continue
+            if getattr(type(element), name, None) is not None:
+                # Only the fields that are None by default are dropped.
+                continue
+            if value == "" or (isinstance(value, list) and not value):
+                removed.append(name)
+            elif name in _INHERITED_DEFAULTS:
+                default = _INHERITED_DEFAULTS[name]
+                if not unknown and _same(value, default) and _same(inherited.get(name, default), default):
+                    removed.append(name)
+            elif name in _DEFAULTS:
+                if _same(value, _DEFAULTS[name]):
+                    removed.append(name)
+            elif name in geometry and _same(value, geometry[name]):
+                removed.append(name)
+        for name in removed:
+            setattr(element, name, None)
+        children = _children(element)
+        if children:
+            child_inherited = inherited
+            own = {name: attrs[name] for name in _INHERITED_DEFAULTS if attrs.get(name) is not None}
+            if own:
+                child_inherited = {**inherited, **own}
+            stack.extend((child, child_inherited, unknown) for child in children)
+
+
+def _same(value: Any, default: Any) -> bool:
+    # Compare numbers with numbers and strings with strings: True == 1 but it's not a number.
+    if isinstance(value, bool):
+        return False
+    if isinstance(default, str):
+        return value == default
+    return isinstance(value, (int, float, Decimal)) and value == default
+
+
+def collapse_groups(root: Element) -> None:
+    # Selectors in the stylesheet can depend on the structure of the document.
+    if _has_stylesheet(root):
+        return
+    animated = _animated_ids(root)
+    stack = [root]
+    while stack:
+        parent = stack.pop()
+        queue = list(reversed(parent.elements or ())) if not parent.text else []
+        if not queue:
+            continue
+        result = []
+        changed = False
+        while queue:
+            child = queue.pop()
+            # Animations of the group would apply to the parent instead.
+            if isinstance(child, G) and not _is_animated(child, animated):
+                _merge_into_child(child, animated)
+                if not any(
+                    value is not None
+                    for name, value in child.__dict__.items()
+                    if name != "elements" and not name.startswith("_")
+                ):
+                    queue.extend(reversed(child.elements or ()))
+                    changed = True
+                    continue
+            result.append(child)
+            if isinstance(child, Element):
+                stack.append(child)
+        if changed:
+            parent.elements = result
+
+
+def _merge_into_child(group: G, animated_ids: set[str]) -> None:
+    """Move the attributes of the group with a single child into the child.
+    """
+    if not group.elements or len(group.elements) != 1:
+        return
+    child = group.elements[0]
+    if not isinstance(child, _MERGEABLE):
+        return
+    # Animations of the child would apply to the merged values.
+    if _is_animated(child, animated_ids):
+        return
+    attrs = {
+        name: value
+        for name, value in group.__dict__.items()
+        if name != "elements" and not name.startswith("_") and value is not None
+    }
+    child_fields = child.__dataclass_fields__
+    for name in attrs:
+        if name not in child_fields:
+            return
+        if name not in _INHERITED and name not in ("transform", "opacity"):
+            return
+    updates = {}
+    for name, value in attrs.items():
+        own = getattr(child, name)
+        if name == "transform":
+            updates[name] = [*value, *(own or ())]
+        elif name == "opacity":
+            updates[name] = value if own is None else value * own
+        elif own is None:
+            # Otherwise, the value of the child overrides the inherited one.
+            updates[name] = value
+    for name, value in updates.items():
+        setattr(child, name, value)
+    for name in attrs:
+        setattr(group, name, None)
+
+
+def round_numbers(root: Element) -> None:
+    number_format = get_number_format()
+    precision = _DEFAULT_PRECISION
+    if number_format is not None and number_format.precision is not None:
+        precision = number_format.precision
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        updates = {}
+        for name, value in element.__dict__.items():
+            if name.startswith("_") or name in _CONTENT_FIELDS or value is None:
+                continue
+            if name == "transform":
+                # Small errors in transforms are magnified by large coordinates.
+                new = _round_value(value, precision + 2)
+            else:
+                new = _round_value(value, precision)
+            if new is not value:
+                updates[name] = new
+        for name, value in updates.items():
+            setattr(element, name, value)
+        stack.extend(_children(element))
+
+
+def _round_number(value: Any, precision: int) -> Any:
+    if isinstance(value, float):
+        value = round(value, precision)
+        # Integers are formatted without the trailing ".0".
+        if value.is_integer() and abs(value) < 1e15:
+            return int(value)
+        return value
+    if isinstance(value, Decimal) and value.is_finite():
+        return round(value, precision)
+    return value
+
+
+def _round_value(value: Any, precision: int) -> Any:
+    """Round all numbers in the value. Returns the same object if nothing changes.
+    """
+    if isinstance(value, (float, Decimal)):
+        new = _round_number(value, precision)
+        return value if new == value and type(new) is type(value) else new
+    if isinstance(value, (str, int)):
+        return value
+    if isinstance(value, Length):
+        new = _round_number(value.value, precision)
+        return value if new is value.value else Length(new, value.unit)
+    if isinstance(value, PathBuffer):
+        return PathBuffer.from_path_data(_round_path(value.to_path_data(), precision))
+    if isinstance(value, list):
+        if value and isinstance(value[0], PathData):
+            return _round_path(value, precision)
+        items = [_round_value(item, precision) for item in value]
+        return value if all(a is b for a, b in zip(items, value)) else items
+    if isinstance(value, (array, memoryview)) or hasattr(value, "__array_interface__"):
+        return array("d", [round(item, precision) for item in to_float_array(value)])
+    if is_dataclass(value) and not isinstance(value, type):
+        changes = {}
+        for field in fields(value):
+            item = getattr(value, field.name)
+            new = _round_value(item, precision)
+            if new is not item:
+                changes[field.name] = new
+        return replace(value, **changes) if changes else value
+    return value
+
+
+def _round_path(path: list[PathData], precision: int) -> list[PathData]:
+    """Round the coordinates of the path data.
+
+    The relative coordinates are calculated from the rounded absolute ones,
+    so that the rounding errors don't accumulate along the path.
+    """
+    result = []
+    # The current point and the start of the subpath, exact and rounded.
+    x: Any = 0
+    y: Any = 0
+    rounded_x: Any = 0
+    rounded_y: Any = 0
+    start = (0, 0, 0, 0)
+    for item in path:
+        command = item.command
+        if command in "Zz":
+            result.append(item)
+            x, y, rounded_x, rounded_y = start
+            continue
+        relative = command.islower()
+        args = [getattr(item, name) for name in item.field_names()]
+        upper = command.upper()
+        if upper == "A":
+            # Radii and the rotation angle are not coordinates.
+            args[:3] = [_round_number(arg, precision) for arg in args[:3]]
+            axes = {5: "x", 6: "y"}
+        elif upper == "H":
+            axes = {0: "x"}
+        elif upper == "V":
+            axes = {0: "y"}
+        else:
+            axes = {i: "xy"[i % 2] for i in range(len(args))}
+        end_x, end_y, end_rounded_x, end_rounded_y = x, y, rounded_x, rounded_y
+        for i, axis in axes.items():
+            base, rounded_base = (x, rounded_x) if axis == "x" else (y, rounded_y)
+            exact = args[i] + base if relative else args[i]
+            rounded = _round_number(exact, precision)
+            args[i] = _round_number(rounded - rounded_base, precision) if relative else rounded
+            if axis == "x":
+                end_x, end_rounded_x = exact, rounded
+            else:
+                end_y, end_rounded_y = exact, rounded
+        x, y, rounded_x, rounded_y = end_x, end_y, end_rounded_x, end_rounded_y
+        if upper == "M":
+            start = (x, y, rounded_x, rounded_y)
+        result.append(type(item)(*args))
+    return result
+
+
+register_pass("remove_empty_containers", remove_empty_containers)
+register_pass("remove_default_attributes", remove_default_attributes)
+register_pass("bake_transforms", bake_transforms)
+register_pass("collapse_groups", collapse_groups)
+register_pass("merge_paths", merge_paths)
+register_pass("round_numbers", round_numbers, lossy=True)
+register_pass("dedupe_subtrees", dedupe_subtrees)
+register_pass("hoist_classes", hoist_classes)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import re
+from array import array
+from typing import List, Optional, Tuple, Union
+
+from ._path import COMMANDS, Arc, ArcRel, PathBuffer, PathData
+
+
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_SEP = r"[\s,]*"
+_COMMAND_RE = re.compile(r"([MmZzLlHhVvCcSsQqTtAa])([^MmZzLlHhVvCcSsQqTtAa]*)")
+_LETTER_RE = re.compile(r"[MmZzLlHhVvCcSsQqTtAa]")
+_NUMBER_RE = re.compile(_NUMBER)
+_SEP_RE = re.compile(_SEP)
+# Arc flags are single digits that may go without a separator: "a1 1 0 0110 10".
+_FLAG_RE = re.compile(r"[01]")
+# The positions of the flags among the arguments of an arc.
+_FLAGS = (3, 4)
+# Numbers without separators: a sign right after a number ("-1-2")
+# or a second dot ("1.5.5"). The sign in exponents goes after "e".
+_COMPACT_RE = re.compile(r"[\d.][-+]|\.\d*\.")
+# Anything that cannot be a part of commands, numbers, or separators.
+_INVALID_RE = re.compile(r"[^MmZzLlHhVvCcSsQqTtAa\d\s,.eE+-]")
+_GARBAGE_RE = re.compile(r"[^MmZzLlHhVvCcSsQqTtAa\s,]")
+_ARGS_COUNT = {command: len(cls.field_names()) for command, cls in COMMANDS.items()}
+_ARGS_COUNT["z"] = 0
+
+
+def _split(d: str, exact: bool) -> Optional[Tuple[str, List[str]]]:
+    """Split the path data into command letters and a flat list of argument tokens.
+
+    Implicitly repeated commands ("L 1 2 3 4") are expanded ("LL"),
+    so that each letter takes the number of tokens the command has arguments.
+
+    If not `exact`, arguments (except arcs) are split only by whitespace and commas,
+    which is much faster than the regex. In that case, numbers written without
+    separators ("1.5.5") end up in invalid tokens: the caller must check
+    that all tokens are valid numbers, and if not, try again with `exact`.
+    Also, None is returned if the number of arguments doesn't match.
+    """
+    invalid = _INVALID_RE.search(d)
+    if invalid is not None:
+        raise ValueError(f"unexpected character in path data: {invalid.group()!r}")
+    first = _LETTER_RE.search(d)
+    if d[:first.start() if first else len(d)].strip():
+        raise ValueError(f"path data must start with a command: {d!r}")
+    if exact:
+        # Only commands and separators may be left between the numbers.
+        garbage = _GARBAGE_RE.search(_NUMBER_RE.sub(" ", d))
+        if garbage is not None:
+            raise ValueError(f"invalid number in path data near {garbage.group()!r}")
+    letters = []
+    tokens: list[str] = []
+    for command, args in _COMMAND_RE.findall(d):
+        count = _ARGS_COUNT[command]
+        if command == "A" or command == "a":
+            new_tokens = _tokenize_arcs(command, args)
+        elif exact:
+            new_tokens = _NUMBER_RE.findall(args)
+        else:
+            new_tokens = args.replace(",", " ").split()
+        if count == 0:
+            if new_tokens:
+                if not exact:
+                    return None
+                raise ValueError(f"unexpected arguments for {command!r}: {args!r}")
+            letters.append("Z")
+            continue
+        if not new_tokens or len(new_tokens) % count:
+            if not exact:
+                return None
+            raise ValueError(f"wrong number of arguments for {command!r}: {args!r}")
+        if len(new_tokens) == count:
+            letters.append(command)
+        else:
+            letters.append(_repeated(command, len(new_tokens) // count))
+        tokens.extend(new_tokens)
+    return "".join(letters), tokens
+
+
+def _tokenize_arcs(command: str, args: str) -> List[str]:
+    """Split the arguments of arc commands into numbers and flags.
+
+    Each number is the longest one possible, as the grammar requires.
+    Raises ValueError if anything else is left between them.
+    """
+    tokens: list[str] = []
+    end = len(args)
+    pos = _SEP_RE.match(args).end()  # type: ignore[union-attr]
+    while pos < end:
+        pattern = _NUMBER_RE
+        if len(tokens) % 7 in _FLAGS:
+            pattern = _FLAG_RE
+        match = pattern.match(args, pos)
+        if match is None:
+            raise ValueError(f"invalid arguments for {command!r}: {args!r}")
+        tokens.append(match.group())
+        pos = _SEP_RE.match(args, match.end()).end()  # type: ignore[union-attr]
+    return tokens
+
+
+def _repeated(command: str, times: int) -> str:
+    """The command letters for the command with implicitly repeated arguments.
+    """
+    # Extra coordinates after "moveto" are treated as "lineto".
+    if command == "M":
+        return "M" + "L" * (times - 1)
+    if command == "m":
+        return "m" + "l" * (times - 1)
+    return command * times
+
+
+def _to_number(token: str) -> Union[int, float]:
+    if "." in token or "e" in token or "E" in token:
+        return float(token)
+    return int(token)
+
+
+def parse_path(d: str) -> list[PathData]:
+    """Parse the value of the `d` attribute into a list of path data commands.
+
+    Supports the full grammar of SVG path data, including implicitly repeated
+    commands, numbers without separators ("1.5.5", "-1-2"), exponents,
+    and arc flags without separators. Integers are parsed into int,
+    all other numbers into float. Raises ValueError if the path data is invalid.
+
+    https://www.w3.org/TR/SVG2/paths.html#PathDataBNF
+    """
+    if _COMPACT_RE.search(d) is None:
+        split = _split(d, exact=False)
+        if split is not None:
+            try:
+                return _to_path_data(*split)
+            except ValueError:
+                pass
+    split = _split(d, exact=True)
+    assert split is not None
+    return _to_path_data(*split)
+
+
+def _to_path_data(letters: str, tokens: List[str]) -> list[PathData]:
+    numbers = [_to_number(token) for token in tokens]
+    result: list[PathData] = []
+    pos = 0
+    for letter in letters:
+        cls = COMMANDS[letter]
+        count = _ARGS_COUNT[letter]
+        args = numbers[pos:pos + count]
+        pos += count
+        if cls is Arc or cls is ArcRel:
+            args[3] = bool(args[3])
+            args[4] = bool(args[4])
+        result.append(cls(*args))
+    return result
+
+
+def parse_path_buffer(d: str) -> PathBuffer:
+    """Parse the value of the `d` attribute into a PathBuffer.
+
+    The same as `parse_path` but doesn't create an object for each command,
+    which makes it faster and much more compact for big paths.
+    """
+    if _COMPACT_RE.search(d) is None:
+        split = _split(d, exact=False)
+        if split is not None:
+            try:
+                return _to_path_buffer(*split)
+            except ValueError:
+                pass
+    split = _split(d, exact=True)
+    assert split is not None
+    return _to_path_buffer(*split)
+
+
+def _to_path_buffer(letters: str, tokens: List[str]) -> PathBuffer:
+    buffer = PathBuffer()
+    buffer.coords = array("d", map(float, tokens))
+    buffer.commands.frombytes(letters.encode("ascii"))
+    return buffer
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import astuple, dataclass
-from typing import ClassVar
+from array import array
+from decimal import Decimal
+from dataclasses import dataclass, fields
+from typing import Any, ClassVar, Dict, Iterable, Iterator, Tuple, Type
 
-from ._types import Number
+from ._formatters import (
+    NumberFormat, compact_numbers, format_number, get_number_format,
+    register_formatter,
+)
+from ._types import Number, to_float_array
 
 
 @dataclass
@@ -12,13 +18,25 @@ class PathData:
     https://developer.mozilla.org/en-US/docs/Web/SVG/Attribute/d
     """
     command: ClassVar[str]
+    _field_names: ClassVar[Tuple[str, ...]]
+
+    @classmethod
+    def field_names(cls) -> Tuple[str, ...]:
+        """Names of the command arguments, in the order they go in the path data.
+        """
+        names = cls.__dict__.get("_field_names")
+        if names is None:
+            names = tuple(f.name for f in fields(cls))
+            cls._field_names = names
+        return names
 
     def __str__(self) -> str:
         points = []
-        for p in astuple(self):
+        for name in self.field_names():
+            p = getattr(self, name)
             if isinstance(p, bool):
                 p = int(p)
-            points.append(str(p))
+            points.append(format_number(p))
         joined = " ".join(points)
         return f"{self.command} {joined}"
 
@@ -233,6 +251,225 @@ class ClosePath(PathData):
     command = 'Z'
 
 
+# The path data command class for each command letter.
+COMMANDS: Dict[str, Type[PathData]] = {
+    cls.command: cls for cls in (
+        MoveTo, MoveToRel, LineTo, LineToRel,
+        HorizontalLineTo, HorizontalLineToRel, VerticalLineTo, VerticalLineToRel,
+        CubicBezier, CubicBezierRel, SmoothCubicBezier, SmoothCubicBezierRel,
+        QuadraticBezier, QuadraticBezierRel, SmoothQuadraticBezier, SmoothQuadraticBezierRel,
+        Arc, ArcRel, ClosePath,
+    )
+}
+_ARGS_COUNT = {command: len(cls.field_names()) for command, cls in COMMANDS.items()}
+# Numbers in PathBuffer are floats, so even without an explicit format
+# integral values are written without the trailing ".0".
+_DEFAULT_NUMBER_FORMAT = NumberFormat()
+
+
+class PathBuffer:
+    """Path data stored as arrays of command letters and coordinates.
+
+    Unlike a list of PathData, it doesn't create a Python object for each command.
+    Use it for big paths instead of a list of PathData in `Path.d`:
+
+        buffer = PathBuffer()
+        buffer.append("M", 0, 0)
+        buffer.extend("L" * len(ys), coords)
+
+    All arguments of all commands go into one flat array of floats,
+    in the same order as the fields of the corresponding PathData class.
+    """
+
+    def __init__(self, commands: str = "", coords: Any = ()) -> None:
+        self.commands: array[int] = array("B")
+        self.coords: array[float] = array("d")
+        if commands:
+            self.extend(commands, coords)
+
+    def append(self, command: str, *args: Number) -> None:
+        """Add a single command, like `buffer.append("L", x, y)`.
+        """
+        self.extend(command, args)
+
+    def extend(self, commands: str, coords: Any) -> None:
+        """Add many commands at once.
+
+        The `coords` are a flat sequence of all arguments for all commands,
+        or any object supporting the buffer protocol (like a numpy array).
+        """
+        values = to_float_array(coords)
+        expected = 0
+        for command in commands:
+            count = _ARGS_COUNT.get(command)
+            if count is None:
+                raise ValueError(f"unknown path command: {command!r}")
+            expected += count
+        if len(values) != expected:
+            raise ValueError(f"expected {expected} coordinates, got {len(values)}")
+        self.commands.frombytes(commands.encode("ascii"))
+        self.coords.extend(values)
+
+    @classmethod
+    def from_path_data(cls, path: list[PathData]) -> PathBuffer:
+        buffer = cls()
+        commands = []
+        coords: list[Number] = []
+        for item in path:
+            commands.append(item.command)
+            coords.extend(getattr(item, name) for name in item.field_names())
+        buffer.extend("".join(commands), coords)
+        return buffer
+
+    def to_path_data(self) -> list[PathData]:
+        return list(self)
+
+    def __iter__(self) -> Iterator[PathData]:
+        coords = self.coords
+        pos = 0
+        for code in self.commands:
+            command = chr(code)
+            cls = COMMANDS[command]
+            count = _ARGS_COUNT[command]
+            args: list[Any] = coords[pos:pos + count].tolist()
+            if cls is Arc or cls is ArcRel:
+                args[3] = bool(args[3])
+                args[4] = bool(args[4])
+            yield cls(*args)
+            pos += count
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PathBuffer):
+            return NotImplemented
+        return self.commands == other.commands and self.coords == other.coords
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.commands.tobytes().decode()!r}, {self.coords.tolist()!r})"
+
+    def __str__(self) -> str:
+        number_format = get_number_format() or _DEFAULT_NUMBER_FORMAT
+        if number_format.precision is None:
+            spec = "%r"
+        else:
+            spec = f"%.{number_format.precision}f"
+        templates = _get_templates(spec)
+        # Format all numbers at once with a single %-formatting of a template
+        # made of the templates of all commands, and then post-process
+        # the whole string to apply the rest of the number format.
+        template = " ".join(map(templates.__getitem__, self.commands))
+        text = template % tuple(self.coords)
+        return compact_numbers(text, number_format.precision, number_format.leading_zero)
+
+
+def to_absolute(path: Iterable[PathData]) -> list[PathData]:
+    """Convert the path into absolute commands of a few kinds only.
+
+    The result contains only MoveTo, LineTo, CubicBezier, QuadraticBezier,
+    Arc, and ClosePath. Relative commands are converted into absolute ones,
+    horizontal and vertical lines into LineTo, and smooth curves into full curves
+    with the control point explicitly calculated.
+    """
+    result: list[PathData] = []
+    # the current point
+    x: Any = 0
+    y: Any = 0
+    # the start of the current subpath
+    start_x: Any = 0
+    start_y: Any = 0
+    # the reflection of the last control point of the previous curve, if any
+    cubic: tuple[Any, Any] | None = None
+    quad: tuple[Any, Any] | None = None
+    for item in path:
+        command = item.command
+        args = [getattr(item, name) for name in item.field_names()]
+        if command.islower() and command != "z":
+            if command == "h":
+                args[0] += x
+            elif command == "v":
+                args[0] += y
+            elif command == "a":
+                args[5] += x
+                args[6] += y
+            else:
+                for i in range(0, len(args), 2):
+                    args[i] += x
+                    args[i + 1] += y
+            command = command.upper()
+        new: PathData
+        if command == "M":
+            new = MoveTo(*args)
+            start_x, start_y = args
+        elif command == "L":
+            new = LineTo(*args)
+        elif command == "H":
+            new = LineTo(args[0], y)
+        elif command == "V":
+            new = LineTo(x, args[0])
+        elif command == "C":
+            new = CubicBezier(*args)
+        elif command == "S":
+            x1, y1 = cubic or (x, y)
+            new = CubicBezier(x1, y1, *args)
+        elif command == "Q":
+            new = QuadraticBezier(*args)
+        elif command == "T":
+            x1, y1 = quad or (x, y)
+            new = QuadraticBezier(x1, y1, *args)
+        elif command == "A":
+            new = Arc(*args)
+        else:
+            new = ClosePath()
+        cubic = None
+        quad = None
+        if isinstance(new, CubicBezier):
+            cubic = _reflect(new.x2, new.y2, new.x, new.y)
+        elif isinstance(new, QuadraticBezier):
+            quad = _reflect(new.x1, new.y1, new.x, new.y)
+        if isinstance(new, ClosePath):
+            x, y = start_x, start_y
+        else:
+            x, y = new.x, new.y  # type: ignore[attr-defined]
+        result.append(new)
+    return result
+
+
+def _without_decimals(command: PathData) -> PathData:
+    """Convert Decimal arguments of the command into floats.
+
+    Decimals cannot be mixed with floats in arithmetic.
+    """
+    args = [getattr(command, name) for name in command.field_names()]
+    if not any(isinstance(arg, Decimal) for arg in args):
+        return command
+    return type(command)(*[float(arg) if isinstance(arg, Decimal) else arg for arg in args])
+
+
+def _reflect(x: Any, y: Any, center_x: Any, center_y: Any) -> tuple[Any, Any]:
+    """Reflect the point relative to the center.
+    """
+    return 2 * center_x - x, 2 * center_y - y
+
+
+# Cache of templates for each command code, for each number format spec.
+_templates: Dict[str, Dict[int, str]] = {}
+
+
+def _get_templates(spec: str) -> Dict[int, str]:
+    templates = _templates.get(spec)
+    if templates is None:
+        templates = {}
+        for command, count in _ARGS_COUNT.items():
+            templates[ord(command)] = f"{command} " + " ".join([spec] * count)
+        _templates[spec] = templates
+    return templates
+
+
+register_formatter(PathData, str)
+register_formatter(PathBuffer, str)
+
 # aliases
 M = MoveTo
 m = MoveToRel
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from bisect import bisect_left
+from dataclasses import replace
+from itertools import compress
+from typing import TYPE_CHECKING, Any, Callable, Sequence, TypeVar, Union
+
+from ._parser import parse_path
+from ._path import (
+    ClosePath, LineTo, MoveTo, PathBuffer, PathData, _without_decimals, to_absolute,
+)
+from ._types import Point, point_columns, to_float_array
+from .elements import Path, Polygon, Polyline
+
+
+if TYPE_CHECKING:
+    from typing_extensions import Literal
+
+
+_T = TypeVar("_T", list, array, PathBuffer, Polyline, Polygon, Path)
+# Takes x and y coordinates and the tolerance, returns the mask of points to keep.
+_Keep = Callable[[Sequence[float], Sequence[float], float], bytearray]
+
+
+def simplify(
+    target: _T,
+    tolerance: float,
+    method: Literal["rdp", "visvalingam"] = "rdp",
+) -> _T:
+    """Remove points that don't noticeably change the shape of lines.
+
+    The target can be points (in any form accepted by `Polyline.points`), path data
+    made only of lines (a list of `PathData` or a `PathBuffer`), or a `Polyline`,
+    `Polygon`, or `Path` element. A new object of the same type is returned,
+    except for buffers of points (like numpy arrays) which give a flat array('d').
+    The first and the last points of each subpath are always kept.
+
+    Methods:
+
+    + "rdp": Ramer–Douglas–Peucker. The result deviates from the original lines
+      no more than `tolerance` (in user units).
+    + "visvalingam": Visvalingam–Whyatt. Removes the points forming the smallest
+      triangles with their neighbors while the area is less than `tolerance` squared.
+      Tends to give smoother results than RDP.
+
+    Raises ValueError if the path data has curves or arcs.
+    """
+    keep: _Keep
+    if method == "rdp":
+        keep = _rdp
+    elif method == "visvalingam":
+        keep = _visvalingam
+    else:
+        raise ValueError(f"unknown simplification method: {method!r}")
+    # The type of the target is narrowed from a type variable, which confuses mypy.
+    element: Any = target
+    if isinstance(target, (Polyline, Polygon)):
+        if target.points is None:
+            return target
+        return replace(element, points=simplify(element.points, tolerance, method))
+    if isinstance(target, Path):
+        if target.d is None:
+            return target
+        d: Any = parse_path(target.d) if isinstance(target.d, str) else target.d
+        return replace(element, d=simplify(d, tolerance, method))
+    if isinstance(target, PathBuffer):
+        return _simplify_buffer(target, tolerance, keep)
+    if isinstance(target, list) and target and isinstance(target[0], PathData):
+        return _simplify_path(target, tolerance, keep)
+    xs, ys = point_columns(target)
+    mask = keep(xs, ys, tolerance)
+    if isinstance(target, list) and target and isinstance(target[0], Point):
+        return list(compress(target, mask))
+    coords = array("d")
+    for x, y in compress(zip(xs, ys), mask):
+        coords.append(x)
+        coords.append(y)
+    if isinstance(target, list):
+        return coords.tolist()
+    return coords
+
+
+def _simplify_path(path: list[PathData], tolerance: float, keep: _Keep) -> list[PathData]:
+    result: list[PathData] = []
+    # Points of the current subpath, starting with a MoveTo.
+    xs = array("d")
+    ys = array("d")
+
+    def flush() -> None:
+        mask = keep(xs, ys, tolerance)
+        for x, y in compress(zip(xs[1:], ys[1:]), mask[1:]):
+            result.append(LineTo(x, y))
+        del xs[:]
+        del ys[:]
+
+    for command in to_absolute([_without_decimals(command) for command in path]):
+        if isinstance(command, MoveTo):
+            flush()
+            result.append(command)
+        elif isinstance(command, ClosePath):
+            flush()
+            result.append(command)
+            continue
+        elif not isinstance(command, LineTo):
+            raise ValueError("only path data made of lines can be simplified")
+        elif not xs:
+            # A line right after ClosePath starts from the beginning of the subpath.
+            start = next(c for c in reversed(result) if isinstance(c, MoveTo))
+            xs.append(float(start.x))
+            ys.append(float(start.y))
+        xs.append(float(command.x))
+        ys.append(float(command.y))
+    flush()
+    return result
+
+
+def _simplify_buffer(buffer: PathBuffer, tolerance: float, keep: _Keep) -> PathBuffer:
+    letters = buffer.commands.tobytes()
+    if letters.translate(None, b"ML"):
+        return PathBuffer.from_path_data(
+            _simplify_path(buffer.to_path_data(), tolerance, keep),
+        )
+    result = PathBuffer()
+    coords = buffer.coords
+    start = 0
+    while start < len(letters):
+        end = letters.find(b"M", start + 1)
+        if end == -1:
+            end = len(letters)
+        mask = keep(coords[start * 2:end * 2:2], coords[start * 2 + 1:end * 2:2], tolerance)
+        kept = list(compress(range(start, end), mask))
+        result.commands.extend(array("B", b"M" + b"L" * (len(kept) - 1)))
+        for i in kept:
+            result.coords.append(coords[i * 2])
+            result.coords.append(coords[i * 2 + 1])
+        start = end
+    return result
+
+
+def _rdp(xs: Sequence[float], ys: Sequence[float], tolerance: float) -> bytearray:
+    """Ramer–Douglas–Peucker algorithm, returns the mask of points to keep.
+
+    The recursion is replaced with an explicit stack of ranges.
+    """
+    count = len(xs)
+    mask = bytearray(count)
+    if count == 0:
+        return mask
+    mask[0] = mask[-1] = 1
+    tolerance2 = tolerance * tolerance
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        x0 = xs[first]
+        y0 = ys[first]
+        dx = xs[last] - x0
+        dy = ys[last] - y0
+        chord2 = dx * dx + dy * dy
+        inner_xs = xs[first + 1:last]
+        inner_ys = ys[first + 1:last]
+        if chord2:
+            # The distance to the line multiplied by the chord length.
+            distances = [abs((x - x0) * dy - (y - y0) * dx) for x, y in zip(inner_xs, inner_ys)]
+        else:
+            distances = [math.hypot(x - x0, y - y0) for x, y in zip(inner_xs, inner_ys)]
+        farthest = max(distances)
+        distance2 = farthest * farthest / chord2 if chord2 else farthest * farthest
+        if distance2 > tolerance2:
+            index = first + 1 + distances.index(farthest)
+            mask[index] = 1
+            stack.append((index, last))
+            stack.append((first, index))
+    return mask
+
+
+def _visvalingam(xs: Sequence[float], ys: Sequence[float], tolerance: float) -> bytearray:
+    """Visvalingam–Whyatt algorithm, returns the mask of points to keep.
+
+    The points are stored in a linked list, and the smallest triangle is taken
+    from a heap. Entries of the heap that became outdated are skipped when popped.
+    """
+    count = len(xs)
+    mask = bytearray(b"\x01") * count
+    if count < 3:
+        return mask
+    threshold = tolerance * tolerance
+    prev = list(range(-1, count - 1))
+    next_ = list(range(1, count + 1))
+    # Twice the area of the triangle formed by each point and its neighbors.
+    areas = [math.inf]
+    areas.extend(
+        abs((x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0))
+        for x0, y0, x1, y1, x2, y2 in zip(xs, ys, xs[1:], ys[1:], xs[2:], ys[2:])
+    )
+    areas.append(math.inf)
+    threshold *= 2
+    heap = [(area, i) for i, area in enumerate(areas) if area < threshold]
+    heapq.heapify(heap)
+    heappop = heapq.heappop
+    heappush = heapq.heappush
+    last = count - 1
+    while heap:
+        current, i = heappop(heap)
+        if current != areas[i] or not mask[i]:
+            continue
+        mask[i] = 0
+        a = prev[i]
+        b = next_[i]
+        next_[a] = b
+        prev[b] = a
+        for j in (a, b):
+            if 0 < j < last:
+                p = prev[j]
+                n = next_[j]
+                area = abs((xs[j] - xs[p]) * (ys[n] - ys[p]) - (xs[n] - xs[p]) * (ys[j] - ys[p]))
+                # The area never decreases, so that the removal order is consistent.
+                if area < current:
+                    area = current
+                areas[j] = area
+                if area < threshold:
+                    heappush(heap, (area, j))
+    return mask
+
+
+def downsample(
+    xs: Any,
+    ys: Any,
+    width: int,
+    method: Literal["lttb", "minmax"] = "lttb",
+    output: Literal["points", "path"] = "points",
+) -> Union[list[Point], PathBuffer]:
+    """Reduce a series of points to what can be seen on a chart `width` pixels wide.
+
+    `xs` and `ys` are sequences of numbers or numeric buffers (like numpy arrays)
+    of the same length, `xs` must be sorted in ascending order. The result is
+    a list of `Point` for `Polyline.points`, or a `PathBuffer` for `Path.d`
+    if `output` is "path". The size of the result depends only on `width`.
+
+    Methods:
+
+    + "lttb": Largest-Triangle-Three-Buckets. Splits the points into `width` buckets
+      and picks from each one the point forming the largest triangle with the point
+      picked from the previous bucket and the average of the next one.
+    + "minmax": splits the x axis into `width` columns and keeps in each one
+      the first, the last, the lowest, and the highest points. Unlike LTTB, it never
+      loses peaks, but produces up to 4 points per column.
+    """
+    xs = to_float_array(xs)
+    ys = to_float_array(ys)
+    if len(xs) != len(ys):
+        raise ValueError("xs and ys must have the same length")
+    if width < 1:
+        raise ValueError("width must be positive")
+    if method == "lttb":
+        indices = _lttb(xs, ys, max(width, 3))
+    elif method == "minmax":
+        indices = _minmax(xs, ys, width)
+    else:
+        raise ValueError(f"unknown downsampling method: {method!r}")
+    if output == "points":
+        return [Point(xs[i], ys[i]) for i in indices]
+    result = PathBuffer()
+    if indices:
+        result.commands.extend(array("B", b"M" + b"L" * (len(indices) - 1)))
+        for i in indices:
+            result.coords.append(xs[i])
+            result.coords.append(ys[i])
+    return result
+
+
+def _lttb(xs: array[float], ys: array[float], count: int) -> list[int]:
+    """Largest-Triangle-Three-Buckets, returns indices of `count` points to keep.
+
+    https://skemman.is/bitstream/1946/15343/3/SS_MSthesis.pdf
+    """
+    total = len(xs)
+    if total <= count:
+        return list(range(total))
+    # The first and the last points are buckets on their own.
+    bucket = (total - 2) / (count - 2)
+    result = [0]
+    prev = 0
+    for i in range(count - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, total)
+        avg_x = sum(xs[end:next_end]) / (next_end - end)
+        avg_y = sum(ys[end:next_end]) / (next_end - end)
+        ax = xs[prev]
+        ay = ys[prev]
+        # Twice the area of the triangle, the constant part is moved out of the loop.
+        dx = avg_x - ax
+        dy = avg_y - ay
+        const = dx * ay - dy * ax
+        areas = [abs((dx * y - dy * x) - const) for x, y in zip(xs[start:end], ys[start:end])]
+        prev = start + areas.index(max(areas))
+        result.append(prev)
+    result.append(total - 1)
+    return result
+
+
+def _minmax(xs: array[float], ys: array[float], width: int) -> list[int]:
+    """Indices of the first, last, lowest, and highest points in each pixel column.
+    """
+    total = len(xs)
+    if total <= 4 * width:
+        return list(range(total))
+    first = xs[0]
+    span = xs[-1] - first
+    result: list[int] = []
+    start = 0
+    for column in range(1, width + 1):
+        if column == width:
+            end = total
+        else:
+            end = bisect_left(xs, first + span * column / width, start)
+        if end <= start:
+            continue
+        column_ys = ys[start:end]
+        low = start + column_ys.index(min(column_ys))
+        high = start + column_ys.index(max(column_ys))
+        result.extend(sorted({start, low, high, end - 1}))
+        start = end
+    return result
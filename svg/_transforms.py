@@ -1,15 +1,30 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+from array import array
+from dataclasses import dataclass, fields
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Tuple
 
-from ._types import Number
+from ._formatters import format_number, register_formatter
+from ._types import Number, Point, to_float_array
 
 
 class Transform:
     """
     https://developer.mozilla.org/en-US/docs/Web/SVG/Attribute/transform
     """
-    pass
+
+    def to_matrix(self) -> Matrix:
+        """The equivalent transformation matrix.
+        """
+        raise NotImplementedError
+
+    def inverse(self) -> Matrix:
+        """The matrix of the transformation that undoes this one.
+        """
+        return self.to_matrix().inverse()
 
 
 @dataclass
@@ -25,7 +40,72 @@ class Matrix(Transform):
     f: Number
 
     def __str__(self):
-        return f'matrix({self.a} {self.b} {self.c} {self.d} {self.e} {self.f})'
+        args = (self.a, self.b, self.c, self.d, self.e, self.f)
+        return f'matrix({" ".join(format_number(arg) for arg in args)})'
+
+    def to_matrix(self) -> Matrix:
+        return self
+
+    def inverse(self) -> Matrix:
+        a, b, c, d, e, f = self._coefficients()
+        det = a * d - b * c
+        if not det:
+            raise ValueError("the matrix is not invertible")
+        return Matrix(
+            d / det,
+            -b / det,
+            -c / det,
+            a / det,
+            (c * f - d * e) / det,
+            (b * e - a * f) / det,
+        )
+
+    def apply(self, points: Any) -> Any:
+        """Transform the coordinates of one or many points.
+
+        Accepts a `Point`, a list of `Point`, a flat sequence or a buffer
+        of coordinates (`[x1, y1, x2, y2, ...]`, gives a flat array('d')),
+        or a numpy array of shape (..., 2) (gives a numpy array).
+        """
+        a, b, c, d, e, f = self._coefficients()
+        if isinstance(points, Point):
+            x, y = _real(points.x), _real(points.y)
+            return Point(a * x + c * y + e, b * x + d * y + f)
+        if hasattr(points, "__array_interface__"):
+            # Rows are points, so the matrix is transposed.
+            return points @ ((a, b), (c, d)) + (e, f)
+        if isinstance(points, list) and points and isinstance(points[0], Point):
+            return [
+                Point(a * x + c * y + e, b * x + d * y + f)
+                for x, y in ((_real(p.x), _real(p.y)) for p in points)
+            ]
+        coords = to_float_array(points)
+        if len(coords) % 2:
+            raise ValueError("points must have an even number of coordinates")
+        xs = coords[0::2]
+        ys = coords[1::2]
+        coords[0::2] = array("d", [a * x + c * y + e for x, y in zip(xs, ys)])
+        coords[1::2] = array("d", [b * x + d * y + f for x, y in zip(xs, ys)])
+        return coords
+
+    def __matmul__(self, other: Matrix) -> Matrix:
+        """Combine two matrices, `other` is applied first.
+        """
+        a, b, c, d, e, f = self._coefficients()
+        oa, ob, oc, od, oe, of = other._coefficients()
+        return Matrix(
+            a * oa + c * ob,
+            b * oa + d * ob,
+            a * oc + c * od,
+            b * oc + d * od,
+            a * oe + c * of + e,
+            b * oe + d * of + f,
+        )
+
+    def _coefficients(self) -> Tuple[float, float, float, float, float, float]:
+        """The values of the matrix that can be mixed with floats in arithmetic.
+        """
+        return _real(self.a), _real(self.b), _real(self.c), _real(self.d), _real(self.e), _real(self.f)
 
 
 @dataclass
@@ -38,8 +118,11 @@ class Translate(Transform):
 
     def __str__(self):
         if self.y is None:
-            return f'translate({self.x})'
-        return f'translate({self.x} {self.y})'
+            return f'translate({format_number(self.x)})'
+        return f'translate({format_number(self.x)} {format_number(self.y)})'
+
+    def to_matrix(self) -> Matrix:
+        return Matrix(1, 0, 0, 1, self.x, self.y or 0)
 
 
 @dataclass
@@ -52,8 +135,12 @@ class Scale(Transform):
 
     def __str__(self):
         if self.y is None:
-            return f'scale({self.x})'
-        return f'scale({self.x} {self.y})'
+            return f'scale({format_number(self.x)})'
+        return f'scale({format_number(self.x)} {format_number(self.y)})'
+
+    def to_matrix(self) -> Matrix:
+        y = self.x if self.y is None else self.y
+        return Matrix(self.x, 0, 0, y, 0, 0)
 
 
 @dataclass
@@ -67,9 +154,17 @@ class Rotate(Transform):
 
     def __str__(self):
         if self.x is None:
-            return f'rotate({self.a})'
+            return f'rotate({format_number(self.a)})'
         assert self.y is not None
-        return f'rotate({self.a} {self.x} {self.y})'
+        return f'rotate({format_number(self.a)} {format_number(self.x)} {format_number(self.y)})'
+
+    def to_matrix(self) -> Matrix:
+        angle = math.radians(self.a)
+        cos = math.cos(angle)
+        sin = math.sin(angle)
+        x = _real(self.x or 0)
+        y = _real(self.y or 0)
+        return Matrix(cos, sin, -sin, cos, x - cos * x + sin * y, y - sin * x - cos * y)
 
 
 @dataclass
@@ -80,7 +175,10 @@ class SkewX(Transform):
     a: Number
 
     def __str__(self):
-        return f'skewX({self.a})'
+        return f'skewX({format_number(self.a)})'
+
+    def to_matrix(self) -> Matrix:
+        return Matrix(1, 0, math.tan(math.radians(self.a)), 1, 0, 0)
 
 
 @dataclass
@@ -91,4 +189,61 @@ class SkewY(Transform):
     a: Number
 
     def __str__(self):
-        return f'skewY({self.a})'
+        return f'skewY({format_number(self.a)})'
+
+    def to_matrix(self) -> Matrix:
+        return Matrix(1, math.tan(math.radians(self.a)), 0, 1, 0, 0)
+
+
+_IDENTITY = (1, 0, 0, 1, 0, 0)
+# Transforms that are rebuilt from the values of their fields for the cache.
+_CACHED_FIELDS: Dict[type, Tuple[str, ...]] = {
+    cls: tuple(f.name for f in fields(cls))
+    for cls in (Matrix, Translate, Scale, Rotate, SkewX, SkewY)
+}
+
+
+def _real(value: Any) -> float:
+    """Convert Decimal into float, other numbers are kept exact.
+
+    Decimals cannot be mixed with floats in arithmetic.
+    """
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def compose_transforms(transforms: Iterable[Transform]) -> Matrix:
+    """Combine the list of transforms (like `G.transform`) into a single matrix.
+
+    The results are cached by the values of the transforms,
+    so layouts repeating the same transforms compose each list once.
+    """
+    transforms = list(transforms)
+    if all(type(t) in _CACHED_FIELDS for t in transforms):
+        # The types of values are a part of the key, so that 1 and 1.0 are cached separately.
+        key = tuple(
+            (type(t), tuple((type(v), v) for v in (getattr(t, name) for name in _CACHED_FIELDS[type(t)])))
+            for t in transforms
+        )
+        try:
+            return Matrix(*_compose(key))
+        except TypeError:
+            # Some values are not hashable.
+            pass
+    return Matrix(*_multiply_all(t.to_matrix() for t in transforms))
+
+
+@lru_cache(maxsize=1024)
+def _compose(key: Tuple[Tuple[Any, Tuple[Tuple[type, Any], ...]], ...]) -> Tuple[Number, ...]:
+    return _multiply_all(cls(*(v for _, v in values)).to_matrix() for cls, values in key)
+
+
+def _multiply_all(matrices: Iterable[Matrix]) -> Tuple[Number, ...]:
+    result = Matrix(*_IDENTITY)
+    for matrix in matrices:
+        result = result @ matrix
+    return (result.a, result.b, result.c, result.d, result.e, result.f)
+
+
+register_formatter(Transform, str)
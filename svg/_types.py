@@ -2,11 +2,14 @@ from __future__ import annotations
 from datetime import datetime
 
 import math
+from array import array
 from dataclasses import dataclass
 from datetime import timedelta
 from decimal import Decimal
 
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Any, Tuple, Union
+
+from ._formatters import format_floats, format_number, register_formatter
 
 
 if TYPE_CHECKING:
@@ -26,7 +29,7 @@ class Length:
     unit: Literal["em", "ex", "px", "pt", "pc", "cm", "mm", "in", "%"]
 
     def __str__(self) -> str:
-        return f"{self.value}{self.unit}"
+        return f"{format_number(self.value)}{self.unit}"
 
 
 @dataclass
@@ -65,7 +68,9 @@ class ViewBoxSpec:
     height: Number
 
     def __str__(self) -> str:
-        return f"{self.min_x} {self.min_y} {self.width} {self.height}"
+        return " ".join(
+            format_number(n) for n in (self.min_x, self.min_y, self.width, self.height)
+        )
 
 
 @dataclass
@@ -82,7 +87,9 @@ class TimeBezierPoint:
         assert self.y2 >= 0 and self.y2 <= 1
 
     def __str__(self) -> str:
-        return f"{self.x1} {self.y1} {self.x2} {self.y2}"
+        return " ".join(
+            format_number(n) for n in (self.x1, self.y1, self.x2, self.y2)
+        )
 
 
 # https://developer.mozilla.org/en-US/docs/Web/SVG/Reference/Attribute/begin
@@ -250,4 +257,55 @@ class Point:
     y: Number
 
     def __str__(self) -> str:
-        return f"{self.x},{self.y}"
+        return f"{format_number(self.x)},{format_number(self.y)}"
+
+
+def to_float_array(values: Any) -> array[float]:
+    """Convert a flat sequence of numbers or a numeric buffer into array('d').
+
+    Buffers of doubles (including multi-dimensional C-contiguous numpy arrays)
+    are copied without converting each number into a Python object.
+    """
+    if isinstance(values, array) and values.typecode == "d":
+        return array("d", values)
+    try:
+        view = memoryview(values)
+    except TypeError:
+        return array("d", values)
+    result: array[float] = array("d")
+    if view.format == "d" and view.c_contiguous:
+        result.frombytes(view.cast("B"))
+        return result
+    flat = view.cast("B").cast(view.format) if view.c_contiguous else view  # type: ignore[call-overload]
+    for item in flat.tolist():
+        if isinstance(item, list):
+            result.extend(item)
+        else:
+            result.append(item)
+    return result
+
+
+def point_columns(points: Any) -> Tuple[array[float], array[float]]:
+    """Split points into arrays of x and y coordinates.
+
+    The points can be a list of `Point`, a flat sequence of coordinates
+    (`[x1, y1, x2, y2, ...]`), or a buffer (like a numpy array of shape (N, 2)).
+    """
+    if isinstance(points, (list, tuple)) and points and isinstance(points[0], Point):
+        return array("d", [p.x for p in points]), array("d", [p.y for p in points])
+    coords = to_float_array(points)
+    if len(coords) % 2:
+        raise ValueError("points must have an even number of coordinates")
+    return coords[0::2], coords[1::2]
+
+
+def _format_buffer(values: Any) -> str:
+    return format_floats(to_float_array(values))
+
+
+register_formatter(array, _format_buffer)
+register_formatter(memoryview, _format_buffer)
+register_formatter(timedelta, to_clock_value)
+register_formatter(datetime, to_wallclock_sync_value)
+register_formatter(Length, str)
+register_formatter(Point, str)
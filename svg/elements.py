@@ -1,14 +1,21 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from enum import Enum
-from typing import TYPE_CHECKING, Any, ClassVar
-from datetime import timedelta, datetime
+import asyncio
+import gzip
+import io
+import mmap
+import operator
+import weakref
+from array import array
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import MISSING, Field, InitVar, dataclass, fields, replace
+from typing import IO, TYPE_CHECKING, Any, AsyncIterator, Callable, ClassVar, Iterator, Sequence, overload
 
 from . import _mixins as m
-from ._path import PathData
+from ._formatters import NumberFormat, format_list, format_value, get_number_format, register_formatter
+from ._path import PathBuffer, PathData
 from ._transforms import Transform
-from ._types import Length, Number, PreserveAspectRatio, ViewBoxSpec, to_clock_value, to_wallclock_sync_value, Point
+from ._types import Length, Number, PreserveAspectRatio, ViewBoxSpec, Point
 
 
 if TYPE_CHECKING:
@@ -24,10 +31,14 @@ _SEMICOLON_ATTRS = frozenset({
     "begin",
     "end",
 })
+# Fields that hold the element content rather than attributes.
+_CONTENT_FIELDS = frozenset({"elements", "text", "data", "extra"})
 _SEMICOLON_TYPES = frozenset({
     m.Animation,
     m.AnimationTiming,
 })
+# How many characters `Element.write_to` accumulates before flushing into the file.
+_CHUNK_SIZE = 64 * 1024
 
 
 @dataclass
@@ -37,6 +48,7 @@ class Element:
     """
 
     element_name: ClassVar[str]
+    _attrs_serializer: ClassVar[Callable[[Element], dict[str, str]]]
 
     elements: list[Element] | None = None
     text: str | None = None
@@ -56,42 +68,23 @@ class Element:
 
     @classmethod
     def _as_str(cls, val: Any, key: str | None = None) -> str:
-        if val is None:
-            return ""
-        if isinstance(val, Element):
-            return str(val)
-        if isinstance(val, Enum):
-            return val.value
-        if isinstance(val, bool):
-            return str(val).lower()
-        if isinstance(val, (list, tuple)):
-            sep = " "
-            # Some attributes of some animation-related elements
-            # use semicolon instead of space to separate list elements.
-            if key in _SEMICOLON_ATTRS:
-                if set(cls.__bases__) & _SEMICOLON_TYPES:
-                    sep = ";"
-            return sep.join(cls._as_str(v) for v in val)
-        if isinstance(val, timedelta):
-            return to_clock_value(val)
-        if isinstance(val, datetime):
-            return to_wallclock_sync_value(val)
-        return str(val)
+        # Some attributes of some animation-related elements
+        # use semicolon instead of space to separate list elements.
+        if key in _SEMICOLON_ATTRS and isinstance(val, (list, tuple)):
+            if set(cls.__bases__) & _SEMICOLON_TYPES:
+                return format_list(val, sep=";")
+        return format_value(val)
 
     def as_dict(self) -> dict[str, str]:
-        result = {}
-        for key, val in vars(self).items():
-            if val is None:
-                continue
-            if key in ("elements", "text", "data", "extra"):
-                continue
-            key = key.rstrip("_")
-            key = key.replace("__", ":")
-            key = key.replace("_", "-")
-            result[key] = self._as_str(val, key=key)
-        return result
-
-    def as_str(self) -> str:
+        cls = type(self)
+        # Look only into the class itself, subclasses have their own fields.
+        serializer = cls.__dict__.get("_attrs_serializer")
+        if serializer is None:
+            serializer = _compile_attrs_serializer(cls)
+            cls._attrs_serializer = serializer
+        return serializer(self)
+
+    def _props(self) -> str:
         props = " ".join(f'{k}="{v}"' for k, v in self.as_dict().items())
         if self.data:
             if props:
@@ -103,13 +96,356 @@ class Element:
             props += " ".join(f'{k}="{v}"' for k, v in self.extra.items())
         if props:
             props = " " + props
+        return props
+
+    def as_str(self, cache: bool = False) -> str:
+        """Serialize the element and all its children.
+
+        If `cache` is True, the output for every subtree is remembered,
+        so that the next call re-renders only the subtrees that have changed since.
+        A subtree changes when a field of any element in it is assigned
+        or when `elements` of any element in it is modified.
+        Mutating other attribute values in place (like appending into `Path.d`)
+        is not tracked, call `invalidate_cache` on the changed element after that.
+        The output cached with one `NumberFormat` is not reused with another.
+        """
+        if cache:
+            return self._as_cached_str()
+        return "".join(self._iter_chunks())
+
+    def _as_cached_str(self) -> str:
+        number_format = get_number_format()
+        format_key = None
+        if number_format is not None:
+            format_key = (number_format.precision, number_format.leading_zero)
+        self._drop_modified_cache(format_key)
+        # The same traversal as in `_iter_chunks` but the output of each subtree
+        # is collected into a separate list of parts and then cached.
+        root_parts: list[str] = []
+        stack: list[tuple[Element | None, Iterator[Any], list[str]]] = []
+        owner: Element | None = None
+        children: Iterator[Any] = iter((self,))
+        parts = root_parts
+        while True:
+            for e in children:
+                if not isinstance(e, Element):
+                    parts.append(format_value(e))
+                    continue
+                if owner is not None:
+                    e._add_parent(owner)
+                cached = e.__dict__.get("_cached_str")
+                if cached is not None:
+                    parts.append(cached)
+                    continue
+                # The children are remembered to find out later
+                # if the list has been modified in place, and so are the children
+                # that have lists of their own that can be modified.
+                elements = tuple(e.elements or ())
+                containers = tuple(
+                    child for child in elements
+                    if isinstance(child, Element) and child.elements is not None
+                )
+                e.__dict__["_cached_state"] = (format_key, elements, containers)
+                if elements and not e.text:
+                    stack.append((owner, children, parts))
+                    owner = e
+                    children = iter(elements)
+                    parts = [e._start_tag()]
+                    break
+                result = e._leaf_str()
+                e.__dict__["_cached_str"] = result
+                parts.append(result)
+            else:
+                if owner is None:
+                    return "".join(root_parts)
+                parts.append(f"</{owner.element_name}>")
+                result = "".join(parts)
+                owner.__dict__["_cached_str"] = result
+                owner, children, parts = stack.pop()
+                parts.append(result)
+
+    def _drop_modified_cache(self, format_key: tuple[Any, ...] | None) -> None:
+        """Drop the cached output of subtrees where a list of children has been modified.
+
+        The lists are not wrapped to track changes, instead they are compared
+        with the children remembered when the output was cached.
+        The output cached with a different number format is dropped as well.
+
+        Assigning a field invalidates the cache right away, so below an unchanged
+        cached element only the children that had lists are visited. The cost
+        is proportional to the number of such containers, not of all elements.
+        """
+        stack: list[Element] = [self]
+        while stack:
+            element = stack.pop()
+            children = element.elements or ()
+            if "_cached_str" in element.__dict__:
+                cached_key, cached, containers = element.__dict__["_cached_state"]
+                same = cached_key == format_key and len(cached) == len(children)
+                if same and all(map(operator.is_, cached, children)):
+                    stack.extend(containers)
+                    continue
+                element.invalidate_cache()
+            stack.extend(child for child in children if isinstance(child, Element))
+
+    def _add_parent(self, parent: Element) -> None:
+        parents = self.__dict__.setdefault("_parents", [])
+        for ref in parents:
+            if ref() is parent:
+                return
+        parents.append(weakref.ref(parent))
+
+    def invalidate_cache(self) -> None:
+        """Drop the cached output of the element and all elements containing it.
+
+        Also drops the cached geometry of the element, see `svg.bounding_box`.
+        """
+        self.__dict__.pop("_cached_geometry", None)
+        stack = [self]
+        while stack:
+            element = stack.pop()
+            # If the element is not cached, its parents are not cached either.
+            if element.__dict__.pop("_cached_str", None) is None:
+                continue
+            element.__dict__.pop("_cached_state", None)
+            for ref in element.__dict__.get("_parents", ()):
+                parent = ref()
+                if parent is not None:
+                    stack.append(parent)
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # The dataclass decorator keeps __init__ if the class already defines it.
+        if "__init__" not in cls.__dict__ and _can_compile_init(cls):
+            cls.__init__ = _make_lazy_init(cls)  # type: ignore[method-assign]
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if value is None and getattr(type(self), name, MISSING) is None:
+            # Keep the storage sparse, see `_compile_init`.
+            self.__dict__.pop(name, None)
+        else:
+            object.__setattr__(self, name, value)
+        if "_cached_str" in self.__dict__ or "_cached_geometry" in self.__dict__:
+            self.invalidate_cache()
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop("_cached_str", None)
+        state.pop("_cached_state", None)
+        state.pop("_cached_geometry", None)
+        state.pop("_parents", None)
+        return state
+
+    @overload
+    def iter_chunks(self, encoding: None = None) -> Iterator[str]:
+        pass
+
+    @overload
+    def iter_chunks(self, encoding: str) -> Iterator[bytes]:
+        pass
+
+    def iter_chunks(self, encoding: str | None = None) -> Iterator[str] | Iterator[bytes]:
+        """Serialize the element as a sequence of chunks.
+
+        Joined together, the chunks are exactly the same as the output of `as_str`,
+        but the whole document is never kept in memory at once.
+        If `encoding` is specified, the chunks are encoded into bytes.
+        """
+        if encoding is None:
+            return self._iter_chunks()
+        return (chunk.encode(encoding) for chunk in self._iter_chunks())
+
+    @overload
+    def _iter_chunks(self) -> Iterator[str]:
+        pass
+
+    @overload
+    def _iter_chunks(self, threshold: int) -> Iterator[str | list[Any]]:
+        pass
+
+    def _iter_chunks(self, threshold: int | None = None) -> Iterator[str | list[Any]]:
+        """Serialize the element as a sequence of chunks.
+
+        If `threshold` is specified, lists of at least that many children
+        are not serialized but yielded as they are, between the start and end tags.
+        """
+        # Walk the tree using an explicit stack rather than recursion,
+        # so that the depth of the tree is not limited by the recursion limit.
+        stack: list[tuple[Iterator[Any], str]] = []
+        children: Iterator[Any] = iter((self,))
+        end_tag = ""
+        while True:
+            for e in children:
+                if not isinstance(e, Element):
+                    yield format_value(e)
+                    continue
+                if e.elements and not e.text:
+                    yield e._start_tag()
+                    if threshold is not None and len(e.elements) >= threshold:
+                        yield e.elements
+                        yield f"</{e.element_name}>"
+                        continue
+                    stack.append((children, end_tag))
+                    children = iter(e.elements)
+                    end_tag = f"</{e.element_name}>"
+                    break
+                yield e._leaf_str()
+            else:
+                if not stack:
+                    return
+                yield end_tag
+                children, end_tag = stack.pop()
+
+    def _start_tag(self) -> str:
+        return f"<{self.element_name}{self._props()}>"
+
+    def _leaf_str(self) -> str:
+        """Serialize the element that has no child elements.
+        """
+        props = self._props()
         if self.text:
             return f"<{self.element_name}{props}>{self.text}</{self.element_name}>"
-        if self.elements:
-            content = "".join(self._as_str(e) for e in self.elements)
-            return f"<{self.element_name}{props}>{content}</{self.element_name}>"
         return f"<{self.element_name}{props}/>"
 
+    def as_str_parallel(
+        self,
+        threshold: int = 10_000,
+        batch_size: int = 2_000,
+        executor: Executor | None = None,
+    ) -> str:
+        """Serialize the element, rendering long lists of children in parallel.
+
+        Children of each element that has at least `threshold` of them are split
+        into batches of `batch_size` elements, and the batches are serialized
+        in the `executor`. If not specified, a process pool is started
+        but only if the document has such a long list of children.
+        The output is the same as from `as_str`. However, values of custom types
+        can be formatted differently if the worker processes don't have
+        the same formatters registered (see `register_formatter`).
+        """
+        own_executor = None
+        parts: list[str | Future[str]] = []
+        # The active number format is not visible from other processes,
+        # so it is passed explicitly. The copy doesn't hold the context tokens
+        # which cannot be pickled.
+        number_format = get_number_format()
+        if number_format is not None:
+            number_format = replace(number_format)
+        try:
+            for chunk in self._iter_chunks(threshold):
+                if not isinstance(chunk, list):
+                    parts.append(chunk)
+                    continue
+                if executor is None:
+                    executor = own_executor = ProcessPoolExecutor()
+                for start in range(0, len(chunk), batch_size):
+                    batch = chunk[start:start + batch_size]
+                    future = executor.submit(_serialize_elements, batch, number_format)
+                    parts.append(future)
+            return "".join(p if isinstance(p, str) else p.result() for p in parts)
+        finally:
+            if own_executor is not None:
+                own_executor.shutdown()
+
+    def _iter_joined_chunks(self, chunk_size: int) -> Iterator[str]:
+        """Serialize the element as chunks of about `chunk_size` characters.
+        """
+        buffer: list[str] = []
+        size = 0
+        for chunk in self._iter_chunks():
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= chunk_size:
+                yield "".join(buffer)
+                buffer.clear()
+                size = 0
+        if buffer:
+            yield "".join(buffer)
+
+    def as_bytes(self, encoding: str = "utf-8") -> bytes:
+        """Serialize the element into bytes.
+
+        The document is encoded chunk by chunk, without making the whole `str` first.
+        """
+        return b"".join(
+            chunk.encode(encoding)
+            for chunk in self._iter_joined_chunks(_CHUNK_SIZE)
+        )
+
+    def serialize_into(
+        self,
+        buffer: bytearray | memoryview | mmap.mmap,
+        offset: int = 0,
+        encoding: str = "utf-8",
+    ) -> int:
+        """Write the encoded element into the buffer starting at the given offset.
+
+        A `bytearray` grows as needed, a memory-mapped file is resized.
+        A `memoryview` cannot grow, so ValueError is raised if the output doesn't fit.
+        ValueError is also raised if the offset is outside of the buffer.
+        Returns the number of bytes written.
+        """
+        if not 0 <= offset <= len(buffer):
+            raise ValueError(f"offset {offset} is out of range for {len(buffer)} bytes")
+        pos = offset
+        for chunk in self._iter_joined_chunks(_CHUNK_SIZE):
+            data = chunk.encode(encoding)
+            end = pos + len(data)
+            if end > len(buffer):
+                if isinstance(buffer, mmap.mmap):
+                    buffer.resize(end)
+                elif not isinstance(buffer, bytearray):
+                    raise ValueError(f"buffer is too small: {len(buffer)} bytes")
+            buffer[pos:end] = data
+            pos = end
+        return pos - offset
+
+    def write_to(self, fp: IO[str] | IO[bytes], encoding: str = "utf-8") -> None:
+        """Serialize the element into the given text or binary file object.
+
+        The `encoding` is used only if the file is opened in binary mode.
+        """
+        binary = _is_binary_file(fp)
+        for chunk in self._iter_joined_chunks(_CHUNK_SIZE):
+            if binary:
+                fp.write(chunk.encode(encoding))  # type: ignore[arg-type]
+            else:
+                fp.write(chunk)  # type: ignore[call-overload]
+
+    def write_svgz(
+        self,
+        fp: IO[bytes],
+        compresslevel: int = 9,
+        encoding: str = "utf-8",
+        mtime: int = 0,
+    ) -> None:
+        """Write the element as a gzip-compressed SVG (.svgz) into the binary file object.
+
+        The chunks of the document are compressed as they are produced,
+        so the uncompressed document is never kept in memory.
+        The gzip header has the given `mtime` (a Unix timestamp) and no file name,
+        so that the same document always gives the same bytes.
+        """
+        with gzip.GzipFile(filename="", fileobj=fp, mode="wb", compresslevel=compresslevel, mtime=mtime) as stream:
+            for chunk in self._iter_joined_chunks(_CHUNK_SIZE):
+                stream.write(chunk.encode(encoding))
+
+    async def aiter_chunks(
+        self,
+        chunk_size: int = _CHUNK_SIZE,
+        encoding: str = "utf-8",
+    ) -> AsyncIterator[bytes]:
+        """Serialize the element as encoded chunks without blocking the event loop.
+
+        Each chunk is about `chunk_size` characters long. After each chunk,
+        the control is given back to the event loop, so that other tasks
+        can run while a big document is being serialized. For example,
+        the chunks can be directly streamed into an ASGI response body.
+        """
+        for chunk in self._iter_joined_chunks(chunk_size):
+            yield chunk.encode(encoding)
+            await asyncio.sleep(0)
+
     def __str__(self) -> str:
         return self.as_str()
 
@@ -119,6 +455,164 @@ class Element:
         return self.as_str()
 
 
+def _attr_name(field_name: str) -> str:
+    """Convert the name of a dataclass field into the name of SVG attribute.
+    """
+    name = field_name.rstrip("_")
+    name = name.replace("__", ":")
+    name = name.replace("_", "-")
+    return name
+
+
+def _compile_attrs_serializer(cls: type[Element]) -> Callable[[Element], dict[str, str]]:
+    """Generate the body of `Element.as_dict` for the given class.
+
+    Similar to how `dataclasses` generates `__init__`, all field and attribute
+    names are resolved once per class, so that rendering an element
+    only checks which fields are set.
+    """
+    semicolon = bool(set(cls.__bases__) & _SEMICOLON_TYPES)
+    lines = ["def as_dict(self):", "    result = {}"]
+    for field in fields(cls):
+        if field.name in _CONTENT_FIELDS:
+            continue
+        key = _attr_name(field.name)
+        # The key is needed by `_as_str` only to pick the list separator.
+        call = "format_value(val)"
+        if semicolon and key in _SEMICOLON_ATTRS:
+            call = f"as_str(val, {key!r})"
+        lines.extend([
+            f"    val = self.{field.name}",
+            "    if val is not None:",
+            f"        result[{key!r}] = {call}",
+        ])
+    lines.append("    return result")
+    namespace: dict[str, Any] = {}
+    scope = {"as_str": cls._as_str, "format_value": format_value}
+    exec("\n".join(lines), scope, namespace)
+    return namespace["as_dict"]
+
+
+def _can_compile_init(cls: type[Element]) -> bool:
+    """Check if __init__ generated by the dataclass decorator only assigns the fields.
+
+    Otherwise, the class keeps the dataclass __init__. The class itself
+    is not processed by the decorator yet, so its own fields are looked up
+    in the class body.
+    """
+    if hasattr(cls, "__post_init__"):
+        return False
+    try:
+        annotations = cls.__dict__.get("__annotations__") or getattr(cls, "__annotations__", {})
+    except NameError:
+        return False
+    candidates = [value for value in cls.__dict__.values() if isinstance(value, Field)]
+    for base in cls.__mro__[1:]:
+        candidates.extend(base.__dict__.get("__dataclass_fields__", {}).values())
+    if any(_is_init_var(annotation) for annotation in annotations.values()):
+        return False
+    return not any(not f.init or _is_init_var(f.type) for f in candidates)
+
+
+def _is_init_var(annotation: Any) -> bool:
+    # With postponed evaluation, annotations are strings.
+    if isinstance(annotation, str):
+        return "InitVar" in annotation
+    return annotation is InitVar or isinstance(annotation, InitVar)
+
+
+def _make_lazy_init(cls: type[Element]) -> Callable[..., None]:
+    """Make __init__ that replaces itself with the compiled one when first called.
+
+    The fields of the class are known only after the dataclass decorator is applied.
+    """
+    def __init__(self: Element, *args: Any, **kwargs: Any) -> None:
+        init = _compile_init(cls)
+        cls.__init__ = init  # type: ignore[method-assign]
+        init(self, *args, **kwargs)
+    return __init__
+
+
+def _compile_init(cls: type[Element]) -> Callable[..., None]:
+    """Generate __init__ for the given class.
+
+    It is the same as __init__ generated by the dataclass decorator,
+    except that it writes fields directly into the instance __dict__,
+    bypassing `Element.__setattr__` which is needed only to track changes.
+    Also, fields that are None by default are stored only if they are set.
+    Most of the fields are unset, and for them reading the attribute
+    gives the class attribute holding the default None.
+    """
+    scope: dict[str, Any] = {"_MISSING": MISSING}
+    params = []
+    kw_only_params = []
+    # Names of fields are used as parameters, so the locals have a prefix.
+    body = ["    _self_dict = self.__dict__"]
+    for field in fields(cls):
+        if not field.init:
+            continue
+        param = field.name
+        if field.default is not MISSING:
+            scope[f"_default_{field.name}"] = field.default
+            param = f"{field.name}=_default_{field.name}"
+        elif field.default_factory is not MISSING:
+            scope[f"_factory_{field.name}"] = field.default_factory
+            param = f"{field.name}=_MISSING"
+            body.extend([
+                f"    if {field.name} is _MISSING:",
+                f"        {field.name} = _factory_{field.name}()",
+            ])
+        if getattr(field, "kw_only", False):
+            kw_only_params.append(param)
+        else:
+            params.append(param)
+        if field.default is None:
+            # The class attribute already holds None, no need to store it.
+            body.extend([
+                f"    if {field.name} is not None:",
+                f"        _self_dict[{field.name!r}] = {field.name}",
+            ])
+        else:
+            body.append(f"    _self_dict[{field.name!r}] = {field.name}")
+    if kw_only_params:
+        params.append("*")
+        params.extend(kw_only_params)
+    lines = [f"def __init__(self, {', '.join(params)}):", *body]
+    namespace: dict[str, Any] = {}
+    exec("\n".join(lines), scope, namespace)
+    init = namespace["__init__"]
+    init.__qualname__ = f"{cls.__qualname__}.__init__"
+    return init
+
+
+register_formatter(Element, str)
+
+
+def _serialize_elements(elements: list[Any], number_format: NumberFormat | None) -> str:
+    """Serialize the list of children, used by `Element.as_str_parallel`.
+    """
+    if number_format is not None:
+        # Each batch gets its own copy, so that the context can be safely
+        # entered concurrently when the executor uses threads.
+        with replace(number_format):
+            return _serialize_elements(elements, None)
+    parts: list[str] = []
+    for e in elements:
+        if isinstance(e, Element):
+            parts.extend(e._iter_chunks())
+        else:
+            parts.append(format_value(e))
+    return "".join(parts)
+
+
+def _is_binary_file(fp: IO[Any]) -> bool:
+    if isinstance(fp, io.TextIOBase):
+        return False
+    if isinstance(fp, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    return "b" in getattr(fp, "mode", "")
+
+
 @dataclass
 class SVG(
     Element,
@@ -324,7 +818,7 @@ class Path(Element, _FigureElement):
     element_name = "path"
     externalResourcesRequired: bool | None = None
     transform: list[Transform] | None = None
-    d: list[PathData] | None = None
+    d: list[PathData] | PathBuffer | str | None = None
     marker_start: str | None = None
     marker_mid: str | None = None
     marker_end: str | None = None
@@ -420,7 +914,7 @@ class Polyline(Element, _FigureElement):
     element_name = "polyline"
     externalResourcesRequired: bool | None = None
     transform: list[Transform] | None = None
-    points: list[Point] | None = None
+    points: list[Point] | Sequence[Number] | array[float] | memoryview | None = None
     marker_start: str | None = None
     marker_mid: str | None = None
     marker_end: str | None = None
@@ -440,7 +934,7 @@ class Polygon(Element, _FigureElement):
     element_name = "polygon"
     externalResourcesRequired: bool | None = None
     transform: list[Transform] | None = None
-    points: list[Point] | None = None
+    points: list[Point] | Sequence[Number] | array[float] | memoryview | None = None
     marker_start: str | None = None
     marker_mid: str | None = None
     marker_end: str | None = None
@@ -0,0 +1,165 @@
+from decimal import Decimal
+
+import pytest
+
+import svg
+
+
+def bake(*elements):
+    canvas = svg.SVG(elements=list(elements))
+    svg.bake_transforms(canvas)
+    return canvas.elements
+
+
+@pytest.mark.parametrize('element, expected', [
+    (
+        svg.Rect(x=1, y=2, width=3, height=4, transform=[svg.Translate(10, 20)]),
+        '<rect x="11" y="22" width="3" height="4"/>',
+    ),
+    (
+        svg.Rect(x=1, y=2, width=3, height=4, rx=1, transform=[svg.Scale(2, -1)]),
+        '<rect x="2" y="-6" width="6" height="4" rx="2" ry="1"/>',
+    ),
+    (
+        svg.Circle(cx=1, cy=1, r=2, transform=[svg.Scale(-2)]),
+        '<circle cx="-2" cy="-2" r="4"/>',
+    ),
+    (
+        svg.Ellipse(rx=2, ry=1, transform=[svg.Scale(3, 2)]),
+        '<ellipse cx="0" cy="0" rx="6" ry="2"/>',
+    ),
+    (
+        svg.Line(x2=1, y2=1, transform=[svg.Translate(5)]),
+        '<line x1="5" y1="0" x2="6" y2="1"/>',
+    ),
+    (
+        svg.Polyline(points=[svg.Point(0, 0), svg.Point(1, 2)], transform=[svg.Scale(2)]),
+        '<polyline points="0,0 2,4"/>',
+    ),
+    (
+        svg.Path(d='M0 0 h1 a1 1 0 0 1 1 1 Z', transform=[svg.Translate(1, 1)]),
+        '<path d="M 1 1 L 2 1 A 1 1 0 0 1 3 2 Z "/>',
+    ),
+    (
+        svg.Path(d='M0 0 A2 1 30 0 1 1 1', transform=[svg.Scale(-1, 1)]),
+        '<path d="M 0 0 A 2 1 150 0 0 -1 1"/>',
+    ),
+])
+def test_bake_shapes(element, expected):
+    assert [str(e) for e in bake(element)] == [expected]
+
+
+@pytest.mark.parametrize('element', [
+    # a circle cannot be stretched, and a rect cannot be rotated
+    svg.Circle(r=1, transform=[svg.Scale(2, 3)]),
+    svg.Rect(width=1, height=1, transform=[svg.Rotate(45)]),
+    # arcs are only baked for rotations and uniform scales
+    svg.Path(d='M0 0 A1 1 0 0 1 1 1', transform=[svg.SkewX(10)]),
+    # a non-uniform scale would change the width of the stroke
+    svg.Line(x2=1, stroke='red', transform=[svg.Scale(2, 1)]),
+    svg.Rect(width=1, height=1, fill='url(#gradient)', transform=[svg.Translate(1)]),
+    svg.Rect(width=1, height=1, clip_path='url(#clip)', transform=[svg.Translate(1)]),
+    svg.Rect(width=1, height=1, class_=['box'], transform=[svg.Translate(1)]),
+    svg.Rect(width=svg.Length(50, '%'), height=1, transform=[svg.Translate(1)]),
+    svg.Path(d='M0 0 L1 1', marker_end='url(#arrow)', transform=[svg.Rotate(30)]),
+])
+def test_bake_not_exact(element):
+    before = str(element)
+    assert [str(e) for e in bake(element)] == [before]
+
+
+@pytest.mark.parametrize('transform', [
+    [svg.Rotate(30, 1, 2)],
+    [svg.Scale(-2, 2), svg.Rotate(-70)],
+    [svg.Translate(3, 4), svg.Scale(1, -1)],
+])
+def test_bake_keeps_geometry(transform):
+    elements = [
+        svg.Path(d='M1 1 C2 5 6 3 4 2 S1 1 2 0 Q5 5 6 1 T3 3 A3 1 20 1 0 -2 -2 Z', transform=transform),
+        svg.Polygon(points=[svg.Point(0, 0), svg.Point(3, 1), svg.Point(1, 4)], transform=transform),
+        svg.Circle(cx=2, cy=1, r=3, transform=transform),
+    ]
+    expected = [svg.bounding_box(e) for e in elements]
+    baked = bake(*elements)
+    for element, box in zip(baked, expected):
+        assert element.transform is None
+        actual = svg.bounding_box(element)
+        assert (actual.min_x, actual.min_y, actual.max_x, actual.max_y) == pytest.approx(
+            (box.min_x, box.min_y, box.max_x, box.max_y), abs=1e-9,
+        )
+
+
+def test_bake_stroke_width():
+    line = svg.Line(x2=1, stroke='red', stroke_dasharray=[1, 2], transform=[svg.Scale(2)])
+    assert str(bake(line)[0]) == (
+        '<line stroke="red" stroke-dasharray="2 4" stroke-width="2" x1="0" y1="0" x2="2" y2="0"/>'
+    )
+    line = svg.Line(x2=1, transform=[svg.Scale(2, 1)])
+    group = svg.G(stroke='red', stroke_width=3, elements=[line])
+    bake(group)
+    assert line.transform == [svg.Scale(2, 1)]
+    line.transform = [svg.Scale(2)]
+    bake(group)
+    assert line.stroke_width == 6
+    line = svg.Line(x2=1, stroke='red', vector_effect='non-scaling-stroke', transform=[svg.Scale(2, 1)])
+    assert str(bake(line)[0]) == '<line stroke="red" vector-effect="non-scaling-stroke" x1="0" y1="0" x2="2" y2="0"/>'
+
+
+def test_bake_groups():
+    canvas = svg.SVG(elements=[
+        svg.G(
+            transform=[svg.Translate(10, 0)],
+            elements=[
+                svg.Title(text='title'),
+                svg.G(
+                    transform=[svg.Scale(2)],
+                    elements=[svg.Circle(r=1), svg.Rect(width=1, height=1)],
+                ),
+                svg.Line(x2=1),
+            ],
+        ),
+        svg.G(fill='red', transform=[svg.Translate(1)], elements=[svg.Circle(r=1)]),
+        svg.G(transform=[svg.Translate(1)], elements=[svg.Text(text='text')]),
+    ])
+    svg.bake_transforms(canvas)
+    assert [str(e) for e in canvas.elements] == [
+        '<title>title</title>',
+        '<circle cx="10" cy="0" r="2"/>',
+        '<rect x="10" y="0" width="2" height="2"/>',
+        '<line x1="10" y1="0" x2="11" y2="0"/>',
+        '<g fill="red"><circle cx="1" cy="0" r="1"/></g>',
+        '<g transform="translate(1)"><text>text</text></g>',
+    ]
+    assert str(canvas).startswith('<svg xmlns="http://www.w3.org/2000/svg"><title>')
+
+
+def test_bake_stylesheet():
+    rect = svg.Rect(width=1, height=1, transform=[svg.Translate(1)])
+    canvas = svg.SVG(elements=[svg.Style(text='rect { stroke-width: 2 }'), svg.G(elements=[rect])])
+    svg.bake_transforms(canvas)
+    assert rect.transform == [svg.Translate(1)]
+    assert len(canvas.elements) == 2
+
+
+def test_bake_animated():
+    rect = svg.Rect(width=1, height=1, transform=[svg.Scale(2)], elements=[
+        svg.Animate(attributeName='width', to=5, dur=1),
+    ])
+    circle = svg.Circle(r=1, id='c', transform=[svg.Translate(1)])
+    motion = svg.Circle(r=1, transform=[svg.Translate(1)], elements=[
+        svg.AnimateTransform(attributeName='transform', type='rotate', to='90', dur=1),
+    ])
+    group = svg.G(transform=[svg.Translate(1)], elements=[
+        svg.Rect(width=1, height=1, elements=[svg.Set(attributeName='x', to=5)]),
+    ])
+    bake(rect, circle, svg.Animate(href='#c', attributeName='cx', to=5, dur=1), motion, group)
+    assert rect.transform == [svg.Scale(2)]
+    assert circle.transform == [svg.Translate(1)]
+    assert motion.transform == [svg.Translate(1)]
+    assert group.transform == [svg.Translate(1)]
+    assert group.elements[0].x is None
+
+
+def test_bake_decimal():
+    rect = svg.Rect(x=Decimal('0.5'), width=1, height=1, transform=[svg.Translate(Decimal('1.5'))])
+    assert str(bake(rect)[0]) == '<rect x="2.0" y="0.0" width="1" height="1"/>'
@@ -20,3 +20,83 @@ def test_no_deprecated__elements(cls: svg.Element, name: str):
 @pytest.mark.parametrize('cls', svg.Element.__subclasses__())
 def test_element_exported(cls: svg.Element):
     assert cls in vars(svg).values()
+
+
+def test_init_subclass():
+    from dataclasses import dataclass, field
+
+    @dataclass
+    class Custom(svg.Circle):
+        element_name = 'custom'
+        tags: list = field(default_factory=list)
+
+        def __post_init__(self):
+            self.tags.append('new')
+
+    el = Custom(r=2)
+    assert el.r == 2
+    assert el.tags == ['new']
+    assert el.as_str() == '<custom r="2" tags="new"/>'
+    assert Custom().tags is not el.tags
+    assert svg.Circle(r=2) == svg.Circle(r=2)
+
+
+def test_init_subclass_init_false():
+    from dataclasses import dataclass, field
+
+    @dataclass
+    class Custom(svg.Circle):
+        element_name = 'custom'
+        tags: list = field(init=False, default_factory=list)
+
+    el = Custom(r=2)
+    assert el.tags == []
+    assert el.as_str() == '<custom r="2" tags=""/>'
+
+
+def test_init_subclass_init_var():
+    from dataclasses import InitVar, dataclass
+
+    @dataclass
+    class Custom(svg.Circle):
+        element_name = 'custom'
+        scale: InitVar[int] = 1
+
+        def __post_init__(self, scale):
+            self.r *= scale
+
+    assert Custom(r=2, scale=3).as_str() == '<custom r="6"/>'
+
+
+def test_init_subclass_post_init():
+    from dataclasses import dataclass
+
+    @dataclass
+    class Custom(svg.Circle):
+        element_name = 'custom'
+
+        def __post_init__(self):
+            self.fill = 'red'
+
+    assert Custom(r=2).as_str() == '<custom r="2" fill="red"/>'
+
+
+def test_sparse_storage():
+    el = svg.Circle(r=2, fill='red')
+    assert vars(el) == {'r': 2, 'fill': 'red'}
+    assert el.cx is None
+    el.cx = 3
+    el.fill = None
+    assert vars(el) == {'r': 2, 'cx': 3}
+    assert el.fill is None
+    assert el == svg.Circle(cx=3, r=2)
+    assert el.as_dict() == {'cx': '3', 'r': '2'}
+
+
+def test_sparse_storage_non_none_default():
+    el = svg.SVG(xmlns=None)
+    assert el.xmlns is None
+    assert el.as_str() == '<svg/>'
+    el = svg.SVG()
+    el.xmlns = None
+    assert el.as_str() == '<svg/>'
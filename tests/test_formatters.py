@@ -0,0 +1,203 @@
+from datetime import timedelta
+from array import array
+from decimal import Decimal
+from enum import Enum, IntEnum
+
+import pytest
+
+import svg
+from svg import _formatters
+from svg._formatters import format_value
+
+
+class Color(Enum):
+    RED = 'red'
+
+
+class Size(IntEnum):
+    BIG = 10
+
+
+@pytest.mark.parametrize("input, expected", [
+    (None, ""),
+    ("a", "a"),
+    (1, "1"),
+    (1.5, "1.5"),
+    (True, "true"),
+    (False, "false"),
+    (Color.RED, "red"),
+    (Size.BIG, "10"),
+    ([1, "a", True], "1 a true"),
+    ((1, 2), "1 2"),
+    (timedelta(seconds=2), "2s"),
+    (svg.Length(2, "px"), "2px"),
+    (svg.Point(1, 2), "1,2"),
+    (svg.Translate(1, 2), "translate(1 2)"),
+    (svg.Arc(1, 2, 3, True, False, 4, 5), "A 1 2 3 1 0 4 5"),
+    (svg.Circle(r=1), '<circle r="1"/>'),
+    (array('d', [1, 2.5, -0.0]), "1 2.5 0"),
+    (array('i', [1, 2]), "1 2"),
+    (memoryview(array('d', [1e-7, 3])), "1e-07 3"),
+    (array('d'), ""),
+])
+def test_format_value(input, expected):
+    assert format_value(input) == expected
+
+
+@pytest.fixture
+def restore_formatters():
+    """Unregister the formatters that the test registers for test-only types.
+    """
+    saved = dict(_formatters._formatters)
+    yield
+    _formatters._formatters.clear()
+    _formatters._formatters.update(saved)
+    _formatters._resolved.clear()
+
+
+class Celsius(float):
+    pass
+
+
+class Vector:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class Vector3(Vector):
+    pass
+
+
+def test_register_formatter(restore_formatters):
+    svg.register_formatter(Vector, lambda v: f"{v.x} {v.y}")
+    assert format_value(Vector(1, 2)) == "1 2"
+    assert format_value(Vector3(3, 4)) == "3 4"
+    assert svg.Rect(x=Vector(1, 2)).as_str() == '<rect x="1 2"/>'
+
+    svg.register_formatter(Vector3, lambda v: "v3")
+    assert format_value(Vector(1, 2)) == "1 2"
+    assert format_value(Vector3(3, 4)) == "v3"
+
+
+class FloatColor(float, Enum):
+    HALF = 0.5
+
+
+def test_register_formatter_for_subclass_of_builtin(restore_formatters):
+    assert format_value(Celsius(1.5)) == "1.5"
+    with svg.NumberFormat(precision=2):
+        assert format_value(Celsius(1.23456)) == "1.23"
+        assert svg.Circle(cx=Celsius(1.23456)).as_str() == '<circle cx="1.23"/>'
+        assert format_value(FloatColor.HALF) == "0.5"
+        assert format_value(Size.BIG) == "10"
+    svg.register_formatter(Celsius, lambda v: f"{v}C")
+    assert format_value(Celsius(1.5)) == "1.5C"
+    assert format_value(1.5) == "1.5"
+
+
+@pytest.mark.parametrize("input, options, expected", [
+    (5, {}, "5"),
+    (5.0, {}, "5"),
+    (-0.0, {}, "0"),
+    (0.5, {}, "0.5"),
+    (0.5, {"leading_zero": False}, ".5"),
+    (-0.5, {"leading_zero": False}, "-.5"),
+    (0.1 + 0.2, {}, "0.30000000000000004"),
+    (0.1 + 0.2, {"precision": 3}, "0.3"),
+    (12.300000000000001, {"precision": 2}, "12.3"),
+    (2.0001, {"precision": 2}, "2"),
+    (-0.0001, {"precision": 2}, "0"),
+    (1e-7, {}, "1e-07"),
+    (1e-7, {"precision": 8}, "0.0000001"),
+    (Decimal("1.500"), {}, "1.5"),
+    (Decimal("1E+2"), {}, "100"),
+    (Decimal("0.125"), {"precision": 2, "leading_zero": False}, ".12"),
+])
+def test_number_format(input, options, expected):
+    assert svg.NumberFormat(**options).format(input) == expected
+
+
+class Float64(float):
+    def __repr__(self):
+        return f"Float64({float(self)})"
+
+
+def test_number_format_float_subclass():
+    assert svg.NumberFormat().format(Float64(1.5)) == "1.5"
+
+
+def test_number_format_context():
+    assert format_value(5.0) == "5.0"
+    with svg.NumberFormat(precision=1, leading_zero=False):
+        assert format_value(5.0) == "5"
+        assert format_value(0.25) == ".2"
+        with svg.NumberFormat():
+            assert format_value(0.25) == "0.25"
+        assert format_value(Decimal("0.25")) == ".2"
+    assert format_value(5.0) == "5.0"
+
+
+def test_number_format_everywhere():
+    canvas = svg.SVG(
+        viewBox=svg.ViewBoxSpec(0.0, 0.0, 10.5, 20.0),
+        elements=[
+            svg.Path(
+                d=[svg.M(1.0, 2.25), svg.Arc(1.0, 1.0, 0.0, True, False, 0.1 + 0.2, 4.0)],
+                transform=[
+                    svg.Matrix(1.0, 0.0, 0.0, 1.0, 0.5, 0.5),
+                    svg.Translate(1.0, 2.0),
+                    svg.Scale(2.0),
+                    svg.Rotate(45.0, 1.0, 1.0),
+                    svg.SkewX(10.0),
+                    svg.SkewY(10.0),
+                ],
+                stroke_width=svg.Length(1.50, "px"),
+            ),
+            svg.Polyline(points=[svg.Point(0.0, 0.5)]),
+        ],
+    )
+    with svg.NumberFormat(precision=2, leading_zero=False):
+        actual = canvas.as_str()
+    assert actual == (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10.5 20">'
+        '<path stroke-width="1.5px" transform="matrix(1 0 0 1 .5 .5) translate(1 2)'
+        ' scale(2) rotate(45 1 1) skewX(10) skewY(10)" d="M 1 2.25 A 1 1 0 1 0 .3 4"/>'
+        '<polyline points="0,.5"/>'
+        '</svg>'
+    )
+
+
+def test_number_format_asyncio():
+    import asyncio
+
+    number_format = svg.NumberFormat(precision=1)
+    canvas = svg.SVG(elements=[svg.Circle(cx=i / 3) for i in range(200)])
+
+    async def handler():
+        with number_format:
+            chunks = [chunk async for chunk in canvas.aiter_chunks(chunk_size=64)]
+            assert _formatters.get_number_format() is number_format
+        assert _formatters.get_number_format() is None
+        return b"".join(chunks)
+
+    async def main():
+        return await asyncio.gather(handler(), handler())
+
+    first, second = asyncio.run(main())
+    assert first == second
+    assert b'cx="0.3"' in first
+
+
+def test_format_numpy_array():
+    np = pytest.importorskip('numpy')
+    assert format_value(np.array([[1, 2.5], [3, 4]])) == '1 2.5 3 4'
+    assert format_value(np.arange(3)) == '0 1 2'
+
+
+def test_format_points():
+    points = array('d', [1, 2, 3.25, 4])
+    assert str(svg.Polyline(points=points)) == '<polyline points="1 2 3.25 4"/>'
+    assert str(svg.Polygon(points=[1, 2, 3.25, 4])) == '<polygon points="1 2 3.25 4"/>'
+    with svg.NumberFormat(precision=1, leading_zero=False):
+        assert str(svg.Polyline(points=array('d', [0.25, -0.04]))) == '<polyline points=".2 0"/>'
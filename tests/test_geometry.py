@@ -0,0 +1,194 @@
+import math
+import random
+
+import pytest
+
+import svg
+from svg._geometry import _arc_center
+
+
+def box(min_x, min_y, max_x, max_y):
+    return svg.BoundingBox(min_x, min_y, max_x, max_y)
+
+
+def assert_box(actual, expected):
+    assert actual is not None
+    for name in ('min_x', 'min_y', 'max_x', 'max_y'):
+        assert getattr(actual, name) == pytest.approx(getattr(expected, name), abs=1e-9)
+
+
+@pytest.mark.parametrize('element, expected', [
+    (svg.Rect(x=1, y=2, width=10, height=5), box(1, 2, 11, 7)),
+    (svg.Rect(width=svg.Length(10, 'px'), height=5, rx=2), box(0, 0, 10, 5)),
+    (svg.Circle(cx=5, cy=5, r=2), box(3, 3, 7, 7)),
+    (svg.Ellipse(cx=0, cy=0, rx=4, ry=2), box(-4, -2, 4, 2)),
+    (svg.Line(x1=3, y1=4, x2=1, y2=8), box(1, 4, 3, 8)),
+    (svg.Polyline(points=[svg.Point(1, 5), svg.Point(-1, 2)]), box(-1, 2, 1, 5)),
+    (svg.Polygon(points=[svg.Point(1, 5), svg.Point(-1, 2)]), box(-1, 2, 1, 5)),
+    (svg.Path(d=[svg.M(0, 0), svg.C(0, 10, 10, 10, 10, 0)]), box(0, 0, 10, 7.5)),
+    (svg.Path(d=[svg.M(0, 0), svg.Q(5, 10, 10, 0)]), box(0, 0, 10, 5)),
+    (svg.Path(d=[svg.M(0, 0), svg.Arc(5, 5, 0, False, True, 10, 0)]), box(0, -5, 10, 0)),
+    (svg.Path(d=[svg.M(0, 0), svg.Arc(5, 5, 0, False, False, 10, 0)]), box(0, 0, 10, 5)),
+    (svg.Path(d=[svg.M(0, 0), svg.Arc(1, 1, 0, False, False, 10, 0)]), box(0, 0, 10, 5)),
+    (svg.Path(d="m1 1 h2 v-3 z m5 5"), box(1, -2, 6, 6)),
+    (svg.Path(d=svg.PathBuffer.from_path_data([svg.M(1, 2), svg.L(-3, 4)])), box(-3, 2, 1, 4)),
+    (svg.Path(d=svg.PathBuffer.from_path_data([svg.M(0, 0), svg.Q(5, 10, 10, 0)])), box(0, 0, 10, 5)),
+])
+def test_bounding_box(element, expected):
+    assert_box(svg.bounding_box(element), expected)
+
+
+@pytest.mark.parametrize('element, expected', [
+    (svg.Rect(width=10, height=10, transform=[svg.Rotate(45)]), box(-50 ** .5, 0, 50 ** .5, 200 ** .5)),
+    (svg.Ellipse(rx=4, ry=2, transform=[svg.Rotate(90)]), box(-2, -4, 2, 4)),
+    (svg.Circle(r=1, transform=[svg.Translate(5, 5), svg.Scale(2, 3)]), box(3, 2, 7, 8)),
+    (svg.Polyline(points=[svg.Point(0, 0), svg.Point(1, 0)], transform=[svg.Rotate(90, 1, 1)]), box(2, 0, 2, 1)),
+    (svg.Line(x2=1, y2=1, transform=[svg.SkewX(45), svg.Matrix(1, 0, 0, 1, 2, 0)]), box(2, 0, 4, 1)),
+])
+def test_bounding_box_transform(element, expected):
+    assert_box(svg.bounding_box(element), expected)
+
+
+def test_bounding_box_container():
+    canvas = svg.SVG(elements=[
+        svg.G(
+            transform=[svg.Translate(100, 0)],
+            elements=[
+                svg.Line(x1=0, y1=0, x2=1, y2=1),
+                svg.G(transform=[svg.Scale(2)], elements=[svg.Circle(r=1)]),
+            ],
+        ),
+        svg.Defs(elements=[svg.Rect(width=1000, height=1000)]),
+        svg.Polyline(points=[svg.Point(-1, -1), svg.Point(3, 3)]),
+        svg.Text(text='not included'),
+    ])
+    result = svg.bounding_box(canvas)
+    assert_box(result, box(-1, -2, 102, 3))
+    assert result.to_view_box(1) == svg.ViewBoxSpec(-2, -3, 105, 7)
+    assert svg.bounding_box(svg.SVG()) is None
+    assert svg.bounding_box(svg.G(elements=[svg.Defs()])) is None
+
+
+def test_bounding_box_curve_extrema():
+    rnd = random.Random(15)
+    for _ in range(100):
+        args = [rnd.uniform(-10, 10) for _ in range(8)]
+        start, cmd = svg.M(*args[:2]), svg.C(*args[2:])
+        result = svg.bounding_box([start, cmd])
+        xs = [
+            (1 - t) ** 3 * args[0] + 3 * (1 - t) ** 2 * t * args[2] + 3 * (1 - t) * t ** 2 * args[4] + t ** 3 * args[6]
+            for t in (i / 1000 for i in range(1001))
+        ]
+        assert min(xs) == pytest.approx(result.min_x, abs=1e-3)
+        assert max(xs) == pytest.approx(result.max_x, abs=1e-3)
+        assert min(xs) >= result.min_x - 1e-9
+
+
+def test_bounding_box_arc_extrema():
+    rnd = random.Random(15)
+    for _ in range(100):
+        arc = svg.Arc(
+            rnd.uniform(1, 10), rnd.uniform(1, 10), rnd.uniform(0, 360),
+            rnd.random() < .5, rnd.random() < .5, rnd.uniform(-10, 10), rnd.uniform(-10, 10),
+        )
+        result = svg.bounding_box([svg.M(0, 0), arc])
+        cx, cy, rx, ry, phi, theta, delta = _arc_center(0, 0, arc)
+        points = []
+        for i in range(1001):
+            t = theta + delta * i / 1000
+            points.append((
+                cx + rx * math.cos(phi) * math.cos(t) - ry * math.sin(phi) * math.sin(t),
+                cy + rx * math.sin(phi) * math.cos(t) + ry * math.cos(phi) * math.sin(t),
+            ))
+        assert points[-1] == pytest.approx((arc.x, arc.y))
+        assert min(x for x, _ in points) == pytest.approx(result.min_x, abs=1e-3)
+        assert max(y for _, y in points) == pytest.approx(result.max_y, abs=1e-3)
+
+
+def test_bounding_box_cache():
+    rect = svg.Rect(width=10, height=10)
+    assert_box(svg.bounding_box(rect), box(0, 0, 10, 10))
+    assert 'bbox' in rect.__dict__['_cached_geometry']
+    rect.width = 20
+    assert_box(svg.bounding_box(rect), box(0, 0, 20, 10))
+
+    path = svg.Path(d=[svg.M(0, 0), svg.L(1, 1)])
+    assert_box(svg.bounding_box(path), box(0, 0, 1, 1))
+    path.d.append(svg.L(5, 5))
+    assert_box(svg.bounding_box(path), box(0, 0, 1, 1))
+    path.invalidate_cache()
+    assert_box(svg.bounding_box(path), box(0, 0, 5, 5))
+
+
+def test_bounding_box_decimal():
+    from decimal import Decimal
+    assert_box(svg.bounding_box(svg.Circle(cx=Decimal(1), r=Decimal(2))), box(-1, -2, 3, 2))
+    rect = svg.Rect(x=Decimal(1), width=Decimal(2), height=Decimal(2), transform=[svg.Rotate(90)])
+    assert_box(svg.bounding_box(rect), box(-2, 1, 0, 3))
+    path = [svg.M(Decimal(0), 0), svg.c(1.5, 0, Decimal(3), 0, 3, 0), svg.Arc(1, 1, 0, False, True, Decimal(5), 0)]
+    assert_box(svg.bounding_box(path), box(0, -1, 5, 0))
+
+
+def test_bounding_box_relative_length():
+    with pytest.raises(ValueError):
+        svg.bounding_box(svg.Rect(width=svg.Length(50, '%'), height=10))
+
+
+@pytest.mark.parametrize('d, expected', [
+    ('', 0),
+    ('M0 0 L3 4', 5),
+    ('M0 0 h10 v10 h-10 z', 40),
+    ('M0 0 L10 0 M0 10 L10 10', 20),
+    ('M0 0 A5 5 0 0 1 10 0', 5 * math.pi),
+    ('M0 0 A5 5 0 1 1 0 0.0001', 10 * math.pi),
+    ('M0 0 Q5 0 10 0', 10),
+    ('M0 0 C1 0 2 0 3 0', 3),
+    # arc with zero radius is a line
+    ('M0 0 A0 5 0 0 1 10 0', 10),
+])
+def test_path_length(d, expected):
+    assert svg.path_length(d, tolerance=1e-4) == pytest.approx(expected, rel=1e-4)
+
+
+def test_path_length_curve():
+    # the length of a parabola segment y = x^2 for x in [0, 1]
+    expected = (2 * 5 ** .5 + math.asinh(2)) / 4
+    assert svg.path_length([svg.M(0, 0), svg.Q(0.5, 0, 1, 1)], tolerance=1e-5) == pytest.approx(expected, rel=1e-6)
+
+
+def test_path_length_curve_backtracking():
+    # the control points are on the chord line, but beyond its ends
+    path = [svg.M(0, 0), svg.C(10, 0, -5, 0, 1, 0)]
+    assert svg.path_length(path, tolerance=1e-4) == pytest.approx(9.0131, rel=1e-4)
+    # the curve turns back at x = 3.5392
+    point = svg.point_at_length(path, 4.5, tolerance=1e-4)
+    assert (point.x, point.y) == pytest.approx((2.5784, 0), abs=1e-3)
+
+
+def test_point_at_length():
+    path = svg.Path(d='M0 0 L10 0 M0 10 L10 10')
+    assert svg.point_at_length(path, -5) == svg.Point(0, 0)
+    assert svg.point_at_length(path, 5) == svg.Point(5, 0)
+    assert svg.point_at_length(path, 15) == svg.Point(5, 10)
+    assert svg.point_at_length(path, 25) == svg.Point(10, 10)
+    point = svg.point_at_length('M0 0 A5 5 0 0 0 10 0', 5 * math.pi / 2, tolerance=1e-4)
+    assert (point.x, point.y) == pytest.approx((5, 5), abs=1e-3)
+    with pytest.raises(ValueError):
+        svg.point_at_length(svg.Path(), 1)
+
+
+def test_path_length_decimal():
+    from decimal import Decimal
+    path = [svg.M(Decimal(0), 0), svg.Q(Decimal(5), 0, 10, Decimal(0)), svg.a(5, 5, 0, 0, 1, Decimal(-10), 0)]
+    assert svg.path_length(path, tolerance=1e-4) == pytest.approx(10 + 5 * math.pi, rel=1e-4)
+    assert svg.point_at_length(path, Decimal(5)) == svg.Point(5, 0)
+
+
+def test_path_length_cache():
+    path = svg.Path(d=[svg.M(0, 0), svg.L(10, 0)])
+    assert svg.path_length(path) == 10
+    table = path.__dict__['_cached_geometry']['lengths'][1]
+    assert svg.point_at_length(path, 3) == svg.Point(3, 0)
+    assert path.__dict__['_cached_geometry']['lengths'][1] is table
+    path.d = [svg.M(0, 0), svg.L(20, 0)]
+    assert svg.path_length(path) == 20
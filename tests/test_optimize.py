@@ -0,0 +1,323 @@
+import pytest
+
+import svg
+from svg._dedupe import dedupe_subtrees
+
+
+def optimize(passes, *elements):
+    canvas = svg.SVG(elements=list(elements))
+    svg.optimize(canvas, passes)
+    return [str(e) for e in canvas.elements or ()]
+
+
+def test_optimize_stats():
+    canvas = svg.SVG(elements=[
+        svg.G(elements=[svg.G(), svg.Defs()]),
+        svg.Rect(x=0, y=0.12345, width=10, height=10, opacity=1),
+    ])
+    stats = svg.optimize(canvas)
+    assert [s.name for s in stats] == [
+        'remove_empty_containers',
+        'remove_default_attributes',
+        'bake_transforms',
+        'collapse_groups',
+        'merge_paths',
+        'dedupe_subtrees',
+        'hoist_classes',
+    ]
+    assert [s.bytes_saved for s in stats] == [18, 18, 0, 0, 0, 0, 0]
+    assert all(s.seconds >= 0 for s in stats)
+    assert canvas.as_str() == '<svg xmlns="http://www.w3.org/2000/svg"><rect y="0.12345" width="10" height="10"/></svg>'
+    assert '_cached_str' not in canvas.__dict__
+    assert '_cached_str' not in canvas.elements[0].__dict__
+
+
+def test_optimize_custom_pass():
+    def remove_titles(root):
+        root.elements = [e for e in root.elements if not isinstance(e, svg.Title)]
+
+    stats = svg.optimize(svg.SVG(elements=[svg.Title(text='title'), svg.Circle()]), [remove_titles])
+    assert stats[0].name == 'remove_titles'
+    assert stats[0].bytes_saved == len('<title>title</title>')
+    svg.register_pass('remove_titles', remove_titles)
+    assert optimize(['remove_titles'], svg.Title(text='title'), svg.Circle()) == ['<circle/>']
+    with pytest.raises(ValueError):
+        svg.optimize(svg.SVG(), ['unknown'])
+
+
+def test_remove_empty_containers():
+    assert optimize(
+        ['remove_empty_containers'],
+        svg.G(elements=[svg.G(elements=[svg.Defs(elements=[])])]),
+        svg.G(id='target'),
+        svg.G(filter='url(#flood)'),
+        svg.G(elements=[svg.Circle()]),
+    ) == ['<g id="target"/>', '<g filter="url(#flood)"/>', '<g><circle/></g>']
+
+
+def test_remove_default_attributes():
+    assert optimize(
+        ['remove_default_attributes'],
+        svg.Rect(x=0, y=1, width=0, stroke='none', stroke_width=1, opacity=1.0, class_=[], fill_opacity=True),
+        svg.Line(x1=0, y1=0, x2=5, y2=0, stroke_linecap='butt'),
+        # inherited properties stay if an ancestor sets them to something else
+        svg.G(stroke_width=2, elements=[svg.Rect(stroke_width=1, stroke_miterlimit=4)]),
+        # the content of defs can inherit properties from `use`
+        svg.Defs(elements=[svg.Path(stroke_width=1, opacity=1)]),
+        svg.Path(id='reused', stroke_width=1),
+    ) == [
+        '<rect y="1" width="0" fill-opacity="true"/>',
+        '<line x2="5"/>',
+        '<g stroke-width="2"><rect stroke-width="1"/></g>',
+        '<defs><path stroke-width="1"/></defs>',
+        '<path stroke-width="1" id="reused"/>',
+    ]
+
+
+def test_remove_default_attributes_stylesheet():
+    assert optimize(
+        ['remove_default_attributes'],
+        svg.Style(text='g { stroke-width: 2 }'),
+        svg.G(elements=[svg.Circle(stroke_width=1, opacity=1)]),
+    )[1] == '<g><circle stroke-width="1"/></g>'
+
+
+def test_collapse_groups():
+    assert optimize(
+        ['collapse_groups'],
+        svg.G(elements=[svg.G(elements=[svg.Circle(), svg.Rect()])]),
+        svg.G(
+            fill='red', stroke='blue', opacity=0.5, transform=[svg.Translate(1)],
+            elements=[svg.Circle(fill='green', opacity=0.5, transform=[svg.Scale(2)])],
+        ),
+        svg.G(id='target', elements=[svg.Circle()]),
+        svg.G(clip_path='url(#clip)', elements=[svg.Circle()]),
+        svg.G(fill='red', elements=[svg.Animate(fill='freeze')]),
+    ) == [
+        '<circle/>',
+        '<rect/>',
+        '<circle stroke="blue" opacity="0.25" transform="translate(1) scale(2)" fill="green"/>',
+        '<g id="target"><circle/></g>',
+        '<g clip-path="url(#clip)"><circle/></g>',
+        '<g fill="red"><animate fill="freeze"/></g>',
+    ]
+
+
+def test_collapse_groups_animated():
+    assert optimize(
+        ['collapse_groups'],
+        svg.G(opacity=0.5, elements=[svg.Rect(opacity=0.5, elements=[svg.Animate(attributeName='opacity', to=1)])]),
+        svg.G(transform=[svg.Translate(1)], elements=[svg.Circle(id='c')]),
+        svg.AnimateTransform(href='#c', attributeName='transform', type='scale', to='2'),
+    ) == [
+        '<g opacity="0.5"><rect opacity="0.5"><animate to="1" attributeName="opacity"/></rect></g>',
+        '<g transform="translate(1)"><circle id="c"/></g>',
+        '<animateTransform to="2" href="#c" type="scale" attributeName="transform"/>',
+    ]
+
+
+def test_collapse_groups_animation_child():
+    canvas = svg.SVG(elements=[
+        svg.G(elements=[svg.Animate(attributeName='opacity', values=[0, 1], dur='1s'), svg.Rect(width=1, height=1)]),
+        svg.Circle(r=1),
+    ])
+    svg.optimize(canvas)
+    group = canvas.elements[0]
+    assert isinstance(group, svg.G)
+    assert [type(e) for e in group.elements] == [svg.Animate, svg.Rect]
+
+
+def test_round_numbers():
+    assert optimize(
+        ['round_numbers'],
+        svg.Circle(cx=1.00001, cy=svg.Length(2.12345, 'mm'), r=3),
+        svg.Polyline(points=[svg.Point(0.1234, 5.0)], transform=[svg.Rotate(33.3333333)]),
+        svg.Path(d=[svg.M(0.1234, 0), svg.l(0.1234, 0), svg.l(0.1234, 0), svg.l(0.1234, 0), svg.h(0.1234), svg.Z()]),
+    ) == [
+        '<circle cx="1" cy="2.123mm" r="3"/>',
+        '<polyline transform="rotate(33.33333)" points="0.123,5"/>',
+        '<path d="M 0.123 0 l 0.124 0 l 0.123 0 l 0.124 0 h 0.123 Z "/>',
+    ]
+    canvas = svg.SVG(elements=[svg.Path(d=svg.PathBuffer.from_path_data([svg.M(1.55, 0), svg.L(1.25, 1)]))])
+    with svg.NumberFormat(precision=1):
+        svg.optimize(canvas, ['round_numbers'])
+    assert str(canvas.elements[0].d) == 'M 1.6 0 L 1.2 1'
+
+
+def test_merge_paths():
+    assert optimize(
+        ['merge_paths'],
+        svg.Line(x1=0, y1=0, x2=1, y2=1, stroke='red'),
+        svg.Polyline(points=[svg.Point(1, 1), svg.Point(2, 0)], stroke='red', fill='none'),
+        svg.Path(d='m5 5 l1 1', stroke='red', fill='none'),
+        svg.Path(d='m5 5 l1 1', stroke='blue', fill='none'),
+        svg.Path(id='target', d='m5 5 l1 1', stroke='blue', fill='none'),
+        svg.Path(d='m5 5 l1 1', stroke='blue', fill='none', class_=['series']),
+        svg.Path(d='m6 6 l1 1', stroke='blue', fill='none', class_=['series']),
+    ) == [
+        '<line stroke="red" x1="0" y1="0" x2="1" y2="1"/>',
+        '<path stroke="red" d="M 1 1 L 2 0 M 5 5 l 1 1" fill="none"/>',
+        '<path stroke="blue" d="m5 5 l1 1" fill="none"/>',
+        '<path stroke="blue" id="target" d="m5 5 l1 1" fill="none"/>',
+        '<path stroke="blue" class="series" d="M 5 5 l 1 1 M 6 6 l 1 1" fill="none"/>',
+    ]
+
+
+def test_merge_paths_filled():
+    bars = [svg.Rect(x=i * 10, y=0, width=10, height=i + 1, fill='teal') for i in range(3)]
+    assert optimize(['merge_paths'], *bars, svg.Rect(x=5, y=0, width=10, height=1, fill='teal')) == [
+        '<path d="M 0 0 L 10 0 L 10 1 L 0 1 Z  M 10 0 L 20 0 L 20 2 L 10 2 Z  M 20 0 L 30 0 L 30 3 L 20 3 Z " fill="teal"/>',
+        '<rect x="5" y="0" width="10" height="1" fill="teal"/>',
+    ]
+    # overlapping fills, fills with strokes, and translucent strokes are not merged
+    elements = [
+        svg.Circle(r=2, fill='teal', stroke='black'),
+        svg.Circle(cx=10, r=2, fill='teal', stroke='black'),
+        svg.Line(x2=1, stroke='rgba(0, 0, 0, 0.5)'),
+        svg.Line(x2=1, stroke='rgba(0, 0, 0, 0.5)'),
+        svg.Line(x2=1, stroke='black', opacity=0.5),
+        svg.Line(x2=1, stroke='black', opacity=0.5),
+        svg.Rect(width=0, height=1, stroke='black', fill='none'),
+        svg.Rect(width=0, height=1, stroke='black', fill='none'),
+    ]
+    assert optimize(['merge_paths'], *elements) == [str(e) for e in elements]
+
+
+def test_merge_paths_inherited():
+    lines = [svg.Line(x2=i) for i in range(1, 3)]
+    canvas = svg.SVG(elements=[svg.G(stroke='black', elements=lines)])
+    svg.optimize(canvas, ['merge_paths'])
+    assert str(canvas.elements[0]) == '<g stroke="black"><path d="M 0 0 L 1 0 M 0 0 L 2 0"/></g>'
+    # the group can be used with a different stroke
+    canvas = svg.SVG(elements=[
+        svg.G(id='lines', elements=[svg.Line(x2=i, stroke='black') for i in range(1, 3)]),
+        svg.Use(href='#lines', stroke_opacity=0.5),
+    ])
+    svg.optimize(canvas, ['merge_paths'])
+    assert len(canvas.elements[0].elements) == 2
+
+
+def test_merge_paths_buffer():
+    canvas = svg.SVG(elements=[
+        svg.Path(d=svg.PathBuffer.from_path_data([svg.m(1, 1), svg.l(1, 0)]), stroke='red', fill='none'),
+        svg.Path(d=svg.PathBuffer.from_path_data([svg.m(1, 1), svg.l(1, 0)]), stroke='red', fill='none'),
+        svg.Polyline(points=[svg.Point(0, 0), svg.Point(1, 0)], stroke='red', fill='none'),
+    ])
+    svg.optimize(canvas, ['merge_paths'])
+    assert len(canvas.elements) == 1
+    assert isinstance(canvas.elements[0].d, svg.PathBuffer)
+    assert str(canvas.elements[0].d) == 'M 1 1 l 1 0 M 1 1 l 1 0 M 0 0 L 1 0'
+
+
+def test_merge_paths_empty_points():
+    svg.optimize(svg.SVG(elements=[
+        svg.Polyline(stroke='red', fill='none'),
+        svg.Polyline(points=[0, 0, 5, 5], stroke='red', fill='none'),
+    ]))
+    assert optimize(
+        ['merge_paths'],
+        svg.Polyline(stroke='red', fill='none'),
+        svg.Polyline(points=[0, 0, 5, 5], stroke='red', fill='none'),
+        svg.Polygon(points=[1, 1], stroke='red', fill='none'),
+        svg.Polyline(points=[], stroke='red', fill='none'),
+    ) == [
+        '<polyline stroke="red" fill="none"/>',
+        '<polyline stroke="red" points="0 0 5 5" fill="none"/>',
+        '<polygon stroke="red" points="1 1" fill="none"/>',
+        '<polyline stroke="red" points="" fill="none"/>',
+    ]
+
+
+def icon(x, y):
+    return svg.G(transform=[svg.Translate(x, y)], elements=[
+        svg.Circle(r=5, fill='red'),
+        svg.Path(d='M -3 0 L 3 0 M 0 -3 L 0 3', stroke='white'),
+    ])
+
+
+def test_dedupe_subtrees():
+    canvas = svg.SVG(elements=[
+        icon(10, 20),
+        svg.Rect(width=1, height=1),
+        icon(30, 40),
+        svg.G(transform=[svg.Rotate(45)], elements=[icon(0, 0).elements[0], icon(0, 0).elements[1]]),
+        svg.Rect(width=1, height=1),
+    ])
+    svg.optimize(canvas, ['dedupe_subtrees'])
+    assert [str(e) for e in canvas.elements] == [
+        '<defs><g id="d0"><circle r="5" fill="red"/><path stroke="white" d="M -3 0 L 3 0 M 0 -3 L 0 3"/></g></defs>',
+        '<use href="#d0" x="10" y="20"/>',
+        '<rect width="1" height="1"/>',
+        '<use href="#d0" x="30" y="40"/>',
+        '<use href="#d0" transform="rotate(45)"/>',
+        # too small to be worth it
+        '<rect width="1" height="1"/>',
+    ]
+
+
+def test_dedupe_subtrees_nested():
+    canvas = svg.SVG(elements=[
+        svg.G(id='d0', elements=[icon(0, 0), icon(5, 5)]),
+        svg.G(elements=[icon(0, 0), icon(5, 5)]),
+        svg.G(elements=[icon(0, 0), icon(5, 5)]),
+    ])
+    svg.optimize(canvas, ['dedupe_subtrees'])
+    defs, first, second, third = canvas.elements
+    # the whole repeated group is moved, and then the icons inside are still repeated
+    assert [e.id for e in defs.elements] == ['d1', 'd2']
+    assert str(second) == str(third) == '<use href="#d1"/>'
+    assert str(first) == '<g id="d0"><use href="#d2"/><use href="#d2" x="5" y="5"/></g>'
+    assert str(defs.elements[0]).startswith('<g id="d1"><g transform="translate(0 0)"><circle')
+
+
+def test_dedupe_subtrees_no_cache():
+    small = svg.Rect(width=1, height=1)
+    canvas = svg.SVG(elements=[icon(0, 0), icon(1, 1), small, svg.Rect(width=1, height=1)])
+    dedupe_subtrees(canvas)
+    assert '_cached_str' not in small.__dict__
+
+
+def test_dedupe_subtrees_stylesheet():
+    canvas = svg.SVG(elements=[svg.Style(text='g > circle { fill: blue }'), icon(0, 0), icon(1, 1)])
+    svg.optimize(canvas, ['dedupe_subtrees'])
+    assert len(canvas.elements) == 3
+
+
+def test_hoist_classes():
+    canvas = svg.SVG(elements=[
+        *[svg.Circle(cx=i, r=1, fill='red', stroke='blue', stroke_width=2) for i in range(3)],
+        svg.Text(text='label', font_size=12, font_family='Arial', class_=['label']),
+        svg.Text(text='label', font_size=12, font_family='Arial'),
+        svg.Text(text='label', font_size=12, font_family='Arial', style='fill: red'),
+        svg.Circle(r=1, fill='red'),
+        svg.Circle(r=1, fill='red'),
+        svg.Animate(fill='freeze'),
+        svg.Animate(fill='freeze'),
+        svg.Animate(fill='freeze'),
+    ])
+    svg.optimize(canvas, ['hoist_classes'])
+    assert [str(e) for e in canvas.elements] == [
+        '<style>:where(.c0){fill:red;stroke:blue;stroke-width:2}:where(.c1){font-family:Arial;font-size:12px}</style>',
+        '<circle class="c0" cx="0" r="1"/>',
+        '<circle class="c0" cx="1" r="1"/>',
+        '<circle class="c0" cx="2" r="1"/>',
+        '<text class="label c1">label</text>',
+        '<text class="c1">label</text>',
+        '<text class="c1" style="fill: red">label</text>',
+        # not worth a class
+        '<circle r="1" fill="red"/>',
+        '<circle r="1" fill="red"/>',
+        '<animate fill="freeze"/>',
+        '<animate fill="freeze"/>',
+        '<animate fill="freeze"/>',
+    ]
+
+
+def test_hoist_classes_stylesheet():
+    canvas = svg.SVG(elements=[
+        svg.Style(text='.c0 { stroke: green }'),
+        *[svg.Rect(width=i, height=1, class_=['c0'], fill='red', stroke='blue') for i in range(10)],
+    ])
+    svg.optimize(canvas, ['hoist_classes'])
+    assert str(canvas.elements[0]) == '<style>:where(.c1){fill:red;stroke:blue}</style>'
+    assert str(canvas.elements[2]) == '<rect class="c0 c1" width="0" height="1"/>'
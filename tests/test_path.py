@@ -0,0 +1,171 @@
+from array import array
+
+import pytest
+
+import svg
+
+
+def test_path_buffer_str():
+    path = [
+        svg.M(10, 20),
+        svg.L(30.5, 40),
+        svg.H(1), svg.v(-2),
+        svg.C(1, 2, 3, 4, 5, 6),
+        svg.s(1, 2, 3, 4),
+        svg.Q(1, 2, 3, 4),
+        svg.t(1, 2),
+        svg.Arc(5, 5, 0, True, False, 10, 10),
+        svg.Z(),
+    ]
+    buffer = svg.PathBuffer.from_path_data(path)
+    assert len(buffer) == len(path)
+    assert str(buffer) == svg.Path(d=path).as_dict()["d"]
+    assert buffer.to_path_data() == path
+
+
+def test_path_buffer_extend():
+    buffer = svg.PathBuffer("M", [0, 0])
+    buffer.extend("LLL", array("d", [1, 2, 3, 4, 5, 6]))
+    buffer.extend("LL", memoryview(array("i", [7, 8, 9, 10])))
+    buffer.append("Z")
+    assert str(buffer) == "M 0 0 L 1 2 L 3 4 L 5 6 L 7 8 L 9 10 Z "
+    assert svg.Path(d=buffer).as_str() == f'<path d="{buffer}"/>'
+    assert buffer == svg.PathBuffer.from_path_data(buffer.to_path_data())
+
+
+def test_path_buffer_number_format():
+    buffer = svg.PathBuffer("ML", [0.1 + 0.2, 0.5, 1.0, 2.0])
+    assert str(buffer) == "M 0.30000000000000004 0.5 L 1 2"
+    with svg.NumberFormat(precision=2, leading_zero=False):
+        assert str(buffer) == "M .3 .5 L 1 2"
+
+
+@pytest.mark.parametrize("commands, coords", [
+    ("X", []),
+    ("L", [1]),
+    ("LZ", [1, 2, 3]),
+])
+def test_path_buffer_invalid(commands, coords):
+    with pytest.raises(ValueError):
+        svg.PathBuffer(commands, coords)
+
+
+@pytest.mark.parametrize("d, expected", [
+    ("M 10 20", [svg.M(10, 20)]),
+    ("M10,20L30,40", [svg.M(10, 20), svg.L(30, 40)]),
+    ("m1 2 3 4 5 6", [svg.m(1, 2), svg.l(3, 4), svg.l(5, 6)]),
+    ("M1 2 3 4", [svg.M(1, 2), svg.L(3, 4)]),
+    ("h1 2v-3", [svg.h(1), svg.h(2), svg.v(-3)]),
+    ("M1.5.5-1-2", [svg.M(1.5, 0.5), svg.L(-1, -2)]),
+    ("M1e2 -2.5E-1", [svg.M(100.0, -0.25)]),
+    ("M.5 1.", [svg.M(0.5, 1.0)]),
+    ("C1 2 3 4 5 6s1 2 3 4", [svg.C(1, 2, 3, 4, 5, 6), svg.s(1, 2, 3, 4)]),
+    ("Q1 2 3 4T5 6 7 8", [svg.Q(1, 2, 3, 4), svg.T(5, 6), svg.T(7, 8)]),
+    ("a1 1 0 0110 10", [svg.a(1, 1, 0, False, True, 10, 10)]),
+    ("A1,1,30,1,0,-2,.5 5 5 0 0 1 1 1", [
+        svg.Arc(1, 1, 30, True, False, -2, 0.5),
+        svg.Arc(5, 5, 0, False, True, 1, 1),
+    ]),
+    ("M0 0zm1 1Z", [svg.M(0, 0), svg.Z(), svg.m(1, 1), svg.Z()]),
+    ("", []),
+])
+def test_parse_path(d, expected):
+    assert svg.parse_path(d) == expected
+    assert svg.parse_path_buffer(d) == svg.PathBuffer.from_path_data(expected)
+
+
+@pytest.mark.parametrize("d", [
+    "M 1",
+    "M 1 2 3",
+    "L 1 x",
+    "Z 1",
+    "A 1 1 0 2 0 1 1",
+    "1 2",
+    "M0 0 L 1 e 2",
+    "M0 0L+-1 2",
+    "M0 0 L 1e 2 3 4",
+    "M0 0 L 1 2 e",
+    "M0 0 L 1.5.5.",
+    "M" + "1" * 100 + "e",
+    "A" + "1" * 100 + "e",
+])
+def test_parse_path_invalid(d):
+    with pytest.raises(ValueError):
+        svg.parse_path(d)
+    with pytest.raises(ValueError):
+        svg.parse_path_buffer(d)
+
+
+def test_parse_path_round_trip():
+    import examples
+    path = examples.grid4.draw().elements[0]
+    assert svg.parse_path(path.as_dict()["d"]) == path.d
+
+
+def test_to_absolute():
+    path = svg.parse_path("m1 1 h2 v2 c1 1 2 2 3 3 s1 1 2 2 t2 2 z l1 1")
+    assert svg._path.to_absolute(path) == [
+        svg.M(1, 1),
+        svg.L(3, 1),
+        svg.L(3, 3),
+        svg.C(4, 4, 5, 5, 6, 6),
+        svg.C(7, 7, 7, 7, 8, 8),
+        svg.Q(8, 8, 10, 10),
+        svg.Z(),
+        svg.L(2, 2),
+    ]
+
+
+@pytest.mark.parametrize('d, expected', [
+    ('M10 10 L20 10 L20 20 L10 20 Z', 'M10 10H20V20H10Z'),
+    ('M0 0 C10 0 20 10 20 20 C20 30 10 40 0 40', 'M0 0C10 0 20 10 20 20S10 40 0 40'),
+    ('M0 0 Q5 5 10 0 Q15 -5 20 0', 'M0 0Q5 5 10 0T20 0'),
+    ('M0 0 L5 5 L5 5 L10 10', 'M0 0 5 5l5 5'),
+    ('M100 100 L101 -101 L102 -102', 'M100 100l1-201 1-1'),
+    ('M0 0 L1 1 M1 1 L2 2', 'M0 0 1 1M1 1 2 2'),
+    # a single zero-length segment renders a dot with round caps
+    ('M1 1 L1 1 L1 1', 'M1 1H1'),
+    ('M0 0 C0 0 0 0 0 0 L3 4', 'M0 0 3 4'),
+    ('M0 0 A5 5 0 1 0 10 10', 'M0 0A5 5 0 1 0 10 10'),
+])
+def test_minify_path(d, expected):
+    assert svg.minify_path(d) == expected
+
+
+def test_minify_path_number_format():
+    d = 'M 0.123456 0.5 L 10.987654 -0.25 L 20.111 0.3'
+    number_format = svg.NumberFormat(precision=2, leading_zero=False)
+    assert svg.minify_path(d, number_format) == 'M.12.5 10.99-.25 20.11.3'
+    with number_format:
+        assert svg.minify_path(d) == 'M.12.5 10.99-.25 20.11.3'
+
+
+def test_minify_path_decimal():
+    from decimal import Decimal
+    path = [svg.M(Decimal(1), Decimal("0.5")), svg.l(1.5, Decimal(2)), svg.s(Decimal(1), 2, 3, 4)]
+    assert svg.minify_path(path) == 'M1 0.5l1.5 2s1 2 3 4'
+
+
+def test_minify_path_precision_does_not_accumulate():
+    path = [svg.M(0, 0)] + [svg.l(0.333, 0.111) for _ in range(300)]
+    number_format = svg.NumberFormat(precision=1)
+    d = svg.minify_path(path, number_format)
+    last = svg._path.to_absolute(svg.parse_path(d))[-1]
+    assert last.x == pytest.approx(99.9, abs=0.05)
+    assert last.y == pytest.approx(33.3, abs=0.05)
+
+
+def test_minify_path_round_trip():
+    import random
+    rnd = random.Random(13)
+    path = [svg.M(0, 0)]
+    for _ in range(300):
+        cls = svg._path.COMMANDS[rnd.choice('MLHVCSQTAmlhvcsqta')]
+        args = [rnd.randint(1, 50) * rnd.choice((-1, 1)) for _ in cls.field_names()]
+        if cls in (svg.Arc, svg.ArcRel):
+            args[0], args[1] = abs(args[0]), abs(args[1])
+            args[3], args[4] = args[3] > 0, args[4] > 0
+        path.append(cls(*args))
+    d = svg.minify_path(path)
+    assert len(d) < len(str(svg.Path(d=path))) * 0.8
+    assert svg._path.to_absolute(svg.parse_path(d)) == svg._path.to_absolute(path)
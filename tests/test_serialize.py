@@ -0,0 +1,348 @@
+import io
+
+import pytest
+
+import examples
+import svg
+
+
+@pytest.mark.parametrize('name', examples.__all__)
+def test_iter_chunks_same_as_str(name: str) -> None:
+    root = getattr(examples, name).draw()
+    assert "".join(root.iter_chunks()) == root.as_str()
+    expected = root.as_str().encode()
+    assert b"".join(root.iter_chunks(encoding="utf-8")) == expected
+
+
+def test_iter_chunks_nested() -> None:
+    root = svg.SVG(elements=[
+        svg.G(elements=[svg.Circle(r=1), svg.Text(text="hi")]),
+        svg.G(),
+    ])
+    chunks = list(root.iter_chunks())
+    assert len(chunks) > 1
+    assert "".join(chunks) == root.as_str()
+
+
+@pytest.mark.parametrize('name', examples.__all__)
+def test_write_to_text(name: str) -> None:
+    root = getattr(examples, name).draw()
+    stream = io.StringIO()
+    root.write_to(stream)
+    assert stream.getvalue() == root.as_str()
+
+
+@pytest.mark.parametrize('name', examples.__all__)
+def test_write_to_binary(name: str) -> None:
+    root = getattr(examples, name).draw()
+    stream = io.BytesIO()
+    root.write_to(stream)
+    assert stream.getvalue() == root.as_str().encode()
+
+
+def test_write_to_file(tmp_path) -> None:
+    root = svg.SVG(elements=[svg.Text(text="привет")])
+    path = tmp_path / "out.svg"
+    with path.open("wb") as stream:
+        root.write_to(stream)
+    assert path.read_text(encoding="utf-8") == root.as_str()
+    with path.open("w", encoding="utf-16") as stream:
+        root.write_to(stream)
+    assert path.read_text(encoding="utf-16") == root.as_str()
+
+
+def test_as_dict() -> None:
+    el = svg.Text(x=1, font_size=2, class_=['a', 'b'], text='hi')
+    assert el.as_dict() == {'x': '1', 'class': 'a b', 'font-size': '2'}
+    # The serializer is compiled for each class separately.
+    assert '_attrs_serializer' in vars(svg.Text)
+    assert svg.TSpan(dx=3).as_dict() == {'dx': '3'}
+
+
+def test_as_dict_semicolon() -> None:
+    el = svg.Animate(values=[1, 2], keyTimes=[0, 1], to='3')
+    assert el.as_dict() == {'values': '1;2', 'keyTimes': '0;1', 'to': '3'}
+
+
+def make_tree() -> svg.SVG:
+    return svg.SVG(elements=[
+        svg.G(elements=[svg.Circle(r=1), svg.Text(text="hi")]),
+        svg.G(elements=[svg.Rect(width=2)]),
+    ])
+
+
+def test_cache() -> None:
+    root = make_tree()
+    expected = root.as_str()
+    assert root.as_str(cache=True) == expected
+    assert root.as_str(cache=True) == expected
+    assert root.__dict__["_cached_str"] == expected
+
+
+def test_cache_invalidated_on_assignment() -> None:
+    circle = svg.Circle(r=1)
+    sibling = svg.G(elements=[svg.Rect(width=2)])
+    root = svg.SVG(elements=[svg.G(elements=[circle, svg.Text(text="hi")]), sibling])
+    root.as_str(cache=True)
+    circle.r = 3
+    assert 'r="3"' in root.as_str(cache=True)
+    assert root.as_str(cache=True) == root.as_str()
+    # the sibling subtree is still cached
+    assert "_cached_str" in sibling.__dict__
+
+
+def test_cache_invalidated_on_elements_mutation() -> None:
+    children: list[svg.Element] = [svg.Rect(width=2)]
+    group = svg.G(elements=children)
+    root = svg.SVG(elements=[svg.G(elements=[svg.Circle(r=1)]), group])
+    root.as_str(cache=True)
+    children.append(svg.Line())
+    assert "<line/>" in root.as_str(cache=True)
+    children.sort(key=lambda e: e.element_name)
+    del children[0]
+    assert root.as_str(cache=True) == root.as_str()
+    assert "<line/>" not in root.as_str()
+
+    group.elements = [svg.Ellipse()]
+    assert root.as_str(cache=True) == root.as_str()
+    assert "<ellipse/>" in root.as_str()
+
+
+def test_cache_keeps_elements_list() -> None:
+    children: list[svg.Element] = [svg.Circle(r=1)]
+    group = svg.G(elements=children)
+    group.as_str(cache=True)
+    assert group.elements is children
+    children.append(svg.Rect())
+    assert group.as_str(cache=True) == '<g><circle r="1"/><rect/></g>'
+    assert group.as_str() == '<g><circle r="1"/><rect/></g>'
+
+
+def test_cache_invalidated_on_empty_elements_mutation() -> None:
+    children: list[svg.Element] = []
+    root = svg.SVG(elements=[svg.G(elements=children)])
+    root.as_str(cache=True)
+    children.append(svg.Line())
+    assert "<g><line/></g>" in root.as_str(cache=True)
+
+
+def test_cache_invalidated_on_nested_elements_mutation() -> None:
+    inner: list[svg.Element] = [svg.Circle()]
+    rect = svg.Rect()
+    root = svg.SVG(elements=[svg.G(elements=[svg.G(elements=inner)]), rect])
+    root.as_str(cache=True)
+    inner.append(svg.Line())
+    assert "<line/></g></g>" in root.as_str(cache=True)
+    assigned: list[svg.Element] = [svg.Title(text="t")]
+    rect.elements = assigned
+    assert root.as_str(cache=True) == root.as_str()
+    assert "<title>t</title>" in root.as_str()
+    assigned.append(svg.Desc(text="d"))
+    assert root.as_str(cache=True) == root.as_str()
+    assert "<desc>d</desc>" in root.as_str()
+
+
+def test_cache_number_format() -> None:
+    root = svg.SVG(elements=[svg.G(elements=[svg.Circle(r=0.25)])])
+    assert 'r="0.25"' in root.as_str(cache=True)
+    with svg.NumberFormat(precision=1, leading_zero=False):
+        assert root.as_str(cache=True) == root.as_str()
+        assert 'r=".2"' in root.as_str(cache=True)
+    assert root.as_str(cache=True) == root.as_str()
+    assert 'r="0.25"' in root.as_str(cache=True)
+
+
+def test_cache_invalidated_explicitly() -> None:
+    d: list[svg.PathData] = [svg.M(1, 2)]
+    path = svg.Path(d=d)
+    root = svg.SVG(elements=[path])
+    root.as_str(cache=True)
+    d.append(svg.Z())
+    path.invalidate_cache()
+    assert root.as_str(cache=True) == root.as_str()
+    assert "Z" in root.as_str()
+
+
+def test_cache_shared_element() -> None:
+    circle = svg.Circle(r=1)
+    first = svg.G(elements=[circle])
+    second = svg.G(elements=[circle])
+    first.as_str(cache=True)
+    second.as_str(cache=True)
+    circle.r = 2
+    assert 'r="2"' in first.as_str(cache=True)
+    assert 'r="2"' in second.as_str(cache=True)
+
+
+def test_cache_pickle() -> None:
+    import pickle
+    root = make_tree()
+    root.as_str(cache=True)
+    restored = pickle.loads(pickle.dumps(root))
+    assert restored == root
+    assert type(restored.elements) is list
+    assert "_cached_str" not in restored.__dict__
+
+
+def make_deep_tree(depth: int):
+    root = svg.G()
+    group = root
+    for _ in range(depth):
+        child = svg.G()
+        group.elements = [child]
+        group = child
+    circle = svg.Circle(r=1)
+    group.elements = [circle]
+    return root, circle
+
+
+def test_deep_tree() -> None:
+    depth = 100_000
+    root, _ = make_deep_tree(depth)
+    expected = "<g>" * (depth + 1) + '<circle r="1"/>' + "</g>" * (depth + 1)
+    assert str(root) == expected
+    assert root._repr_svg_() == expected
+    assert "".join(root.iter_chunks()) == expected
+
+
+def test_deep_tree_cache() -> None:
+    # Each level caches its whole subtree, so the memory grows quadratically.
+    depth = 3_000
+    root, circle = make_deep_tree(depth)
+    expected = "<g>" * (depth + 1) + '<circle r="1"/>' + "</g>" * (depth + 1)
+    assert root.as_str(cache=True) == expected
+    circle.r = 2
+    assert root.as_str(cache=True) == expected.replace('r="1"', 'r="2"')
+
+
+def test_aiter_chunks() -> None:
+    import asyncio
+
+    root = svg.SVG(elements=[svg.Circle(cx=i, r=1) for i in range(1000)])
+    ticks = []
+
+    async def ticker() -> None:
+        while True:
+            ticks.append(1)
+            await asyncio.sleep(0)
+
+    async def collect() -> list:
+        task = asyncio.ensure_future(ticker())
+        chunks = [chunk async for chunk in root.aiter_chunks(chunk_size=1000)]
+        task.cancel()
+        return chunks
+
+    chunks = asyncio.run(collect())
+    assert len(chunks) > 10
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert b"".join(chunks) == root.as_str().encode()
+    # the other task was running while the document was serialized
+    assert len(ticks) >= len(chunks) - 1
+
+
+def make_wide_tree() -> svg.SVG:
+    return svg.SVG(elements=[
+        svg.G(elements=[svg.Circle(cx=i, r=1) for i in range(100)]),
+        svg.G(elements=[
+            svg.G(elements=[svg.Rect(x=i), svg.Text(text=str(i))])
+            for i in range(150)
+        ]),
+        svg.Line(),
+    ])
+
+
+def test_as_str_parallel() -> None:
+    root = make_wide_tree()
+    actual = root.as_str_parallel(threshold=50, batch_size=7)
+    assert actual == root.as_str()
+
+
+def test_as_str_parallel_executor() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    root = make_wide_tree()
+    with ThreadPoolExecutor(2) as executor:
+        actual = root.as_str_parallel(threshold=50, batch_size=7, executor=executor)
+    assert actual == root.as_str()
+
+
+def test_as_str_parallel_below_threshold() -> None:
+    root = make_wide_tree()
+    assert root.as_str_parallel(threshold=1000) == root.as_str()
+
+
+@pytest.mark.parametrize('name', examples.__all__)
+def test_as_bytes(name: str) -> None:
+    root = getattr(examples, name).draw()
+    assert root.as_bytes() == root.as_str().encode()
+
+
+def test_serialize_into_bytearray() -> None:
+    root = svg.SVG(elements=[svg.Text(text="привет")])
+    expected = root.as_str().encode()
+    buffer = bytearray(b"xyz")
+    assert root.serialize_into(buffer, offset=1) == len(expected)
+    assert buffer == b"x" + expected
+
+
+@pytest.mark.parametrize('offset', [-1, 4])
+def test_serialize_into_offset_out_of_range(offset: int) -> None:
+    buffer = bytearray(b"xyz")
+    with pytest.raises(ValueError):
+        svg.Circle(r=1).serialize_into(buffer, offset=offset)
+    assert buffer == b"xyz"
+
+
+def test_serialize_into_memoryview() -> None:
+    root = svg.SVG(elements=[svg.Circle(r=1)])
+    expected = root.as_str().encode()
+    buffer = bytearray(len(expected) + 2)
+    assert root.serialize_into(memoryview(buffer), offset=2) == len(expected)
+    assert buffer[2:] == expected
+    with pytest.raises(ValueError):
+        root.serialize_into(memoryview(buffer), offset=3)
+
+
+def test_serialize_into_mmap(tmp_path) -> None:
+    import mmap
+
+    root = make_wide_tree()
+    expected = root.as_str().encode()
+    path = tmp_path / "out.svg"
+    path.write_bytes(b"\0")
+    with path.open("r+b") as stream:
+        with mmap.mmap(stream.fileno(), 0) as buffer:
+            assert root.serialize_into(buffer) == len(expected)
+    assert path.read_bytes() == expected
+
+
+@pytest.mark.parametrize('level', [1, 9])
+def test_write_svgz(tmp_path, level: int) -> None:
+    import gzip
+
+    root = make_wide_tree()
+    path = tmp_path / "out.svgz"
+    with path.open("wb") as stream:
+        root.write_svgz(stream, compresslevel=level)
+    assert gzip.decompress(path.read_bytes()) == root.as_bytes()
+    assert path.stat().st_size < len(root.as_bytes())
+    # the output doesn't depend on the time or the file name
+    stream = io.BytesIO()
+    root.write_svgz(stream, compresslevel=level)
+    assert stream.getvalue() == path.read_bytes()
+    stream = io.BytesIO()
+    root.write_svgz(stream, compresslevel=level, mtime=1700000000)
+    assert gzip.decompress(stream.getvalue()) == root.as_bytes()
+    assert stream.getvalue()[4:8] == (1700000000).to_bytes(4, "little")
+
+
+def test_as_str_parallel_number_format() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    root = svg.SVG(elements=[svg.Circle(cx=i / 3) for i in range(100)])
+    with svg.NumberFormat(precision=1):
+        expected = root.as_str()
+        with ThreadPoolExecutor(2) as executor:
+            assert root.as_str_parallel(threshold=10, batch_size=7, executor=executor) == expected
+        assert root.as_str_parallel(threshold=10, batch_size=7) == expected
+    assert 'cx="0.3"' in expected
@@ -0,0 +1,136 @@
+import math
+import random
+
+import pytest
+
+import svg
+
+
+def zigzag(count, noise):
+    rnd = random.Random(17)
+    return [svg.Point(i, (i % 20 if i % 40 < 20 else 20 - i % 20) + rnd.uniform(-noise, noise)) for i in range(count)]
+
+
+def distance_to_segment(p, a, b):
+    dx, dy = b.x - a.x, b.y - a.y
+    t = ((p.x - a.x) * dx + (p.y - a.y) * dy) / (dx * dx + dy * dy)
+    t = max(0, min(1, t))
+    return math.hypot(p.x - a.x - t * dx, p.y - a.y - t * dy)
+
+
+@pytest.mark.parametrize('method, tolerance', [('rdp', 0.5), ('visvalingam', 1)])
+def test_simplify_points(method, tolerance):
+    points = zigzag(201, noise=0.1)
+    result = svg.simplify(points, tolerance, method)
+    assert result[0] is points[0]
+    assert result[-1] is points[-1]
+    # the corners of the zigzag are kept, the noise between them is removed
+    assert 11 <= len(result) < 25
+    for point in points:
+        assert min(distance_to_segment(point, a, b) for a, b in zip(result, result[1:])) < 1
+
+
+def test_simplify_rdp_tolerance():
+    points = zigzag(1000, noise=2)
+    result = svg.simplify(points, 1.5)
+    kept = {id(p) for p in result}
+    segments = list(zip(result, result[1:]))
+    index = 0
+    for point in points:
+        if id(point) in kept:
+            index += 1
+            continue
+        a, b = segments[index - 1]
+        assert distance_to_segment(point, a, b) <= 1.5
+
+
+@pytest.mark.parametrize('points', [[], [svg.Point(1, 2)], [svg.Point(1, 2), svg.Point(3, 4)]])
+def test_simplify_short(points):
+    assert svg.simplify(points, 1) == points
+    assert svg.simplify(points, 1, 'visvalingam') == points
+
+
+def test_simplify_elements():
+    polygon = svg.Polygon(
+        points=[svg.Point(0, 0), svg.Point(1, 0), svg.Point(2, 0), svg.Point(2, 2)],
+        fill='red',
+    )
+    result = svg.simplify(polygon, 0.1)
+    assert str(result) == '<polygon points="0,0 2,0 2,2" fill="red"/>'
+    assert len(polygon.points) == 4
+
+    path = svg.Path(d='M0 0 L1 0.01 L2 0 Z l1 1 l1 1.001 l1 1 M5 5 H6 H7')
+    result = svg.simplify(path, 0.1)
+    assert result.d == [
+        svg.M(0, 0), svg.L(2, 0), svg.Z(),
+        svg.L(3, 3.001),
+        svg.M(5, 5), svg.L(7, 5),
+    ]
+
+
+def test_simplify_path_buffer():
+    buffer = svg.PathBuffer.from_path_data([
+        svg.M(0, 0), svg.L(1, 0.01), svg.L(2, 0),
+        svg.M(5, 5), svg.L(6, 6), svg.L(7, 7),
+    ])
+    result = svg.simplify(buffer, 0.1)
+    assert str(result) == 'M 0 0 L 2 0 M 5 5 L 7 7'
+    result = svg.simplify(svg.PathBuffer.from_path_data([svg.M(0, 0), svg.l(1, 0.01), svg.l(1, -0.01)]), 0.1)
+    assert str(result) == 'M 0 0 L 2 0'
+
+
+def test_simplify_invalid():
+    with pytest.raises(ValueError):
+        svg.simplify([svg.M(0, 0), svg.Q(1, 1, 2, 0)], 1)
+    with pytest.raises(ValueError):
+        svg.simplify([svg.Point(0, 0)], 1, 'unknown')
+
+
+def test_downsample_lttb():
+    xs = list(range(10))
+    ys = [0, 0, 5, 0, 0, 0, -3, 0, 0, 0]
+    assert svg.downsample(xs, ys, 4) == [svg.Point(0, 0), svg.Point(2, 5), svg.Point(6, -3), svg.Point(9, 0)]
+    assert str(svg.downsample(xs, ys, 4, output='path')) == 'M 0 0 L 2 5 L 6 -3 L 9 0'
+    assert len(svg.downsample(xs, ys, 20)) == 10
+
+
+def test_downsample_minmax():
+    xs = list(range(10))
+    ys = [0, 0, 5, 0, 0, 0, -3, 0, 0, 0]
+    result = svg.downsample(xs, ys, 2, 'minmax', output='path')
+    assert str(result) == 'M 0 0 L 2 5 L 4 0 L 5 0 L 6 -3 L 9 0'
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_downsample_size(method):
+    from array import array
+    rnd = random.Random(18)
+    count = 100_000
+    xs = array('d', range(count))
+    ys = array('d', [rnd.gauss(0, 1) for _ in range(count)])
+    ys[54321] = 100
+    result = svg.downsample(xs, ys, 300, method)
+    assert 300 <= len(result) <= 4 * 300
+    assert result[0] == svg.Point(0, ys[0])
+    assert result[-1] == svg.Point(count - 1, ys[-1])
+    assert svg.Point(54321, 100) in result
+    assert [p.x for p in result] == sorted(p.x for p in result)
+
+
+def test_downsample_invalid():
+    with pytest.raises(ValueError):
+        svg.downsample([1, 2], [1], 10)
+    with pytest.raises(ValueError):
+        svg.downsample([1, 2], [1, 2], 10, 'unknown')
+    with pytest.raises(ValueError):
+        svg.downsample([1, 2], [1, 2], 0)
+    assert svg.downsample([], [], 10) == []
+
+
+def test_simplify_point_buffers():
+    from array import array
+    assert svg.simplify([0, 0, 1, 0.01, 2, 0], 0.1) == [0, 0, 2, 0]
+    assert svg.simplify(array('d', [0, 0, 1, 0.01, 2, 0]), 0.1) == array('d', [0, 0, 2, 0])
+    polyline = svg.Polyline(points=memoryview(array('d', [0, 0, 1, 0.01, 2, 0])))
+    assert str(svg.simplify(polyline, 0.1)) == '<polyline points="0 0 2 0"/>'
+    assert svg.bounding_box(polyline) == svg.BoundingBox(0, 0, 2, 0.01)
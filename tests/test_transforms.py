@@ -0,0 +1,87 @@
+import pytest
+
+import svg
+
+
+def values(matrix):
+    return [matrix.a, matrix.b, matrix.c, matrix.d, matrix.e, matrix.f]
+
+
+def test_transform_to_matrix():
+    assert svg.Translate(1).to_matrix() == svg.Matrix(1, 0, 0, 1, 1, 0)
+    assert svg.Scale(2).to_matrix() == svg.Matrix(2, 0, 0, 2, 0, 0)
+    rotate = svg.Rotate(90, 1, 1).to_matrix()
+    assert [rotate.a, rotate.b, rotate.c, rotate.d, rotate.e, rotate.f] == pytest.approx([0, 1, -1, 0, 2, 0])
+    combined = svg.Translate(10, 20).to_matrix() @ svg.Scale(2, 3).to_matrix()
+    assert combined == svg.Matrix(2, 0, 0, 3, 10, 20)
+
+
+@pytest.mark.parametrize('transform', [
+    svg.Translate(3, -4),
+    svg.Scale(2, 0.5),
+    svg.Rotate(30, 5, 5),
+    svg.SkewX(20),
+    svg.SkewY(-20),
+    svg.Matrix(1, 2, 3, 4, 5, 6),
+])
+def test_inverse(transform):
+    result = transform.to_matrix() @ transform.inverse()
+    assert values(result) == pytest.approx([1, 0, 0, 1, 0, 0], abs=1e-12)
+
+
+def test_decimal():
+    from decimal import Decimal
+    transforms = [svg.Translate(Decimal(1)), svg.Rotate(90, Decimal(1), Decimal(0))]
+    assert values(svg.compose_transforms(transforms)) == pytest.approx([0, 1, -1, 0, 2, -1])
+    matrix = svg.Matrix(Decimal(2), 0, 0, Decimal(2), 0, 0)
+    assert values(matrix.inverse() @ svg.Matrix(1.5, 0, 0, 1.5, 0, 0)) == pytest.approx([0.75, 0, 0, 0.75, 0, 0])
+    assert matrix.apply(svg.Point(Decimal(1), 0.5)) == svg.Point(2, 1)
+
+
+def test_compose_transforms_subclass():
+    from dataclasses import dataclass
+
+    @dataclass
+    class Shift(svg.Translate):
+        label: str = ""
+
+        def to_matrix(self):
+            return svg.Matrix(1, 0, 0, 1, self.x, 0)
+
+    transforms = [Shift(1, 2, label="a"), svg.Scale(2)]
+    assert values(svg.compose_transforms(transforms)) == [2, 0, 0, 2, 1, 0]
+
+
+def test_inverse_singular():
+    with pytest.raises(ValueError):
+        svg.Scale(0).inverse()
+
+
+def test_compose_transforms():
+    transforms = [svg.Translate(10, 20), svg.Rotate(90), svg.Scale(2)]
+    result = svg.compose_transforms(transforms)
+    assert values(result) == pytest.approx([0, 2, -2, 0, 10, 20])
+    assert svg.compose_transforms(transforms) == result
+    assert svg.compose_transforms(transforms) is not result
+    assert svg.compose_transforms([]) == svg.Matrix(1, 0, 0, 1, 0, 0)
+    transforms[0].x = 0
+    assert values(svg.compose_transforms(transforms)) == pytest.approx([0, 2, -2, 0, 0, 20])
+
+
+def test_apply():
+    matrix = svg.compose_transforms([svg.Translate(10, 20), svg.Scale(2, 3)])
+    assert matrix.apply(svg.Point(1, 1)) == svg.Point(12, 23)
+    assert matrix.apply([svg.Point(0, 0), svg.Point(1, 1)]) == [svg.Point(10, 20), svg.Point(12, 23)]
+    assert list(matrix.apply([0, 0, 1, 1])) == [10, 20, 12, 23]
+    with pytest.raises(ValueError):
+        matrix.apply([1, 2, 3])
+
+
+def test_apply_numpy():
+    np = pytest.importorskip('numpy')
+    matrix = svg.Rotate(90).to_matrix()
+    points = np.array([[1.0, 0.0], [0.0, 2.0]])
+    result = matrix.apply(points)
+    assert isinstance(result, np.ndarray)
+    assert np.allclose(result, [[0, 1], [-2, 0]])
+    assert np.allclose(matrix.inverse().apply(result), points)
@@ -1,8 +1,10 @@
+from array import array
 from datetime import datetime, timedelta
 
 import pytest
 
-from svg._types import to_clock_value, to_wallclock_sync_value
+import svg
+from svg._types import point_columns, to_clock_value, to_wallclock_sync_value
 
 
 @pytest.mark.parametrize("input, expected", [
@@ -44,3 +46,18 @@ def test_to_clock_value(input, expected):
 def test_to_wallclock_sync_value(input, expected):
     actual = to_wallclock_sync_value(input)
     assert actual == expected
+
+
+@pytest.mark.parametrize('points', [
+    [svg.Point(1, 2), svg.Point(3, 4)],
+    [1, 2, 3, 4],
+    array('d', [1, 2, 3, 4]),
+    memoryview(array('i', [1, 2, 3, 4])),
+])
+def test_point_columns(points):
+    assert point_columns(points) == (array('d', [1, 3]), array('d', [2, 4]))
+
+
+def test_point_columns_odd():
+    with pytest.raises(ValueError):
+        point_columns([1, 2, 3])